@@ -1,3 +1,65 @@
 from .alldebrid import AllDebrid
+from .batching import BatchAggregator
+from .deadline import Deadline, DeadlineExceeded
+from .dnscache import DNSCache
+from .downloader import DownloadError, SegmentedDownloader
+from .filetree import FileTable
+from .hedging import HedgePolicy
+from .jobs import JobQueue
+from .jsonstream import JSONItemStream
+from .linkstore import LinkStore
+from .magnet import MagnetBatch, normalize_magnets, parse_info_hash
+from .mirrors import MirrorSelector
+from .polling import PollScheduler
+from .priority import HIGH, LOW, NORMAL, PriorityDispatcher, request_priority
+from .proxy import StreamProxy
+from .ratelimit import RateLimiter, SharedRateLimiter
+from .recording import RecordingTransport, load_recording
+from .replay import ReplayServer, ReplayTransport
+from .streams import StreamPolicy
+from .sync import LinkSync
+from .torrent import BencodeError, TorrentInfo, parse_torrent
+from .transport import InMemoryTransport, RequestsTransport, StreamingResponse, Transport, TransportError, Urllib3Transport
 
-__all__ = ['AllDebrid']
+__all__ = [
+    'HIGH',
+    'LOW',
+    'NORMAL',
+    'AllDebrid',
+    'BatchAggregator',
+    'BencodeError',
+    'DNSCache',
+    'Deadline',
+    'DeadlineExceeded',
+    'DownloadError',
+    'FileTable',
+    'HedgePolicy',
+    'InMemoryTransport',
+    'JSONItemStream',
+    'JobQueue',
+    'LinkStore',
+    'LinkSync',
+    'MagnetBatch',
+    'MirrorSelector',
+    'PollScheduler',
+    'PriorityDispatcher',
+    'RateLimiter',
+    'RecordingTransport',
+    'ReplayServer',
+    'ReplayTransport',
+    'RequestsTransport',
+    'SegmentedDownloader',
+    'SharedRateLimiter',
+    'StreamPolicy',
+    'StreamProxy',
+    'StreamingResponse',
+    'TorrentInfo',
+    'Transport',
+    'TransportError',
+    'Urllib3Transport',
+    'load_recording',
+    'normalize_magnets',
+    'parse_info_hash',
+    'parse_torrent',
+    'request_priority',
+]
@@ -0,0 +1,7 @@
+"""
+Runs the command line with ``python -m alldebrid``.
+"""
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -25,16 +25,26 @@ Functions
 - delayed_links(): Makes a request to the delayed links endpoint and returns the response from the API.
 - upload_magnets(): Makes a request to the upload magnets endpoint and returns the response from the API.
 - upload_file(): Makes a request to the upload file endpoint and returns the response from the API.
+- upload_torrents(): Checks torrents for instant availability locally by info-hash, then uploads cached ones as magnets and the rest as files.
 - get_magnet_status(): Makes a request to the magnet status endpoint and returns the response from the API.
 - delete_magnet(): Makes a request to the delete magnet endpoint and returns the response from the API.
 - restart_magnet(): Makes a request to the restart magnet endpoint and returns the response from the API.
+- delete_magnets(): Deletes many magnets concurrently and reports the outcome of each.
+- restart_magnets(): Restarts many magnets in concurrent chunks and reports the outcome of each.
+- cleanup_magnets(): Deletes or restarts the magnets matching a predicate, from one status listing.
+- iter_magnets(): Yields the magnets of the account one at a time from a streamed magnet status response.
 - check_magnet_instant(): Makes a request to the check magnet instant endpoint and returns the response from the API.
 - saved_links(): Makes a request to the saved links endpoint and returns the response from the API.
+- iter_saved_links(): Yields the saved links one at a time from a streamed response.
 - save_new_link(): Makes a request to the save new link endpoint and returns the response from the API.
 - delete_saved_link(): Makes a request to the delete saved link endpoint and returns the response from the API.
+- reconcile_saved_links(): Saves and deletes only the links needed to make the saved links match a desired set.
 - recent_links(): Makes a request to the recent links endpoint and returns the response from the API.
+- iter_recent_links(): Yields the recent links one at a time from a streamed response.
 - purge_recent_links(): Makes a request to the purge recent links endpoint and returns the response from the API.
 - download_file_then_upload_to_alldebrid(): Downloads a file from a URL and uploads it to AllDebrid.
+- warm_up(): Resolves the API host and opens keep-alive connections before traffic arrives, optionally keeping them open in the background.
+- stop_keep_alive(): Stops the background keep-alive started by warm_up.
 
 Exceptions
 ----------
@@ -48,12 +58,27 @@ Examples
 >>> ad.ping()
 {'status': 'success', 'data': {'ping': 'pong'}}
 """
+import contextvars
 import os
 import re
-from typing import Any, Dict, List, Optional, Union
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import time
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from functools import lru_cache
 import requests
+from .deadline import Deadline, DeadlineExceeded, current_deadline
+from .dnscache import CachingHTTPAdapter, DNSCache
+from .hedging import HedgePolicy
+from .jsonstream import JSONItemStream
+from .magnet import MagnetBatch, normalize_magnets
+from .priority import LOW, PriorityDispatcher, request_priority
+from .ratelimit import RateLimiter
+from .streams import StreamPolicy
+from .torrent import parse_torrent
+from .transport import RequestsTransport, Transport, TransportError, TransportResponse
 
 def handle_exceptions(*, exceptions):
     """
@@ -101,7 +126,17 @@ def get_endpoints() -> Dict[str, str]:
     """
     return endpoints
 
-API_HOST = "http://api.alldebrid.com/v4/"
+API_HOST = "https://api.alldebrid.com/v4/"
+
+# Live clients, so forked children can reset the sessions they inherited.
+_instances: "weakref.WeakSet[AllDebrid]" = weakref.WeakSet()
+
+def _reset_instances_after_fork() -> None:
+    for instance in list(_instances):
+        instance._reset_after_fork() # pylint: disable=W0212
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_instances_after_fork)
 
 class APIError(Exception):
     """
@@ -241,6 +276,44 @@ apiErrors = {
     'INSUFFICIENT_BALANCE': 'Your current reseller balance is not enough to generate the requested vouchers', #pylint: disable=C0301
 }
 
+def _error_of(exc: Exception) -> Dict[str, str]:
+    # The error entry reported for one item of a bulk operation.
+    if isinstance(exc, APIError):
+        return {"code": str(exc.code), "message": exc.message}
+    return {"code": type(exc).__name__, "message": str(exc)}
+
+def _first_success(futures: List[Future]) -> Future:
+    # A future resolving to the first of ``futures`` to succeed, or failing with the last error; the rest are cancelled.
+    combined: Future = Future()
+    lock = threading.Lock()
+    remaining = [len(futures)]
+
+    def settle(future: Future) -> None:
+        error = CancelledError() if future.cancelled() else future.exception()
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        try:
+            if error is None:
+                combined.set_result(future.result())
+            elif last:
+                combined.set_exception(error)
+        except InvalidStateError:
+            return
+        if error is None:
+            for other in futures:
+                other.cancel()
+
+    def cancel_all(done: Future) -> None:
+        if done.cancelled():
+            for future in futures:
+                future.cancel()
+
+    for future in futures:
+        future.add_done_callback(settle)
+    combined.add_done_callback(cancel_all)
+    return combined
+
 class StreamLinkProcessor:
     """
     The StreamLinkProcessor class is designed to process streaming links for video content.
@@ -260,6 +333,16 @@ class StreamLinkProcessor:
         The maximum number of attempts to make to obtain the delayed streaming link.
     delay: int (default=3)
         The delay between attempts to obtain the delayed streaming link.
+    close_session: bool (default=False)
+        Whether to close the downloader's session once done. Leave it off when the downloader is shared between threads,
+        otherwise every finished link tears down the connection pool the other threads are using.
+    scheduler: Optional[PollScheduler] (default=None)
+        A PollScheduler that waits for the delayed links instead of a sleeping thread per link, polling every
+        retry_delay seconds within max_attempts and max_delay. Required by submit.
+    policy: Optional[StreamPolicy] (default=None)
+        Chooses among the stream variants of a link; by default the highest quality.
+    candidates: int (default=1)
+        How many of the best stream variants to request at once; the first one whose delayed link is ready wins.
 
     Returns
     -------
@@ -272,17 +355,135 @@ class StreamLinkProcessor:
         Raised when the maximum number of attempts is reached.
     """
 
-    def __init__(self, downloader: Any, max_attempts: int = 5, delay: int = 3, retry_delay: int = 3, max_delay: int = 30):
+    def __init__(self, downloader: Any, max_attempts: int = 5, delay: int = 3, retry_delay: int = 3, max_delay: int = 30, close_session: bool = False, scheduler: Any = None, policy: Optional[StreamPolicy] = None, candidates: int = 1):
         self.downloader = downloader
         self.max_attempts = max_attempts
         self.delay = delay
         self.retry_delay = retry_delay
         self.max_delay = max_delay
+        self.close_session = close_session
+        self.scheduler = scheduler
+        self.policy = policy or StreamPolicy()
+        self.candidates = max(1, candidates)
+
+    def _unlock_streams(self, link: str, downloader) -> Tuple[str, List[dict]]:
+        # Unlocks the link; returns its ID and the stream variants to request, best first.
+        data = downloader.download_link(link).get("data", {})
+        data_id = data.get("id")
+        streams = self.policy.rank(data.get("streams") or [])
+        if not data_id or not streams:
+            raise ValueError("Could not obtain data id or stream id.")
+        return data_id, streams[:self.candidates]
+
+    @staticmethod
+    def _request_stream(link: str, downloader, data_id: str, stream: dict) -> Tuple[Optional[str], Optional[str]]:
+        # Returns the direct link if the stream is ready at once, else the ID of the delayed link to poll.
+        data = downloader.streaming_links(link, data_id, stream["id"])["data"]
+        if data.get("link") and not data.get("delayed"):
+            return data["link"], None
+        return None, data["delayed"]
+
+    def _poll(self, downloader, delayed_id: str, max_attempts, retry_delay, max_delay, stop: Optional[threading.Event] = None) -> Optional[str]:
+        deadline = current_deadline()
+        attempts = 0
+        time_limit = max_delay
+        start_time = time.time()
+
+        while attempts < max_attempts:
+            delayed_link_response = downloader.delayed_links(download_id=delayed_id)
+
+            status = delayed_link_response["data"]["status"]
+            if status == 2:
+                return delayed_link_response["data"]["link"]
+            elif status == 1:
+                elapsed_time = time.time() - start_time
+                if elapsed_time >= time_limit:
+                    raise TimeoutError("Max delay reached. Cannot get direct link.")
+            if deadline is not None and deadline.remaining() <= retry_delay:
+                # Another poll would start after the deadline; give up now rather than sleep through it.
+                raise DeadlineExceeded("Deadline reached before the direct link was ready.")
+            if stop is None:
+                time.sleep(retry_delay)
+            elif stop.wait(retry_delay):
+                # Another stream variant won the race.
+                raise CancelledError()
+            attempts += 1
+
+        raise MaxAttemptsExceededException("Max attempts reached. Cannot get direct link.")
+
+    def _resolve(self, link: str, downloader, data_id: str, stream: dict, max_attempts, retry_delay, max_delay, stop: Optional[threading.Event] = None) -> Optional[str]:
+        direct_link, delayed_id = self._request_stream(link, downloader, data_id, stream)
+        if direct_link is not None:
+            return direct_link
+        return self._poll(downloader, delayed_id, max_attempts, retry_delay, max_delay, stop)
+
+    def _race(self, link: str, downloader, data_id: str, candidates: List[dict], max_attempts, retry_delay, max_delay) -> Optional[str]:
+        # Requests every candidate variant at once and returns the first delayed link that is ready.
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = [
+            executor.submit(contextvars.copy_context().run, self._resolve, link, downloader, data_id, stream, max_attempts, retry_delay, max_delay, stop)
+            for stream in candidates
+        ]
+        try:
+            error: Optional[BaseException] = None
+            for future in as_completed(futures):
+                try:
+                    return future.result()
+                except Exception as exc: # pylint: disable=W0703
+                    error = exc
+            raise error
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _scheduled(self, link: str, downloader, data_id: str, candidates: List[dict], max_attempts, retry_delay, max_delay) -> Future:
+        # Requests the candidate variants concurrently and leaves their delayed links to the scheduler.
+        def start(stream: dict) -> Future:
+            try:
+                direct_link, delayed_id = self._request_stream(link, downloader, data_id, stream)
+            except Exception as exc: # pylint: disable=W0703
+                future: Future = Future()
+                future.set_exception(exc)
+                return future
+            if direct_link is not None:
+                future = Future()
+                future.set_result(direct_link)
+                return future
+            return self.scheduler.delayed_link(delayed_id, interval=retry_delay, max_attempts=max_attempts, max_delay=max_delay)
+
+        if len(candidates) == 1:
+            return start(candidates[0])
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, start, stream) for stream in candidates]
+            return _first_success([future.result() for future in futures])
+
+    def submit(self, link: str) -> Future:
+        """
+        Unlocks a streaming link and hands the wait for its delayed link to the scheduler, without blocking on it.
+
+        Args:
+            link (str): A link to a streaming content.
+
+        Returns:
+            Future: Resolves to the delayed link of the first candidate stream variant that is ready, or fails as
+            get_delayed_link would. The deadline active in the calling context, if any, applies to the wait.
+
+        Raises:
+            ValueError: Raised when the processor has no scheduler, or the unlock returned no usable stream.
+        """
+        if self.scheduler is None:
+            raise ValueError("submit needs a StreamLinkProcessor with a scheduler.")
+        data_id, candidates = self._unlock_streams(link, self.downloader)
+        return self._scheduled(link, self.downloader, data_id, candidates, self.max_attempts, self.retry_delay, self.max_delay)
 
     def _try_get_delayed_link(self, link: str, downloader, max_attempts, retry_delay, max_delay) -> Optional[str]:
         """
         Attempts to obtain a delayed streaming link from the downloader for the given streaming content link. This method makes repeated calls to the downloader object to try and obtain the delayed link.
 
+        The stream variants are ranked by the processor's policy. With more than one candidate, the best candidates are
+        requested concurrently and the first delayed link that is ready wins.
+
         Args:
             link (str): A link to a streaming content.
             downloader (object): A downloader object.
@@ -295,42 +496,26 @@ class StreamLinkProcessor:
             could not be obtained.
 
         Raises:
+            ValueError: Raised when the unlock returned no link ID or no stream variant.
             TimeoutError: Raised when the maximum time limit to obtain a delayed link has been reached without success.
+            DeadlineExceeded: Raised when the active deadline passes, or is too close for another attempt.
             Exception: Raised when the maximum number of attempts to obtain a delayed link has been reached without success.
         """
-        unlock_response = downloader.download_link(link)
-        data_id = unlock_response.get("data", {}).get("id")
-        stream_id = unlock_response.get("data", {}).get("streams", [{}])[0].get("id")
-        if not data_id or stream_id:
-            raise ValueError("Could not obtain data id or stream id.")
-
-        stream_response = downloader.streaming_links(link, data_id, stream_id)
-
-        attempts = 0
-        time_limit = max_delay
-        start_time = time.time()
-
-        while attempts < max_attempts:
-            delayed_link_response = downloader.delayed_links(download_id=stream_response["data"]["delayed"])
-
-            status = delayed_link_response["data"]["status"]
-            if status == 2:
-                return delayed_link_response["data"]["link"]
-            elif status == 1:
-                elapsed_time = time.time() - start_time
-                if elapsed_time >= time_limit:
-                    raise TimeoutError("Max delay reached. Cannot get direct link.")
-            time.sleep(retry_delay)
-            attempts += 1
+        data_id, candidates = self._unlock_streams(link, downloader)
+        if self.scheduler is not None:
+            return self._scheduled(link, downloader, data_id, candidates, max_attempts, retry_delay, max_delay).result()
+        if len(candidates) == 1:
+            return self._resolve(link, downloader, data_id, candidates[0], max_attempts, retry_delay, max_delay)
+        return self._race(link, downloader, data_id, candidates, max_attempts, retry_delay, max_delay)
 
-        raise MaxAttemptsExceededException("Max attempts reached. Cannot get direct link.")
-
-    def get_delayed_link(self, link: str) -> Optional[str]:
+    def get_delayed_link(self, link: str, deadline: Union[Deadline, float, None] = None) -> Optional[str]:
         """
         Attempts to obtain a delayed streaming link from the downloader for the given streaming content link.
 
         Args:
             link (str): A link to a streaming content.
+            deadline (Union[Deadline, float, None]): A Deadline or a number of seconds bounding the whole flow, on top of
+                any deadline already active.
 
         Returns:
             Optional[str]: The delayed link which can later be used to stream the video, or None if a delayed link 
@@ -338,32 +523,75 @@ class StreamLinkProcessor:
 
         Raises:
             TimeoutError: Raised when the maximum time limit to obtain a delayed link has been reached without success.
+            DeadlineExceeded: Raised when the deadline passes, or is too close for another attempt.
             Exception: Raised when the maximum number of attempts to obtain a delayed link has been reached without success.
         """
         try:
-            return self._try_get_delayed_link(
-                link,
-                self.downloader,
-                self.max_attempts,
-                self.retry_delay,
-                self.max_delay
-            )                                
+            with Deadline.coerce(deadline) or nullcontext():
+                return self._try_get_delayed_link(
+                    link,
+                    self.downloader,
+                    self.max_attempts,
+                    self.retry_delay,
+                    self.max_delay
+                )
         except Exception as exc:
             raise exc
         finally:
-            self.downloader.close_connection()
+            if self.close_session:
+                self.downloader.close_connection()
 
 class AllDebrid:
     """
     Class for interacting with the AllDebrid API.
 
+    Notes
+    -----
+    A single instance is safe to share between threads. Requests only read shared state, the session
+    is created at most once behind a lock, and all threads draw from one connection pool of
+    pool_maxsize connections; threads beyond that wait for a free connection instead of opening
+    throwaway ones.
+
+    Instances can be pickled and used from other processes: only the configuration is pickled and
+    the session is created again on first use. Forked children drop the inherited session and open
+    their own. Pass a SharedRateLimiter as rate_limiter to make all processes share one budget.
+
+    Requests made inside a ``with Deadline(seconds):`` block share its time budget: each timeout is
+    shrunk to the time left and DeadlineExceeded is raised once it runs out.
+
     Parameters
     ----------
     apikey : str
         The API key to use for the requests.
+    proxy : Optional[str]
+        The proxy to use for the requests.
+    timeout : int
+        The timeout of each request in seconds, by default 10.
+    pool_maxsize : int
+        The number of connections kept to the API, shared by all threads. Size it to the number of
+        threads using the instance, by default 50.
+    rate_limiter : Optional[RateLimiter]
+        Throttles every request made by the instance, by default None.
+    dispatcher : Optional[PriorityDispatcher]
+        Admits requests by the priority set with request_priority, reserving capacity for HIGH
+        priority requests, by default None. It is local to the process and not pickled.
+    hedge_policy : Optional[HedgePolicy]
+        Sends a second copy of slow idempotent GET requests (ping, user, magnet status, delayed
+        links) and keeps the first answer, by default None. It is local to the process and not pickled.
+    dns_cache : Optional[DNSCache]
+        Caches the API host's addresses for new connections, by default a DNSCache with a 300
+        second TTL. Pass a shared one to resolve once for several clients.
+    transport : Optional[Transport]
+        Sends the requests, by default a RequestsTransport built from proxy, pool_maxsize and
+        dns_cache. Urllib3Transport has lower per-call overhead; InMemoryTransport answers without
+        any I/O, for tests and benchmarks. HTTP2Transport multiplexes requests over a few HTTP/2
+        connections.
+    base_url : Optional[str]
+        The API root, including the scheme, by default https://api.alldebrid.com/v4/. Use it to
+        point the client at a proxy or a local mock.
     """
 
-    def __init__(self, apikey: str, proxy: Optional[str] = None, timeout: int = None) -> None:
+    def __init__(self, apikey: str, proxy: Optional[str] = None, timeout: int = None, pool_maxsize: int = 50, rate_limiter: Optional[RateLimiter] = None, dispatcher: Optional[PriorityDispatcher] = None, hedge_policy: Optional[HedgePolicy] = None, dns_cache: Optional[DNSCache] = None, transport: Optional[Transport] = None, base_url: Optional[str] = None) -> None:
         """
         __init__ method for the AllDebrid class.
         """
@@ -371,13 +599,51 @@ class AllDebrid:
         self._authenticated = False
         self.proxy = proxy
         self.auth_header = {"Authorization": "Bearer " + apikey}
-        self.base_url = API_HOST
+        self.base_url = base_url or API_HOST
         self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter
+        self.dispatcher = dispatcher
+        self.hedge_policy = hedge_policy
+        if hedge_policy is not None:
+            hedge_policy.size_for(pool_maxsize)
+        self.dns_cache = dns_cache if dns_cache is not None else DNSCache()
         
-        self.session = requests.Session()
+        self._keep_alive: Optional[threading.Event] = None
+        self._own_transport = transport is None
+        self.transport = transport if transport is not None else RequestsTransport(pool_maxsize, proxy, self.dns_cache)
 
         self.endpoints = get_endpoints()
 
+        _instances.add(self)
+
+    def __getstate__(self) -> dict:
+        return {
+            "apikey": self.apikey,
+            "proxy": self.proxy,
+            "timeout": self.timeout,
+            "pool_maxsize": self.pool_maxsize,
+            "rate_limiter": self.rate_limiter,
+            "base_url": self.base_url,
+            "transport": None if self._own_transport else self.transport,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def _reset_after_fork(self) -> None:
+        # The inherited sockets belong to the parent; drop them without closing so the parent's
+        # connections are left intact.
+        self.transport.reset_after_fork()
+        self._keep_alive = None
+
+    @property
+    def session(self) -> Optional[requests.Session]:
+        """
+        The requests session of the default transport, or None if it is closed or another transport is used.
+        """
+        return getattr(self.transport, "session", None)
+
     def ping(self) -> dict[str, Any]:
         """
         Makes a request to the ping endpoint.
@@ -646,7 +912,7 @@ class AllDebrid:
         
         return response
 
-    def upload_magnets(self, magnets: List[str]) -> dict:
+    def upload_magnets(self, magnets: List[str], deduplicate: bool = False) -> dict:
         """
         Makes a request to the upload magnets endpoint.
 
@@ -654,6 +920,8 @@ class AllDebrid:
         ----------
         magnets : List[str]
             The magnets to upload.
+        deduplicate : bool, optional
+            Send each info-hash only once and map the results back onto every input, by default False
 
         Returns
         -------
@@ -674,6 +942,13 @@ class AllDebrid:
         if endpoint is None:
             raise ValueError("Endpoint not found for Upload magnets")
 
+        batch = None
+        if deduplicate:
+            batch = normalize_magnets(magnets)
+            if not batch.hashes:
+                raise ValueError("No valid magnets found for upload magnets")
+            magnets = batch.representatives
+
         data = {
             "magnets": magnets,
         }
@@ -686,6 +961,9 @@ class AllDebrid:
                 raise ValueError("API key is required for this endpoint")
             raise APIError(error["code"], error["message"])
         
+        if batch is not None:
+            response["data"]["magnets"] = self._expand_magnets(batch, response["data"]["magnets"])
+
         return response
 
     def upload_file(self, file_paths: List[str]) -> dict:
@@ -715,15 +993,23 @@ class AllDebrid:
         for i, file_path in enumerate(file_paths):
             if not isinstance(file_path, str) or not os.path.isfile(file_path):
                 raise ValueError(f"File path is not valid. ({i}: {file_path})")
-            
+
+        uploads = []
+        for file_path in file_paths:
+            with open(file_path, 'rb') as file:
+                uploads.append((file.name, file.read()))
+
+        return self._upload_files(uploads)
+
+    def _upload_files(self, uploads: List[Tuple[str, bytes]]) -> dict:
+        """
+        Sends torrent files to the upload file endpoint in one multipart request, as files[0], files[1], ...
+        """
         endpoint = self.endpoints.get("upload file")
         if not endpoint:
             raise ValueError("Endpoint not found for Upload file")
-        
-        files = {}
-        for i, file_path in enumerate(file_paths):
-            with open(file_path, 'rb') as file:
-                files[f"files[{i}]"] = (file.name, file.read(), 'application/x-bittorrent')
+
+        files = {f"files[{i}]": (name, payload, 'application/x-bittorrent') for i, (name, payload) in enumerate(uploads)}
 
         response = self._request(method="POST", endpoint=endpoint, files=files)
 
@@ -733,6 +1019,68 @@ class AllDebrid:
         
         return response
 
+    def upload_torrents(self, torrents: List[Union[str, bytes]], as_magnets: bool = False) -> dict:
+        """
+        Uploads torrents, skipping the multipart upload for torrents that are already cached.
+
+        Notes
+        -----
+        Every torrent is parsed locally to compute its info-hash. All hashes are checked in one
+        check_magnet_instant call; instantly available torrents are then sent as magnet URIs through
+        upload_magnets, and only the remaining ones are uploaded as files.
+
+        Parameters
+        ----------
+        torrents : List[Union[str, bytes]]
+            Paths of .torrent files or raw .torrent payloads.
+        as_magnets : bool, optional
+            Send torrents that are not instantly available as magnet URIs too, by default False
+
+        Returns
+        -------
+        dict
+            A response shaped like the API responses, with the upload_magnets results under
+            "magnets" and the upload_file results under "files".
+
+        Raises
+        ------
+        ValueError
+            If no torrents are provided or a path is not valid.
+        BencodeError
+            If a payload is not a valid torrent.
+        APIError
+            If the API returns an error.
+        """
+        if not torrents:
+            raise ValueError(f"No torrents to upload. {torrents}")
+
+        infos = [parse_torrent(torrent) for torrent in torrents]
+
+        instant_response = self.check_magnet_instant([info.hash for info in infos])
+        instant = set()
+        for i, magnet in enumerate(instant_response.get("data", {}).get("magnets", [])):
+            if magnet.get("instant"):
+                instant.add((magnet.get("hash") or infos[i].hash).lower())
+
+        magnets, uploads = [], []
+        for torrent, info in zip(torrents, infos):
+            if as_magnets or info.hash in instant:
+                magnets.append(info.magnet_uri())
+            else:
+                payload = torrent
+                if info.source is not None:
+                    with open(info.source, 'rb') as file:
+                        payload = file.read()
+                uploads.append((os.path.basename(info.source or info.name + ".torrent"), payload))
+
+        data = {"magnets": [], "files": []}
+        if magnets:
+            data["magnets"] = self.upload_magnets(magnets)["data"]["magnets"]
+        if uploads:
+            data["files"] = self._upload_files(uploads)["data"]["files"]
+
+        return {"status": "success", "data": data}
+
     def get_magnet_status(self, magnet_id: int) -> dict:
         """
         Makes a request to the magnet status endpoint.
@@ -769,6 +1117,36 @@ class AllDebrid:
         
         return response
 
+    def iter_magnets(self, status: Optional[str] = None) -> Iterator[dict]:
+        """
+        Yields the magnets of the account one at a time, parsing the response as it arrives.
+
+        Unlike a full magnet status request, memory use does not grow with the number of magnets.
+        The request is sent when iteration starts and its connection is held until iteration ends.
+
+        Parameters
+        ----------
+        status : Optional[str], optional
+            Only magnets with this status: "active", "ready", "expired" or "error", by default all
+
+        Yields
+        ------
+        dict
+            The magnets, as the magnet status endpoint lists them.
+
+        Raises
+        ------
+        APIError
+            If the API returns an error.
+        ValueError
+            If the endpoint is not found.
+        """
+        endpoint = self.endpoints.get("status")
+        if not endpoint:
+            raise ValueError("Endpoint not found for Magnet status")
+
+        return self._iter_request(method="GET", endpoint=endpoint, path=("data", "magnets"), params={"status": status} if status else None)
+
     def delete_magnet(self, magnet_id: Optional[int] = None) -> dict:
         """
         Makes a request to the delete magnet endpoint.
@@ -851,7 +1229,130 @@ class AllDebrid:
         
         return response
 
-    def check_magnet_instant(self, magnets: Union[str, List[str]] = None) -> dict:
+    def delete_magnets(self, magnet_ids: Iterable[int], max_workers: int = 8) -> Dict[int, dict]:
+        """
+        Deletes many magnets concurrently, reporting the outcome of each.
+
+        The API deletes one magnet per request, so the requests are sent ``max_workers`` at a time. A
+        failed deletion fails only its own magnet.
+
+        Parameters
+        ----------
+        magnet_ids : Iterable[int]
+            The magnet ids to delete.
+        max_workers : int, optional
+            The number of requests sent at once, by default 8
+
+        Returns
+        -------
+        Dict[int, dict]
+            Per magnet id, its "status" ("success" or "error") and, on failure, the "error" code and message.
+        """
+        def send(magnet_id: int) -> Tuple[int, dict]:
+            try:
+                self.delete_magnet(magnet_id)
+            except (APIError, ValueError) as exc:
+                return magnet_id, {"status": "error", "error": _error_of(exc)}
+            return magnet_id, {"status": "success"}
+
+        return dict(self._map_concurrently(send, list(dict.fromkeys(magnet_ids)), max_workers))
+
+    def restart_magnets(self, magnet_ids: Iterable[int], chunk_size: int = 50, max_workers: int = 4) -> Dict[int, dict]:
+        """
+        Restarts many magnets in concurrent chunks, reporting the outcome of each.
+
+        If the API rejects a whole chunk, the chunk is split in halves and retried until the magnets
+        that cause the error are found, so one bad id does not fail the others. Errors that are not
+        about the ids (a bad API key, timeouts, HTTP errors) fail the chunk without splitting it.
+
+        Parameters
+        ----------
+        magnet_ids : Iterable[int]
+            The magnet ids to restart.
+        chunk_size : int, optional
+            The number of ids per request, by default 50
+        max_workers : int, optional
+            The number of requests sent at once, by default 4
+
+        Returns
+        -------
+        Dict[int, dict]
+            Per magnet id, its "status" ("success" or "error") and, on failure, the "error" code and message.
+
+        Raises
+        ------
+        ValueError
+            If chunk_size is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        def send(ids: List[int]) -> Dict[int, dict]:
+            try:
+                response = self.restart_magnet(ids=ids)
+            except APIError as exc:
+                # Only magnet errors (MAGNET_INVALID_ID, ...) may be caused by a single id; account-level
+                # errors and HTTP status codes would fail every half alike.
+                if len(ids) > 1 and isinstance(exc.code, str) and exc.code.startswith("MAGNET_"):
+                    middle = len(ids) // 2
+                    return {**send(ids[:middle]), **send(ids[middle:])}
+                return {magnet_id: {"status": "error", "error": _error_of(exc)} for magnet_id in ids}
+
+            outcomes = {magnet_id: {"status": "success"} for magnet_id in ids}
+            by_text = {str(magnet_id): magnet_id for magnet_id in ids}
+            for item in (response.get("data") or {}).get("magnets") or []:
+                magnet_id = by_text.get(str(item.get("magnet", item.get("id"))))
+                if magnet_id is not None and "error" in item:
+                    outcomes[magnet_id] = {"status": "error", "error": item["error"]}
+            return outcomes
+
+        ids = list(dict.fromkeys(magnet_ids))
+        results: Dict[int, dict] = {}
+        for outcomes in self._map_concurrently(send, [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)], max_workers):
+            results.update(outcomes)
+        return results
+
+    def cleanup_magnets(self, predicate: Callable[[dict], bool], action: str = "delete", status: Optional[str] = None, max_workers: int = 8) -> Dict[int, dict]:
+        """
+        Deletes or restarts every magnet matching a predicate, from a single status listing.
+
+        Parameters
+        ----------
+        predicate : Callable[[dict], bool]
+            Called with each magnet as the magnet status endpoint lists it; true selects the magnet.
+        action : str, optional
+            "delete" or "restart", by default "delete"
+        status : Optional[str], optional
+            Only list magnets with this status: "active", "ready", "expired" or "error", by default all
+        max_workers : int, optional
+            The number of requests sent at once, by default 8
+
+        Returns
+        -------
+        Dict[int, dict]
+            Per selected magnet id, the outcome as for delete_magnets or restart_magnets.
+
+        Raises
+        ------
+        ValueError
+            If the action is unknown.
+        APIError
+            If the magnets cannot be listed.
+
+        Examples
+        --------
+        >>> ad.cleanup_magnets(lambda magnet: magnet["statusCode"] >= 5, status="error")
+        {101: {'status': 'success'}, 102: {'status': 'success'}}
+        """
+        if action not in ("delete", "restart"):
+            raise ValueError(f"Unknown cleanup action: {action}")
+
+        selected = [magnet["id"] for magnet in self.iter_magnets(status=status) if predicate(magnet)]
+        if action == "delete":
+            return self.delete_magnets(selected, max_workers=max_workers)
+        return self.restart_magnets(selected, max_workers=max_workers)
+
+    def check_magnet_instant(self, magnets: Union[str, List[str]] = None, deduplicate: bool = False) -> dict:
         """
         Check instant availability of magnets.
 
@@ -859,6 +1360,9 @@ class AllDebrid:
         ----------
         magnets: Union[str, List[str]]
             Magnets to check.
+        deduplicate: bool
+            Send each canonical info-hash only once instead of the full magnet URIs and map the
+            results back onto every input, by default False.
 
         Returns
         -------
@@ -882,12 +1386,22 @@ class AllDebrid:
         if isinstance(magnets, str):
             magnets = [magnets]
         
+        batch = None
+        if deduplicate:
+            batch = normalize_magnets(magnets)
+            if not batch.hashes:
+                raise ValueError("No valid magnets to check")
+            magnets = batch.hashes
+
         response = self._request(method="POST", endpoint=endpoint, magnets=magnets)
 
         if response.get("status") == "error":
             error = response["error"]
             raise APIError(error["code"], error["message"])
         
+        if batch is not None:
+            response["data"]["magnets"] = self._expand_magnets(batch, response["data"]["magnets"])
+
         return response
     
     def saved_links(self) -> dict:
@@ -911,15 +1425,40 @@ class AllDebrid:
             raise ValueError("Endpoint not found for saved links")
         
         response = self._request(method="GET", endpoint=endpoint)
-        if not response["data"]["links"]:
-            return {}
-        
         if response.get("status") == "error":
             error = response["error"]
             raise APIError(error["code"], error["message"])
         
+        if not response["data"]["links"]:
+            return {}
+        
         return response
 
+    def iter_saved_links(self) -> Iterator[dict]:
+        """
+        Yields the links saved in the account one at a time, parsing the response as it arrives.
+
+        Unlike saved_links, memory use does not grow with the number of links. The request is sent
+        when iteration starts and its connection is held until iteration ends.
+
+        Yields
+        ------
+        dict
+            The saved links.
+
+        Raises
+        ------
+        APIError
+            If request is unsuccessful.
+        ValueError
+            If endpoint is not found.
+        """
+        endpoint = self.endpoints.get("saved links")
+        if not endpoint:
+            raise ValueError("Endpoint not found for saved links")
+
+        return self._iter_request(method="GET", endpoint=endpoint, path=("data", "links"))
+
     def save_new_link(self, link: Union[str, List[str]]) -> dict:
         """
         Save a new link.
@@ -989,6 +1528,67 @@ class AllDebrid:
         
         return response
 
+    def reconcile_saved_links(self, desired: Iterable[str], delete: bool = True, chunk_size: int = 100, max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Makes the saved links match a desired set, sending only the difference.
+
+        The saved links are fetched once; the links missing from them are saved and, if ``delete`` is
+        set, the saved links not desired are deleted, in chunks of ``chunk_size`` links sent concurrently.
+        A failed chunk fails only its own links.
+
+        Parameters
+        ----------
+        desired : Iterable[str]
+            The links that should be saved.
+        delete : bool, optional
+            Whether to delete saved links that are not desired, by default True
+        chunk_size : int, optional
+            The number of links per save or delete request, by default 100
+        max_workers : int, optional
+            The number of requests sent at once, by default 4
+
+        Returns
+        -------
+        Dict[str, Any]
+            "unchanged", the number of desired links already saved, and "links", mapping every saved or
+            deleted link to its "action" ("save" or "delete"), its "status" ("success" or "error") and,
+            on failure, the "error" code and message.
+
+        Raises
+        ------
+        ValueError
+            If chunk_size is not positive.
+        APIError
+            If the saved links cannot be fetched.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        desired = list(dict.fromkeys(desired))
+        current = {item["link"] for item in (self.saved_links().get("data") or {}).get("links") or []}
+        to_save = [link for link in desired if link not in current]
+        to_delete = sorted(current.difference(desired)) if delete else []
+
+        work = [("save", to_save[i:i + chunk_size]) for i in range(0, len(to_save), chunk_size)]
+        work += [("delete", to_delete[i:i + chunk_size]) for i in range(0, len(to_delete), chunk_size)]
+
+        def send(chunk: Tuple[str, List[str]]) -> Dict[str, dict]:
+            action, links = chunk
+            try:
+                if action == "save":
+                    self.save_new_link(links)
+                else:
+                    self.delete_saved_link(links)
+            except (APIError, ValueError) as exc:
+                return {link: {"action": action, "status": "error", "error": _error_of(exc)} for link in links}
+            return {link: {"action": action, "status": "success"} for link in links}
+
+        results: Dict[str, dict] = {}
+        for outcomes in self._map_concurrently(send, work, max_workers):
+            results.update(outcomes)
+
+        return {"unchanged": len(desired) - len(to_save), "links": results}
+
     def recent_links(self) -> dict:
         """
         Get recent links.
@@ -1015,6 +1615,29 @@ class AllDebrid:
         
         return response
 
+    def iter_recent_links(self) -> Iterator[dict]:
+        """
+        Yields the recent links one at a time, parsing the response as it arrives.
+
+        Unlike recent_links, memory use does not grow with the number of links. The request is sent
+        when iteration starts and its connection is held until iteration ends.
+
+        Yields
+        ------
+        dict
+            The recent links.
+
+        Raises
+        ------
+        APIError
+            If any error occurred while getting recent links.
+        """
+        endpoint = self.endpoints.get("recent links")
+        if not endpoint:
+            raise ValueError("Endpoint not found for recent links.")
+
+        return self._iter_request(method="GET", endpoint=endpoint, path=("data", "links"))
+
     def purge_recent_links(self) -> dict:
         """
         Purge all the recent links.
@@ -1044,7 +1667,7 @@ class AllDebrid:
         return response
     
     @handle_exceptions(exceptions=(ValueError, APIError))
-    def get_direct_stream_link(self, link: Union[str, List[str]]) -> Union[str, None]:
+    def get_direct_stream_link(self, link: Union[str, List[str]], deadline: Union[Deadline, float, None] = None, policy: Optional[StreamPolicy] = None, candidates: int = 1, scheduler: Any = None) -> Union[str, None]:
         """
         Wrapper for streaming links.
 
@@ -1052,6 +1675,17 @@ class AllDebrid:
         ----------
         link : Union[str, List[str]]
             The link to the video to be streamed.
+        deadline : Union[Deadline, float, None], optional
+            A Deadline or a number of seconds for the whole call, across all links. Every request's
+            timeout is shrunk to the time left and polling stops once it cannot finish in time, by default None
+        policy : Optional[StreamPolicy], optional
+            Chooses the stream variant by quality, bitrate, format or size, by default the highest quality
+        candidates : int, optional
+            How many of the best variants to request at once; the first one ready is returned, which
+            shortens the wait when the preferred variant is slow to generate, by default 1
+        scheduler : Optional[PollScheduler], optional
+            Waits for the delayed links on a shared PollScheduler instead of sleeping threads; several
+            links are then all started before any is waited for, by default None
 
         Returns
         -------
@@ -1064,12 +1698,15 @@ class AllDebrid:
             If the endpoint is not found.
         APIError
             If the API returns an error.
+        DeadlineExceeded
+            If the deadline passes first.
         """
         self.validate_input(link)
 
         links = [link] if isinstance(link, str) else link
 
-        direct_links = self.get_direct_links(links, StreamLinkProcessor(self))
+        processor = StreamLinkProcessor(self, scheduler=scheduler, policy=policy, candidates=candidates)
+        direct_links = self.get_direct_links(links, processor, deadline=deadline)
 
         return direct_links[0] if len(direct_links) == 1 else direct_links
 
@@ -1089,7 +1726,7 @@ class AllDebrid:
         if not isinstance(link, (str, list)):
             raise ValueError("Link must be a string or list of strings.")
 
-    def get_direct_links(self, links: List[str], processor: StreamLinkProcessor) -> List[str]:
+    def get_direct_links(self, links: List[str], processor: StreamLinkProcessor, deadline: Union[Deadline, float, None] = None) -> List[str]:
         """
         Given a list of links and a StreamLinkProcessor object, returns a list of delayed links
         that have been processed into direct links.
@@ -1098,13 +1735,19 @@ class AllDebrid:
             links (List[str]): A list of delayed links to be processed.
             processor (StreamLinkProcessor): A StreamLinkProcessor object with a method\n            `get_delayed_link(link: str) -> str` that converts delayed links to direct
                 links.
+            deadline (Union[Deadline, float, None]): A Deadline or a number of seconds shared by all the links.
 
         Returns:
             List[str]: A list of processed direct links.
         """
         direct_links = []
-        for link in links:
-            delayed_link = processor.get_delayed_link(link)
+        with Deadline.coerce(deadline) or nullcontext():
+            if getattr(processor, "scheduler", None) is not None:
+                # Start every link first, so their delayed links are generated side by side.
+                delayed_links = [future.result() for future in [processor.submit(link) for link in links]]
+            else:
+                delayed_links = [processor.get_delayed_link(link) for link in links]
+        for delayed_link in delayed_links:
             if delayed_link is not None:
                 direct_links.append(delayed_link)
 
@@ -1142,22 +1785,10 @@ class AllDebrid:
         
         self._authenticated = True
         
-    def _get_session(self):
-        if self.session is None:
-            self.session = requests.Session()
-
-            self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=50))
-            self.session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=50))
-
-            if self.proxy is not None:
-                self.session.proxies = {"http": self.proxy, "https": self.proxy}
-
-        return self.session
-    
     def _build_url(self, endpoint: str, agent: str) -> str:
-        return API_HOST + endpoint + "?agent=" + agent
+        return self.base_url + endpoint + "?agent=" + agent
     
-    def _build_data(self, magnets: Optional[str], links: Optional[str]) -> dict:
+    def _build_data(self, magnets: Optional[str], links: Optional[str]) -> Optional[dict]:
         magnets = magnets or []
         links = links or []
 
@@ -1167,16 +1798,87 @@ class AllDebrid:
         if isinstance(links, str):
             links = [links]
 
+        if not magnets and not links:
+            # An empty form would still be sent as a chunked body, which breaks keep-alive on strict servers.
+            return None
+
         data = {'magnets[]': magnets} if magnets else {'links[]': links}
 
         return data
     
-    def _handle_error(self, response: requests.Response, exc: requests.exceptions.RequestException, status_code: int = 408, message: str = None) -> None:
+    def _expand_magnets(self, batch: MagnetBatch, results: List[dict]) -> List[dict]:
+        """
+        Maps the per-hash results of a deduplicated magnet request back onto the original inputs.
+        Invalid inputs get the error entry the API would have returned for them. Raises ValueError if the API did
+        not answer one result per unique hash.
+        """
+        error = {"code": "MAGNET_INVALID_URI", "message": apiErrors["MAGNET_INVALID_URI"]}
+        expanded = batch.expand(results, wrap=lambda result, magnet: dict(result, magnet=magnet))
+        return [
+            entry if entry is not None else {"magnet": magnet, "error": dict(error)}
+            for entry, magnet in zip(expanded, batch.magnets)
+        ]
+
+    def _handle_error(self, response: Optional[TransportResponse], exc: Exception, status_code: int = 408, message: str = None) -> None:
         if response is not None:
             raise APIError(response.status_code, response.text) from exc
         else:
             raise APIError(status_code, message) from exc
     
+    def _map_concurrently(self, func: Callable[[Any], Any], items: List[Any], max_workers: int) -> List[Any]:
+        # Copy the context so every request keeps the caller's priority and deadline.
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+            return [future.result() for future in futures]
+
+    def _iter_request(self, method: str, endpoint: str, path: Tuple[str, ...], params: Optional[dict] = None, agent: str = "python") -> Iterator[Any]:
+        # Streaming counterpart of _request: the rate limiter and dispatcher are passed as in _dispatch,
+        # but the dispatcher slot is held until the body has been read. Streams are never hedged.
+        if not self._authenticated:
+            self._authenticate()
+
+        url = self._build_url(endpoint, agent)
+        transport = self.transport
+        timeout = self.timeout if self.timeout is not None else 10
+        deadline = current_deadline()
+        if self.rate_limiter is not None:
+            if not self.rate_limiter.acquire(timeout=None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for the rate limiter.")
+
+        dispatcher = self.dispatcher
+        if dispatcher is not None:
+            if not dispatcher.acquire(timeout=None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for a dispatch slot.")
+        try:
+            if deadline is not None:
+                timeout = deadline.timeout(timeout)
+            try:
+                response = transport.stream(method, url, headers=self.auth_header, params=params, timeout=timeout)
+            except TransportError as exc:
+                self._handle_error(None, exc, message=str(exc))
+
+            with response:
+                if response.status_code != 200:
+                    raise APIError(response.status_code, response.read().decode("utf-8", errors="replace"))
+                items = JSONItemStream(response, path)
+                try:
+                    yield from items
+                except TransportError as exc:
+                    self._handle_error(None, exc, message=str(exc))
+
+            if items.envelope.get("status") == "error":
+                error = items.envelope.get("error") or {}
+                raise APIError(error.get("code"), error.get("message"))
+        except APIError as exc:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Deadline exceeded during the request.") from exc
+            raise
+        finally:
+            if dispatcher is not None:
+                dispatcher.release()
+
     def _send_request(
             self,
             method: str,
@@ -1186,7 +1888,7 @@ class AllDebrid:
             params: dict,
             files: dict,
             timeout: int,
-            session: requests.Session,
+            transport: Transport,
             expected_response: List[int] = None,
         ) -> dict:
         if expected_response is None:
@@ -1195,36 +1897,88 @@ class AllDebrid:
         if not method or not url:
             raise ValueError("Method and URL are required.")
 
-        common_params = {
-            'headers': auth_header,
-            'params': params,
-            'files': files,
-            'timeout': timeout
-        }
-        response = None
-
         try:
-            response = session.request(
+            response = transport.request(
                 method=method,
                 url=url,
+                headers=auth_header,
+                params=params,
                 data=data,
-                **common_params
+                files=files,
+                timeout=timeout,
             )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as exc:
-            self._handle_error(response, exc)
+        except TransportError as exc:
+            self._handle_error(None, exc, message=str(exc))
 
-        if response is not None and response.status_code not in expected_response:
+        if response.status_code not in expected_response:
             raise APIError(response.status_code, response.text)
 
         return response.json()
     
+    def warm_up(self, n_connections: int = 4, keep_alive: Optional[float] = None) -> None:
+        """
+        Resolves the API host and opens keep-alive connections before traffic arrives.
+
+        Sends ``n_connections`` concurrent pings so that many connections are left open in the pool,
+        which takes the DNS lookup and connection setup off the first real requests. Meant to be
+        called from a readiness check; it raises if the API cannot be reached.
+
+        Parameters
+        ----------
+        n_connections : int, optional
+            The number of connections to open, at most pool_maxsize, by default 4
+        keep_alive : Optional[float], optional
+            If given, pings over the same number of connections every ``keep_alive`` seconds in a
+            background thread at LOW priority, so idle connections are not dropped by the server.
+            Stop it with stop_keep_alive, by default None
+
+        Raises
+        ------
+        APIError
+            If a ping fails.
+        """
+        n_connections = max(1, min(n_connections, self.pool_maxsize))
+        host = requests.utils.urlparse(self.base_url)
+        self.dns_cache.resolve(host.hostname, host.port or (443 if host.scheme == "https" else 80))
+        self._ping_concurrently(n_connections)
+
+        if keep_alive is not None:
+            self.stop_keep_alive()
+            stop = self._keep_alive = threading.Event()
+            threading.Thread(target=self._keep_alive_loop, args=(stop, n_connections, keep_alive), name="alldebrid-keep-alive", daemon=True).start()
+
+    def stop_keep_alive(self) -> None:
+        """
+        Stops the background keep-alive started by warm_up, if any.
+        """
+        stop, self._keep_alive = self._keep_alive, None
+        if stop is not None:
+            stop.set()
+
+    def _ping_concurrently(self, n_connections: int) -> None:
+        with ThreadPoolExecutor(max_workers=n_connections) as executor:
+            # Copy the context so the pings keep the caller's priority.
+            for future in [executor.submit(contextvars.copy_context().run, self.ping) for _ in range(n_connections)]:
+                future.result()
+
+    def _keep_alive_loop(self, stop: threading.Event, n_connections: int, interval: float) -> None:
+        while not stop.wait(interval):
+            try:
+                with request_priority(LOW):
+                    self._ping_concurrently(n_connections)
+            except Exception: # pylint: disable=W0703
+                # A failed ping only means the next request opens a fresh connection.
+                pass
+
     def close_connection(self):
         """
         Close the connection to the API.
+
+        Safe to call while other threads are making requests: their in-flight requests complete on
+        the old connections and the next request opens new ones. Stops the background keep-alive.
         """
-        if self.session is not None:
-            self.session.close()
+        self.stop_keep_alive()
+        self.transport.close()
                 
     def _request(
             self,
@@ -1265,18 +2019,48 @@ class AllDebrid:
 
         url = self._build_url(endpoint, agent)
         data = self._build_data(magnets, links)
-        session = self._get_session()
+        transport = self.transport
         timeout = self.timeout if self.timeout is not None else 10
 
-        response = self._send_request(
-            method=method,
-            url=url,
-            auth_header=self.auth_header,
-            data=data,
-            params=params,
-            files=files,
-            timeout=timeout,
-            session=session,
-        )
+        def send() -> dict:
+            return self._dispatch(method, url, data, params, files, timeout, transport)
+
+        hedge_policy = self.hedge_policy
+        if hedge_policy is not None and hedge_policy.applies(method, endpoint):
+            response = hedge_policy.execute(endpoint, send)
+        else:
+            response = send()
 
         return response
+
+    def _dispatch(self, method: str, url: str, data: Optional[dict], params: Optional[dict], files: Optional[dict], timeout: int, transport: Transport) -> dict:
+        # One attempt at a request; a hedged request dispatches twice, each attempt taking its own slot.
+        deadline = current_deadline()
+        if self.rate_limiter is not None:
+            if not self.rate_limiter.acquire(timeout=None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for the rate limiter.")
+
+        dispatcher = self.dispatcher
+        if dispatcher is not None:
+            if not dispatcher.acquire(timeout=None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for a dispatch slot.")
+        try:
+            if deadline is not None:
+                timeout = deadline.timeout(timeout)
+            return self._send_request(
+                method=method,
+                url=url,
+                auth_header=self.auth_header,
+                data=data,
+                params=params,
+                files=files,
+                timeout=timeout,
+                transport=transport,
+            )
+        except APIError as exc:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Deadline exceeded during the request.") from exc
+            raise
+        finally:
+            if dispatcher is not None:
+                dispatcher.release()
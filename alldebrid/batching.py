@@ -0,0 +1,185 @@
+#pylint: disable=C0301
+"""
+Micro-batching of single-item calls into batched API requests.
+
+Many threads calling check_magnet_instant with one magnet each produce a flood of tiny requests, although the endpoint accepts a list. The BatchAggregator collects the single-item calls that arrive within a short window (or until a batch is full), sends them as one request through the client's list-accepting method and resolves each caller's future with its own item of the response.
+
+The unlock endpoint takes one link per request, so unlocks are not merged: download_link sends each link as its own request on the aggregator's worker pool, so callers still get a future without a thread of their own.
+
+Classes
+-------
+BatchAggregator
+    Merges single-item calls into batched requests.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.batching import BatchAggregator
+>>> batcher = BatchAggregator(AllDebrid(apikey="YOUR_API_KEY"), max_batch=50, max_wait=0.005)
+>>> batcher.check_magnet_instant("magnet:?xt=urn:btih:...").result()
+{'magnet': 'magnet:?xt=urn:btih:...', 'hash': '...', 'instant': True}
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+from .alldebrid import APIError
+
+class _Batcher:
+    """
+    Collects items for one endpoint and hands full or expired batches to the worker pool.
+    """
+
+    def __init__(self, name: str, send: Callable[[List[str]], List[Any]], max_batch: int, max_wait: float, executor: ThreadPoolExecutor) -> None:
+        self.send = send
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.executor = executor
+        self._pending: Dict[str, List[Future]] = {}
+        self._first_at = 0.0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"alldebrid-batch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: str) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchAggregator is closed")
+            if not self._pending:
+                self._first_at = time.monotonic()
+            # Identical items in the same window share one slot of the batch.
+            self._pending.setdefault(item, []).append(future)
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = self._first_at + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take()
+            self.executor.submit(self._dispatch, batch)
+
+    def _take(self) -> List[Tuple[str, List[Future]]]:
+        items = list(self._pending.items())
+        batch, rest = items[:self.max_batch], items[self.max_batch:]
+        self._pending = dict(rest)
+        self._first_at = time.monotonic()
+        return batch
+
+    def _dispatch(self, batch: List[Tuple[str, List[Future]]]) -> None:
+        try:
+            results = self.send([item for item, _ in batch])
+        except Exception as exc:  # pylint: disable=W0703
+            for _, futures in batch:
+                for future in futures:
+                    future.set_exception(exc)
+            return
+        for (_, futures), result in zip(batch, results):
+            for future in futures:
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+def _item_result(entry: Any) -> Any:
+    if isinstance(entry, dict) and isinstance(entry.get("error"), dict):
+        error = entry["error"]
+        return APIError(error.get("code"), error.get("message"))
+    return entry
+
+class BatchAggregator:
+    """
+    Merges single-item calls into batched requests.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client used to send the batches.
+    max_batch : int, optional
+        The maximum number of items per request, by default 50
+    max_wait : float, optional
+        How long the first item of a batch waits for others to join, in seconds, by default 0.005
+    workers : int, optional
+        The number of requests sent concurrently, by default 4
+    """
+
+    def __init__(self, client: Any, max_batch: int = 50, max_wait: float = 0.005, workers: int = 4) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alldebrid-batch")
+        self._instant = _Batcher("instant", self._send_instant, max_batch, max_wait, self._executor)
+        # link/unlock answers one link per request: dispatch every link on its own, concurrently.
+        self._unlock = _Batcher("unlock", self._send_unlock, 1, max_wait, self._executor)
+
+    def check_magnet_instant(self, magnet: str) -> Future:
+        """
+        Queues one magnet for a batched instant availability check.
+
+        Parameters
+        ----------
+        magnet : str
+            The magnet to check.
+
+        Returns
+        -------
+        Future
+            Resolves to the magnet's entry of the API response, or fails with APIError.
+        """
+        return self._instant.submit(magnet)
+
+    def download_link(self, link: str) -> Future:
+        """
+        Queues one link for an unlock on the worker pool, sent as its own request.
+
+        Parameters
+        ----------
+        link : str
+            The link to unlock.
+
+        Returns
+        -------
+        Future
+            Resolves to the link's "data" entry of the API response, or fails with APIError.
+        """
+        return self._unlock.submit(link)
+
+    def close(self) -> None:
+        """
+        Sends what is still queued and stops the aggregator.
+        """
+        self._instant.close()
+        self._unlock.close()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "BatchAggregator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _send_instant(self, magnets: List[str]) -> List[Any]:
+        entries = self.client.check_magnet_instant(magnets)["data"]["magnets"]
+        if len(entries) != len(magnets):
+            raise APIError("GENERIC", f"Expected {len(magnets)} magnets in the response, got {len(entries)}")
+        return [_item_result(entry) for entry in entries]
+
+    def _send_unlock(self, links: List[str]) -> List[Any]:
+        return [self.client.download_link(link)["data"] for link in links]
@@ -0,0 +1,237 @@
+#pylint: disable=C0301
+"""
+Command-line interface for the AllDebrid client.
+
+Each subcommand reads its inputs (links, magnets or magnet IDs) one per line from files or standard input, sends them through one shared client with up to ``-j`` requests in flight, and writes one JSON object per input to standard output as soon as its answer arrives. Inputs are read lazily and only a bounded window of them is in flight at once, so the CLI runs in constant memory on inputs of any size and fits into shell pipelines.
+
+Every output line carries the ``input`` it answers and mirrors the API's own envelope: ``{"input": ..., "status": "success", "data": ...}`` or ``{"input": ..., "status": "error", "error": {"code": ..., "message": ...}}``. Lines arrive in completion order, not input order. The exit status is 1 if any input failed.
+
+Functions
+---------
+- main(): Runs the command line, ``python -m alldebrid`` or ``alldebrid``.
+
+Examples
+--------
+.. code-block:: console
+
+    $ export ALLDEBRID_API_KEY=...
+    $ alldebrid -j 32 unlock links.txt > unlocked.ndjson
+    $ grep -h magnet: *.txt | alldebrid instant-check | jq -r 'select(.data.instant) | .input'
+    $ alldebrid magnet upload magnets.txt | jq -r .data.id | alldebrid magnet status
+    $ alldebrid history | jq -r .data.link
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+from .alldebrid import AllDebrid, APIError
+
+def read_inputs(paths: List[str], stdin: Optional[TextIO] = None) -> Iterator[str]:
+    """
+    Yields the non-empty lines of the given files, or of standard input if there are none.
+
+    Lines starting with "#" are skipped, and "-" stands for standard input.
+
+    Parameters
+    ----------
+    paths : List[str]
+        The input files.
+    stdin : Optional[TextIO], optional
+        The stream read for "-", by default sys.stdin
+
+    Yields
+    ------
+    str
+        The stripped lines.
+    """
+    for path in paths or ["-"]:
+        if path == "-":
+            lines: Iterable[str] = stdin if stdin is not None else sys.stdin
+            yield from _clean(lines)
+        else:
+            with open(path, encoding="utf-8") as file:
+                yield from _clean(file)
+
+def _clean(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _error(exc: Exception) -> Dict[str, str]:
+    if isinstance(exc, APIError):
+        return {"code": str(exc.code), "message": exc.message}
+    return {"code": type(exc).__name__, "message": str(exc)}
+
+def _item(value: str, item: Any) -> Dict[str, Any]:
+    # Batched endpoints report failures per item, inside an otherwise successful response.
+    if isinstance(item, dict) and "error" in item:
+        return {"input": value, "status": "error", "error": item["error"]}
+    return {"input": value, "status": "success", "data": item}
+
+class _Writer:
+    """
+    Writes records as NDJSON lines from several threads, counting the failures.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.failed += record.get("status") == "error"
+            self.stream.write(line)
+            self.stream.flush()
+
+def _run(tasks: Iterable[Any], work: Callable[[Any], List[Dict[str, Any]]], writer: _Writer, jobs: int) -> None:
+    # Keep a bounded window of tasks in flight so inputs are read only as fast as they are answered.
+    window = jobs * 4
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    pending: Set[Future] = set()
+
+    def drain(until: int) -> None:
+        nonlocal pending
+        while len(pending) > until:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for record in future.result():
+                    writer.write(record)
+
+    try:
+        for task in tasks:
+            pending.add(executor.submit(work, task))
+            drain(window - 1)
+        drain(0)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _per_item(call: Callable[[str], Any]) -> Callable[[str], List[Dict[str, Any]]]:
+    def work(value: str) -> List[Dict[str, Any]]:
+        try:
+            return [{"input": value, "status": "success", "data": call(value)}]
+        except Exception as exc: # pylint: disable=W0703
+            return [{"input": value, "status": "error", "error": _error(exc)}]
+    return work
+
+def _per_batch(call: Callable[[List[str]], List[Any]]) -> Callable[[List[str]], List[Dict[str, Any]]]:
+    def work(values: List[str]) -> List[Dict[str, Any]]:
+        try:
+            items = call(values)
+        except Exception as exc: # pylint: disable=W0703
+            return [{"input": value, "status": "error", "error": _error(exc)} for value in values]
+        return [_item(value, item) for value, item in zip(values, items)]
+    return work
+
+def _unlock(client: AllDebrid, args: argparse.Namespace, writer: _Writer) -> None:
+    work = _per_item(lambda link: client.download_link(link, password=args.password)["data"])
+    _run(read_inputs(args.inputs), work, writer, args.jobs)
+
+def _instant_check(client: AllDebrid, args: argparse.Namespace, writer: _Writer) -> None:
+    work = _per_batch(lambda magnets: client.check_magnet_instant(magnets, deduplicate=True)["data"]["magnets"])
+    _run(_chunks(read_inputs(args.inputs), args.batch), work, writer, args.jobs)
+
+def _magnet_upload(client: AllDebrid, args: argparse.Namespace, writer: _Writer) -> None:
+    work = _per_batch(lambda magnets: client.upload_magnets(magnets, deduplicate=True)["data"]["magnets"])
+    _run(_chunks(read_inputs(args.inputs), args.batch), work, writer, args.jobs)
+
+def _magnet_status(client: AllDebrid, args: argparse.Namespace, writer: _Writer) -> None:
+    work = _per_item(lambda magnet_id: client.get_magnet_status(magnet_id)["data"]["magnets"])
+    _run(read_inputs(args.inputs), work, writer, args.jobs)
+
+def _listing(call: Callable[[AllDebrid], dict]) -> Callable[[AllDebrid, argparse.Namespace, _Writer], None]:
+    def command(client: AllDebrid, args: argparse.Namespace, writer: _Writer) -> None: # pylint: disable=W0613
+        try:
+            response = call(client)
+        except Exception as exc: # pylint: disable=W0703
+            writer.write({"input": None, "status": "error", "error": _error(exc)})
+            return
+        for link in (response.get("data") or {}).get("links") or []:
+            writer.write({"input": link.get("link"), "status": "success", "data": link})
+    return command
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="alldebrid", description="Batch client for the AllDebrid API. Reads one input per line from the given files or standard input and writes one JSON result per line as results arrive.")
+    parser.add_argument("--apikey", default=os.getenv("ALLDEBRID_API_KEY"), help="the API key (default $ALLDEBRID_API_KEY)")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="requests in flight at once (default 8)")
+    parser.add_argument("--timeout", type=float, default=None, help="per-request timeout in seconds (default 10)")
+    parser.add_argument("--proxy", default=None, help="the proxy to send requests through")
+    parser.add_argument("--base-url", default=None, help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    def inputs(command: argparse.ArgumentParser, what: str) -> None:
+        command.add_argument("inputs", nargs="*", metavar="FILE", help=f"files with one {what} per line; standard input if none or -")
+
+    unlock = commands.add_parser("unlock", help="unlock links")
+    inputs(unlock, "link")
+    unlock.add_argument("--password", default=None, help="the password of the links")
+    unlock.set_defaults(run=_unlock)
+
+    instant = commands.add_parser("instant-check", help="check whether magnets are instantly available")
+    inputs(instant, "magnet")
+    instant.add_argument("--batch", type=int, default=100, help="magnets per request (default 100)")
+    instant.set_defaults(run=_instant_check)
+
+    magnet = commands.add_parser("magnet", help="upload magnets or check their status")
+    magnet_commands = magnet.add_subparsers(dest="magnet_command", metavar="command", required=True)
+    upload = magnet_commands.add_parser("upload", help="upload magnets")
+    inputs(upload, "magnet")
+    upload.add_argument("--batch", type=int, default=100, help="magnets per request (default 100)")
+    upload.set_defaults(run=_magnet_upload)
+    status = magnet_commands.add_parser("status", help="get the status of magnets")
+    inputs(status, "magnet ID")
+    status.set_defaults(run=_magnet_status)
+
+    history = commands.add_parser("history", help="list the recently unlocked links")
+    history.set_defaults(run=_listing(lambda client: client.recent_links()))
+    saved = commands.add_parser("saved", help="list the saved links")
+    saved.set_defaults(run=_listing(lambda client: client.saved_links()))
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the command line.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        The command-line arguments, by default sys.argv[1:]
+
+    Returns
+    -------
+    int
+        The exit status: 0 if every input succeeded, 1 if any failed, 2 on usage errors.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.apikey:
+        parser.error("an API key is required: pass --apikey or set ALLDEBRID_API_KEY")
+    if args.jobs < 1:
+        parser.error("-j must be at least 1")
+
+    client = AllDebrid(apikey=args.apikey, proxy=args.proxy, timeout=args.timeout, pool_maxsize=max(args.jobs, 10), base_url=args.base_url)
+    writer = _Writer(sys.stdout)
+    try:
+        args.run(client, args, writer)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly like other filters do.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    finally:
+        client.close_connection()
+    return 1 if writer.failed else 0
@@ -0,0 +1,146 @@
+#pylint: disable=C0301
+"""
+End-to-end deadlines for AllDebrid calls.
+
+A Deadline is a time budget shared by every request made while it is active. Each request's timeout is shrunk to the time left, and polling flows such as get_direct_stream_link stop as soon as they can no longer finish in time, instead of running a fixed number of attempts with a fixed timeout each.
+
+The active deadline is kept in a context variable, so it applies to every request made inside a ``with Deadline(...)`` block, including those made by the client's hedging threads. Nested deadlines never extend an outer one.
+
+Classes
+-------
+Deadline
+    A point in time by which a call or a group of calls must finish.
+
+Functions
+---------
+- current_deadline(): Returns the deadline active in the current context, if any.
+
+Exceptions
+----------
+DeadlineExceeded
+    Raised when a deadline has passed or cannot be met.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.deadline import Deadline
+>>> ad = AllDebrid(apikey="YOUR_API_KEY")
+>>> ad.get_direct_stream_link("https://host.example/video", deadline=20)
+>>> with Deadline(5):
+...     ad.user()
+...     ad.saved_links()
+"""
+import contextvars
+import time
+from typing import Callable, Optional, Union
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a deadline has passed or cannot be met.
+    """
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("alldebrid_deadline", default=None)
+# The reset tokens of the deadlines entered in the current context, innermost last. They are kept per
+# context rather than on the Deadline, so one deadline can be entered from several threads at once.
+_tokens: contextvars.ContextVar = contextvars.ContextVar("alldebrid_deadline_tokens", default=())
+
+def current_deadline() -> Optional["Deadline"]:
+    """
+    Returns the deadline active in the current context, if any.
+
+    Returns
+    -------
+    Optional[Deadline]
+        The innermost active deadline, or None.
+    """
+    return _deadline.get()
+
+class Deadline:
+    """
+    A point in time by which a call or a group of calls must finish.
+
+    Used as a context manager, it applies to every request made inside the block. If a deadline is
+    already active, the earlier of the two applies.
+
+    Parameters
+    ----------
+    timeout : float
+        The time budget in seconds, starting now.
+    clock : Callable[[], float], optional
+        The clock the budget is measured with, by default time.monotonic
+    """
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.expires_at = clock() + timeout
+
+    @classmethod
+    def coerce(cls, deadline: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """
+        Turns a number of seconds into a Deadline; Deadline instances and None are returned as is.
+        """
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self) -> float:
+        """
+        The time left in seconds, never negative.
+        """
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        """
+        Whether the deadline has passed.
+        """
+        return self.clock() >= self.expires_at
+
+    def check(self, what: str = "operation") -> None:
+        """
+        Raises DeadlineExceeded if the deadline has passed.
+
+        Parameters
+        ----------
+        what : str, optional
+            The operation named in the error message, by default "operation"
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {what} could complete.")
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """
+        The timeout to give a request: the time left, capped at ``default``.
+
+        Parameters
+        ----------
+        default : Optional[float], optional
+            The request's own timeout, by default None
+
+        Returns
+        -------
+        float
+            The timeout in seconds.
+
+        Raises
+        ------
+        DeadlineExceeded
+            If no time is left.
+        """
+        self.check("request")
+        remaining = self.remaining()
+        return remaining if default is None else min(default, remaining)
+
+    def __enter__(self) -> "Deadline":
+        outer = _deadline.get()
+        active = self if outer is None or self.expires_at < outer.expires_at else outer
+        _tokens.set(_tokens.get() + (_deadline.set(active),))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        _deadline.reset(tokens[-1])
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f})"
@@ -0,0 +1,173 @@
+#pylint: disable=C0301
+"""
+DNS caching for the AllDebrid client's connection pool.
+
+Every new connection normally resolves the API host again. The DNSCache keeps the resolved addresses for a while, and the CachingHTTPAdapter makes the session's connections use it, so connections opened after startup (or after the pool grows) skip the lookup. Addresses that refuse connections are tried in turn, and the entry is dropped when none of them answer.
+
+Classes
+-------
+DNSCache
+    Caches resolved addresses per host for a limited time.
+CachingHTTPAdapter
+    A requests HTTPAdapter whose connections resolve hosts through a DNSCache.
+
+Functions
+---------
+- cached_pool_classes(): Returns urllib3 connection pool classes whose connections resolve hosts through a DNSCache.
+
+Examples
+--------
+>>> from alldebrid.dnscache import DNSCache
+>>> cache = DNSCache(ttl=300)
+>>> cache.resolve("api.alldebrid.com", 443)
+['104.26.4.60', '104.26.5.60', '172.67.72.67']
+"""
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+class DNSCache:
+    """
+    Caches resolved addresses per host for a limited time.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        How long resolved addresses are kept, in seconds, by default 300
+    resolver : Callable, optional
+        The function used to resolve hosts, with the signature of socket.getaddrinfo, by default socket.getaddrinfo
+    clock : Callable[[], float], optional
+        The clock used for expiry, by default time.monotonic
+    """
+
+    def __init__(self, ttl: float = 300, resolver: Callable = socket.getaddrinfo, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.resolver = resolver
+        self.clock = clock
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """
+        Returns the addresses of ``host``, resolving it if it is not cached or has expired.
+
+        Parameters
+        ----------
+        host : str
+            The host name.
+        port : int
+            The port that will be connected to.
+
+        Returns
+        -------
+        List[str]
+            The addresses, in the order given by the resolver.
+        """
+        key = (host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            return entry[1]
+
+        addresses = []
+        for _, _, _, _, sockaddr in self.resolver(host, port, 0, socket.SOCK_STREAM):
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: Optional[str] = None) -> None:
+        """
+        Drops the cached addresses of ``host``, or of every host.
+
+        Parameters
+        ----------
+        host : Optional[str], optional
+            The host to forget, by default every host.
+        """
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == host]:
+                    del self._entries[key]
+
+class _CachedConnectionMixin:
+    dns_cache: DNSCache
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = self.dns_cache.resolve(host, self.port)
+        except OSError:
+            # Let urllib3 resolve the host itself and raise its usual error.
+            return super()._new_conn()
+
+        # urllib3 connects to ``_dns_host``; point it at each cached address in turn and put the
+        # name back afterwards, so the Host header and TLS server name keep using the host name.
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as exc:
+                    error = exc
+        finally:
+            self._dns_host = host
+        self.dns_cache.invalidate(host)
+        if error is None:
+            return super()._new_conn()
+        raise error
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    A requests HTTPAdapter whose connections resolve hosts through a DNSCache.
+
+    Connections made through a proxy are not affected; they resolve the proxy as usual.
+
+    Parameters
+    ----------
+    dns_cache : DNSCache
+        The cache to resolve hosts with.
+    **kwargs
+        Passed to HTTPAdapter.
+    """
+
+    def __init__(self, dns_cache: DNSCache, **kwargs) -> None:
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = cached_pool_classes(self.dns_cache)
+
+def cached_pool_classes(dns_cache: DNSCache) -> Dict[str, type]:
+    """
+    Returns urllib3 connection pool classes, by scheme, whose connections resolve hosts through ``dns_cache``.
+
+    Assign the result to a urllib3 PoolManager's ``pool_classes_by_scheme``.
+
+    Parameters
+    ----------
+    dns_cache : DNSCache
+        The cache to resolve hosts with.
+
+    Returns
+    -------
+    Dict[str, type]
+        The pool classes for "http" and "https".
+    """
+    attrs = {"dns_cache": dns_cache}
+    http = type("CachedHTTPConnection", (_CachedConnectionMixin, HTTPConnection), attrs)
+    https = type("CachedHTTPSConnection", (_CachedConnectionMixin, HTTPSConnection), attrs)
+    return {
+        "http": type("CachedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http}),
+        "https": type("CachedHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": https}),
+    }
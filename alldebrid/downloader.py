@@ -0,0 +1,286 @@
+#pylint: disable=C0301
+"""
+Segmented, resumable downloads of unlocked AllDebrid links.
+
+The SegmentedDownloader unlocks a link through the AllDebrid client, preallocates the destination file and fetches it with several parallel HTTP Range requests. Progress is checkpointed next to the destination file so an interrupted download resumes where it stopped, and when the direct URL expires mid-transfer the source link is unlocked again and the remaining ranges continue on the new URL.
+
+Classes
+-------
+SegmentedDownloader
+    Downloads unlocked links with parallel HTTP Range segments.
+
+Exceptions
+----------
+DownloadError
+    Raised when a download cannot be completed.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.downloader import SegmentedDownloader
+>>> downloader = SegmentedDownloader(AllDebrid(apikey="YOUR_API_KEY"), segments=8)
+>>> downloader.download("https://host.example/file", "file.mkv")
+'file.mkv'
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+import requests
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+_EXPIRED_STATUS = (401, 403, 404, 410)
+
+class DownloadError(Exception):
+    """
+    Raised when a download cannot be completed.
+    """
+
+class _ExpiredLink(Exception):
+    pass
+
+class _State:
+    """
+    The resumable state of a download, stored as JSON next to the destination file.
+    """
+
+    def __init__(self, path: str, link: str, url: str, size: int, segments: List[List[int]]) -> None:
+        self.path = path
+        self.link = link
+        self.url = url
+        self.size = size
+        # Each segment is [start, end (inclusive), bytes done].
+        self.segments = segments
+        self.lock = threading.Lock()
+        self.saved_at = 0.0
+
+    @classmethod
+    def load(cls, path: str, link: str) -> Optional["_State"]:
+        """
+        Loads the state saved for ``path`` if it belongs to ``link`` and the partial file still exists.
+        """
+        state_path = path + ".state"
+        if not os.path.isfile(state_path) or not os.path.isfile(path):
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                raw = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if raw.get("link") != link or os.path.getsize(path) != raw.get("size"):
+            return None
+        return cls(path, link, raw["url"], raw["size"], raw["segments"])
+
+    def save(self, force: bool = False, interval: float = 1.0) -> None:
+        """
+        Atomically writes the state, at most once per ``interval`` seconds unless forced.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.saved_at < interval:
+                return
+            self.saved_at = now
+            raw = {"link": self.link, "url": self.url, "size": self.size, "segments": [list(segment) for segment in self.segments]}
+            temp_path = self.path + ".state.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(raw, file)
+            os.replace(temp_path, self.path + ".state")
+
+    def remove(self) -> None:
+        """
+        Removes the state file once the download is complete.
+        """
+        try:
+            os.remove(self.path + ".state")
+        except FileNotFoundError:
+            pass
+
+    @property
+    def done(self) -> int:
+        """
+        The number of bytes downloaded so far.
+        """
+        return sum(segment[2] for segment in self.segments)
+
+class SegmentedDownloader:
+    """
+    Downloads unlocked links with parallel HTTP Range segments.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client used to unlock links (anything with a download_link method).
+    segments : int, optional
+        The number of parallel segments, by default 4
+    chunk_size : int, optional
+        The size of the buffer each segment reads and writes at a time, by default 1 MiB. Memory use is bounded by segments * chunk_size.
+    min_segment_size : int, optional
+        Files are not split into segments smaller than this, by default 4 MiB
+    max_retries : int, optional
+        The number of times a segment is retried (re-unlocking the link if needed), by default 5
+    timeout : int, optional
+        The timeout of each HTTP request to the file host, by default 30
+    session : Optional[requests.Session], optional
+        The session used for the file host, by default a new session with a pool sized for ``segments``.
+    """
+
+    def __init__(self, client: Any, segments: int = 4, chunk_size: int = 1 << 20, min_segment_size: int = 4 << 20, max_retries: int = 5, timeout: int = 30, session: Optional[requests.Session] = None) -> None:
+        if segments < 1:
+            raise ValueError("segments must be at least 1")
+        self.client = client
+        self.segments = segments
+        self.chunk_size = chunk_size
+        self.min_segment_size = min_segment_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=segments)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._url_lock = threading.Lock()
+
+    def download(self, link: str, path: str, password: Optional[str] = None) -> str:
+        """
+        Unlocks and downloads a link, resuming a previous partial download of the same link into ``path``.
+
+        Parameters
+        ----------
+        link : str
+            The link to unlock and download.
+        path : str
+            The destination file.
+        password : Optional[str], optional
+            The password for the link, if it has one, by default None
+
+        Returns
+        -------
+        str
+            The destination path.
+
+        Raises
+        ------
+        DownloadError
+            If the file cannot be downloaded within the retry budget.
+        APIError
+            If the link cannot be unlocked.
+        """
+        state = _State.load(path, link)
+        if state is None:
+            url = self._unlock(link, password)
+            size, ranged = self._probe(url)
+            if size is None or not ranged:
+                return self._download_single(url, path)
+            state = _State(path, link, url, size, self._split(size))
+            with open(path, "wb") as file:
+                file.truncate(size)
+            state.save(force=True)
+
+        pending = [segment for segment in state.segments if segment[0] + segment[2] <= segment[1]]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.segments, len(pending))) as executor:
+                futures = [executor.submit(self._fetch_segment, state, segment, password) for segment in pending]
+                try:
+                    for future in futures:
+                        future.result()
+                finally:
+                    state.save(force=True)
+
+        state.remove()
+        return path
+
+    def _unlock(self, link: str, password: Optional[str] = None) -> str:
+        response = self.client.download_link(link, password=password)
+        url = response.get("data", {}).get("link")
+        if not url:
+            raise DownloadError(f"Could not obtain a direct link for {link}")
+        return url
+
+    def _refresh_url(self, state: _State, stale_url: str, password: Optional[str]) -> str:
+        """
+        Unlocks the source link again, once for all segments that saw the same stale URL.
+        """
+        with self._url_lock:
+            if state.url == stale_url:
+                state.url = self._unlock(state.link, password)
+                state.save(force=True)
+            return state.url
+
+    def _probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """
+        Returns the size of the file and whether the host honours Range requests.
+        """
+        with self.session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as response:
+            if response.status_code in _EXPIRED_STATUS:
+                raise DownloadError(f"Direct link rejected with HTTP {response.status_code}")
+            response.raise_for_status()
+            if response.status_code == 206:
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if match and match.group(3) != "*":
+                    return int(match.group(3)), True
+            length = response.headers.get("Content-Length")
+            return (int(length) if length is not None else None), False
+
+    def _split(self, size: int) -> List[List[int]]:
+        count = max(1, min(self.segments, size // max(1, self.min_segment_size)))
+        step = size // count
+        segments = []
+        for i in range(count):
+            start = i * step
+            end = size - 1 if i == count - 1 else start + step - 1
+            segments.append([start, end, 0])
+        return segments
+
+    def _fetch_segment(self, state: _State, segment: List[int], password: Optional[str]) -> None:
+        url = state.url
+        failures = 0
+        with open(state.path, "r+b") as file:
+            while segment[0] + segment[2] <= segment[1]:
+                try:
+                    self._stream_range(state, segment, url, file)
+                except _ExpiredLink:
+                    failures += 1
+                    if failures > self.max_retries:
+                        raise DownloadError(f"Direct link kept expiring for {state.link}") from None
+                    url = self._refresh_url(state, url, password)
+                except requests.exceptions.RequestException as exc:
+                    failures += 1
+                    if failures > self.max_retries:
+                        raise DownloadError(f"Segment {segment[0]}-{segment[1]} failed: {exc}") from exc
+                    time.sleep(min(2 ** failures * 0.1, 5))
+
+    def _stream_range(self, state: _State, segment: List[int], url: str, file) -> None:
+        start, end = segment[0] + segment[2], segment[1]
+        headers = {"Range": f"bytes={start}-{end}"}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code in _EXPIRED_STATUS:
+                raise _ExpiredLink()
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise DownloadError(f"Host ignored the Range request for {state.link}")
+            file.seek(start)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                remaining = end - (segment[0] + segment[2]) + 1
+                if remaining <= 0:
+                    break
+                chunk = chunk[:remaining]
+                file.write(chunk)
+                # Only record progress the OS already has, so a resumed download never skips bytes.
+                file.flush()
+                segment[2] += len(chunk)
+                state.save()
+
+    def _download_single(self, url: str, path: str) -> str:
+        """
+        Fallback for hosts without Range support: a single stream, restarted from scratch on failure.
+        """
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(path, "wb") as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+        return path
@@ -0,0 +1,286 @@
+#pylint: disable=C0301
+"""
+Columnar storage and queries for the file trees of many magnets.
+
+Instant-availability and magnet status responses describe each magnet's files as nested lists of ``{"n": name, "s": size}`` files and ``{"n": name, "e": [...]}`` folders. The FileTable flattens the trees of any number of magnets into a few typed arrays (one entry per file or folder: magnet, parent, size, interned name and interned extension) with the entries of each magnet stored contiguously, so selection queries run as tight passes over machine integers instead of walks over millions of small dicts.
+
+Classes
+-------
+FileTable
+    The files and folders of many magnets in flat, typed columns.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.filetree import FileTable, VIDEO_EXTENSIONS
+>>> table = FileTable.from_magnets(AllDebrid(apikey="YOUR_API_KEY").iter_magnets(status="ready"))
+>>> table.main_files(VIDEO_EXTENSIONS)
+{123: ('Show/Episode.1.mkv', 1468006400), 124: None}
+>>> table.total_sizes()
+[1520000000, 7340032]
+"""
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+VIDEO_EXTENSIONS = frozenset({"mkv", "mp4", "avi", "mov", "wmv", "m4v", "ts", "m2ts", "webm", "mpg", "mpeg", "flv"})
+
+# Size stored for folders, which never count as files.
+_FOLDER = -1
+
+def _children(magnet: Dict[str, Any]) -> List[dict]:
+    # Instant-availability results carry "files"; magnet status results carry "links", each with its own "files".
+    if "files" in magnet:
+        return magnet["files"] or []
+    entries: List[dict] = []
+    for link in magnet.get("links") or []:
+        if link.get("files"):
+            entries.extend(link["files"])
+        else:
+            entries.append({"n": link.get("filename", ""), "s": link.get("size", 0)})
+    return entries
+
+class FileTable:
+    """
+    The files and folders of many magnets in flat, typed columns.
+
+    Entry ``i`` is a file or folder of magnet ``magnet[i]``, inside folder entry ``parent[i]`` (-1 at the
+    top), with ``size[i]`` bytes (-1 for folders) and the name ``names[name[i]]``. The entries of magnet
+    ``m`` are ``offsets[m]`` to ``offsets[m + 1]``, and ``keys[m]`` identifies it.
+    """
+
+    def __init__(self) -> None:
+        self.keys: List[Hashable] = []
+        self.offsets = array("q", [0])
+        self.magnet = array("l")
+        self.parent = array("l")
+        self.size = array("q")
+        self.name = array("l")
+        self.ext = array("l")
+        self.names: List[str] = []
+        self.extensions: List[str] = []
+        self._totals = array("q")
+        self._name_ids: Dict[str, int] = {}
+        self._ext_ids: Dict[str, int] = {}
+        self._name_exts: List[int] = []
+        self._masked: Dict[frozenset, array] = {}
+
+    @classmethod
+    def from_magnets(cls, magnets: Iterable[Dict[str, Any]], key: Optional[str] = None) -> "FileTable":
+        """
+        Builds a table from magnet results, read one at a time.
+
+        Parameters
+        ----------
+        magnets : Iterable[Dict[str, Any]]
+            Magnets as the instant-availability or magnet status endpoints return them, e.g. the
+            "magnets" list of a response or iter_magnets().
+        key : Optional[str], optional
+            The field identifying each magnet, by default "id", else "hash", else "magnet", else the
+            magnet's position
+
+        Returns
+        -------
+        FileTable
+            The table.
+        """
+        table = cls()
+        for magnet in magnets:
+            table.add(magnet, key)
+        return table
+
+    def add(self, magnet: Dict[str, Any], key: Optional[str] = None) -> int:
+        """
+        Appends the file tree of one magnet.
+
+        Parameters
+        ----------
+        magnet : Dict[str, Any]
+            A magnet as the instant-availability or magnet status endpoints return it.
+        key : Optional[str], optional
+            The field identifying the magnet, as for from_magnets.
+
+        Returns
+        -------
+        int
+            The magnet's index in the table.
+        """
+        index = len(self.keys)
+        if key is not None:
+            self.keys.append(magnet.get(key))
+        else:
+            self.keys.append(next((magnet[field] for field in ("id", "hash", "magnet") if field in magnet), index))
+
+        # Collect into lists and extend the arrays once; names are interned with their extension.
+        parents: List[int] = []
+        sizes: List[int] = []
+        names: List[int] = []
+        name_ids = self._name_ids
+        base = len(self.size)
+        total = 0
+        stack: List[Tuple[int, List[dict]]] = [(-1, list(reversed(_children(magnet))))]
+        while stack:
+            parent, pending = stack[-1]
+            if not pending:
+                stack.pop()
+                continue
+            entry = pending.pop()
+            name = entry.get("n", "")
+            ident = name_ids.get(name)
+            if ident is None:
+                ident = self._intern(name)
+            names.append(ident)
+            parents.append(parent)
+            if "e" in entry:
+                sizes.append(_FOLDER)
+                stack.append((base + len(sizes) - 1, list(reversed(entry["e"] or []))))
+            else:
+                size = int(entry.get("s") or 0)
+                sizes.append(size)
+                total += size
+
+        name_exts = self._name_exts
+        self.magnet.extend([index] * len(sizes))
+        self.parent.extend(parents)
+        self.size.extend(sizes)
+        self.name.extend(names)
+        self.ext.extend([name_exts[ident] if size != _FOLDER else -1 for ident, size in zip(names, sizes)])
+        self.offsets.append(len(self.size))
+        self._totals.append(total)
+        return index
+
+    def _intern(self, name: Any) -> int:
+        name = str(name)
+        ident = self._name_ids.get(name)
+        if ident is None:
+            ident = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+            self._name_exts.append(self._intern_ext(name))
+        return ident
+
+    def _intern_ext(self, name: str) -> int:
+        dot = name.rfind(".")
+        if dot <= 0:
+            return -1
+        extension = name[dot + 1:].lower()
+        ident = self._ext_ids.get(extension)
+        if ident is None:
+            ident = self._ext_ids[extension] = len(self.extensions)
+            self.extensions.append(extension)
+        return ident
+
+    def __len__(self) -> int:
+        return len(self.size)
+
+    @property
+    def magnet_count(self) -> int:
+        """
+        The number of magnets in the table.
+        """
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory taken by the numeric columns, in bytes; names are stored once each on top of this.
+        """
+        return sum(column.itemsize * len(column) for column in (self.offsets, self.magnet, self.parent, self.size, self.name, self.ext, self._totals))
+
+    def path(self, entry: int) -> str:
+        """
+        Returns the path of an entry inside its magnet, e.g. "Season 1/Episode 1.mkv".
+        """
+        parts = []
+        while entry >= 0:
+            parts.append(self.names[self.name[entry]])
+            entry = self.parent[entry]
+        return "/".join(reversed(parts))
+
+    def _extension_mask(self, extensions: Iterable[str]) -> Set[int]:
+        return {self._ext_ids[extension.lower().lstrip(".")] for extension in extensions if extension.lower().lstrip(".") in self._ext_ids}
+
+    def _sizes_of(self, extensions: Optional[Iterable[str]]) -> array:
+        # The size column with every entry outside the extension set masked as a folder, kept until the table grows.
+        if extensions is None:
+            return self.size
+        wanted = frozenset(self._extension_mask(extensions))
+        cached = self._masked.get(wanted)
+        if cached is not None and len(cached) == len(self.size):
+            return cached
+        lookup = [ident in wanted for ident in range(len(self.extensions))] + [False]
+        masked = array("q", [size if lookup[ext] else _FOLDER for size, ext in zip(self.size, self.ext)])
+        self._masked[wanted] = masked
+        return masked
+
+    def largest_files(self, extensions: Optional[Iterable[str]] = None) -> List[Optional[int]]:
+        """
+        Returns the largest file of every magnet, optionally among given extensions only.
+
+        Parameters
+        ----------
+        extensions : Optional[Iterable[str]], optional
+            File extensions to consider, without the dot and in any case, by default all files
+
+        Returns
+        -------
+        List[Optional[int]]
+            Per magnet, the entry of its largest file, or None if it has none; the first on ties.
+        """
+        sizes = self._sizes_of(extensions)
+        offsets = self.offsets
+        result: List[Optional[int]] = []
+        for magnet in range(len(self.keys)):
+            start, end = offsets[magnet], offsets[magnet + 1]
+            if start == end:
+                result.append(None)
+                continue
+            segment = sizes[start:end]
+            largest = max(segment)
+            result.append(start + segment.index(largest) if largest != _FOLDER else None)
+        return result
+
+    def matching(self, extensions: Iterable[str]) -> List[int]:
+        """
+        Returns the files with one of the given extensions.
+
+        Parameters
+        ----------
+        extensions : Iterable[str]
+            File extensions, without the dot and in any case.
+
+        Returns
+        -------
+        List[int]
+            The entries, in table order.
+        """
+        wanted = self._extension_mask(extensions)
+        return [entry for entry, ext in enumerate(self.ext) if ext in wanted]
+
+    def total_sizes(self) -> List[int]:
+        """
+        Returns the total size of the files of every magnet.
+
+        Returns
+        -------
+        List[int]
+            Per magnet, the sum of its file sizes in bytes.
+        """
+        return self._totals.tolist()
+
+    def main_files(self, extensions: Optional[Iterable[str]] = None) -> Dict[Hashable, Optional[Tuple[str, int]]]:
+        """
+        Returns the path and size of the largest file of every magnet, by magnet key.
+
+        Parameters
+        ----------
+        extensions : Optional[Iterable[str]], optional
+            File extensions to consider, e.g. VIDEO_EXTENSIONS, by default all files
+
+        Returns
+        -------
+        Dict[Hashable, Optional[Tuple[str, int]]]
+            Per magnet key, the path and size of its largest file, or None if it has none.
+        """
+        return {
+            key: (self.path(entry), self.size[entry]) if entry is not None else None
+            for key, entry in zip(self.keys, self.largest_files(extensions))
+        }
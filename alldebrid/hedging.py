@@ -0,0 +1,257 @@
+#pylint: disable=C0301
+"""
+Hedged requests for idempotent AllDebrid endpoints.
+
+When a request to an idempotent endpoint has not answered within a high percentile of that endpoint's recent latency, the HedgePolicy sends a second identical request on another pooled connection and returns whichever answer arrives first. A global budget caps hedges to a fraction of all requests so hedging cannot double the load, and the policy keeps counters of how often hedges are sent and win.
+
+Classes
+-------
+HedgePolicy
+    Decides when to hedge and runs hedged requests.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.hedging import HedgePolicy
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", hedge_policy=HedgePolicy(percentile=0.95, budget=0.05))
+>>> ad.get_magnet_status(123)
+>>> ad.hedge_policy.metrics()
+{'requests': 1, 'hedged': 0, 'hedge_wins': 0, 'primary_wins': 0, 'hedge_win_rate': 0.0, 'budget_denied': 0}
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Deque, Dict, Iterable, Optional, TypeVar
+from .deadline import DeadlineExceeded, current_deadline
+
+T = TypeVar("T")
+
+# link/delayed, magnet/status, ping and user only read state, so sending them twice is harmless.
+HEDGED_ENDPOINTS = frozenset({"ping", "user", "magnet/status", "link/delayed"})
+
+class _Latencies:
+    """
+    Sliding window of recent latencies for one endpoint, with a cached percentile.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.since_update = 0
+        self.cached: Optional[float] = None
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+        self.since_update += 1
+
+    def percentile(self, fraction: float) -> float:
+        if self.cached is None or self.since_update >= 16:
+            ordered = sorted(self.samples)
+            self.cached = ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+            self.since_update = 0
+        return self.cached
+
+class HedgePolicy:
+    """
+    Decides when to hedge and runs hedged requests.
+
+    Parameters
+    ----------
+    percentile : float, optional
+        The latency percentile after which a hedge is sent, by default 0.95
+    min_delay : float, optional
+        The lower bound of the hedge delay in seconds, by default 0.01
+    max_delay : float, optional
+        The upper bound of the hedge delay in seconds, by default 2.0
+    initial_delay : float, optional
+        The hedge delay used until ``min_samples`` latencies are known, by default 0.5
+    min_samples : int, optional
+        The number of latencies needed before the percentile is used, by default 20
+    budget : float, optional
+        The fraction of requests that may be hedged, by default 0.05
+    window : int, optional
+        The number of recent latencies kept per endpoint, by default 200
+    endpoints : Iterable[str], optional
+        The endpoints that may be hedged, by default ping, user, magnet/status and link/delayed.
+    max_workers : Optional[int], optional
+        The number of threads running attempts, by default twice the pool_maxsize of the clients
+        using the policy, so a primary and a hedge can run for every pooled connection
+    """
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = 0.01, max_delay: float = 2.0, initial_delay: float = 0.5, min_samples: int = 20, budget: float = 0.05, window: int = 200, endpoints: Iterable[str] = HEDGED_ENDPOINTS, max_workers: Optional[int] = None) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self.window = window
+        self.endpoints = frozenset(endpoints)
+        self._latencies: Dict[str, _Latencies] = {}
+        self._lock = threading.Lock()
+        # Every request earns ``budget`` hedge credits, every hedge spends one.
+        self._credits = 1.0
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "budget_denied": 0}
+        self.max_workers = max_workers
+        self._connections = 0
+        # Created on first use, once the clients sharing the policy have reported their pool sizes.
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def size_for(self, pool_maxsize: int) -> None:
+        """
+        Sizes the attempt threads for a client with ``pool_maxsize`` pooled connections.
+
+        Called by the client; when several clients share the policy, the largest pool wins. Has no
+        effect once the first attempt has run, or when max_workers was given.
+        """
+        with self._lock:
+            self._connections = max(self._connections, pool_maxsize)
+
+    def applies(self, method: str, endpoint: str) -> bool:
+        """
+        Whether requests to ``endpoint`` with ``method`` may be hedged.
+        """
+        return method == "GET" and endpoint in self.endpoints
+
+    def delay_for(self, endpoint: str) -> float:
+        """
+        The time to wait for the first attempt before hedging, in seconds.
+        """
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None or len(latencies.samples) < self.min_samples:
+                return self.initial_delay
+            return min(self.max_delay, max(self.min_delay, latencies.percentile(self.percentile)))
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """
+        Adds a completed attempt's latency to the endpoint's window.
+        """
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = _Latencies(self.window)
+            latencies.add(latency)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Counters of requests, hedges and which attempt won.
+
+        Returns
+        -------
+        Dict[str, float]
+            The counters, plus the share of hedged requests won by the hedge.
+        """
+        with self._lock:
+            metrics = dict(self._counters)
+        metrics["hedge_win_rate"] = metrics["hedge_wins"] / metrics["hedged"] if metrics["hedged"] else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """
+        Stops the attempt threads.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _timed(self, endpoint: str, send: Callable[[], T], started: threading.Event) -> Callable[[], T]:
+        def attempt() -> T:
+            started.set()
+            start = time.monotonic()
+            result = send()
+            self.record(endpoint, time.monotonic() - start)
+            return result
+        return attempt
+
+    def _submit(self, fn: Callable[[], T]) -> Future:
+        # Attempts run on pool threads; carry the caller's context (priority, deadline) along.
+        with self._lock:
+            if self._executor is None:
+                workers = self.max_workers or 2 * (self._connections or 16)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alldebrid-hedge")
+            executor = self._executor
+        return executor.submit(contextvars.copy_context().run, fn)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._credits >= 1.0:
+                self._credits -= 1.0
+                self._counters["hedged"] += 1
+                return True
+            self._counters["budget_denied"] += 1
+            return False
+
+    def execute(self, endpoint: str, send: Callable[[], T]) -> T:
+        """
+        Runs ``send``, and runs it a second time if the first attempt is slow; returns the first successful result.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint, used for its latency window.
+        send : Callable[[], T]
+            Sends the request once.
+
+        Returns
+        -------
+        T
+            The result of whichever attempt succeeded first.
+        """
+        with self._lock:
+            self._counters["requests"] += 1
+            self._credits = min(10.0, self._credits + self.budget)
+
+        deadline = current_deadline()
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline.remaining())
+
+        started = threading.Event()
+        attempt = self._timed(endpoint, send, started)
+        primary = self._submit(attempt)
+        delay = self.delay_for(endpoint)
+        # Time spent waiting for a pool thread is not latency; the hedge delay runs from the start of the attempt.
+        if not started.wait(remaining()):
+            primary.cancel()
+            raise DeadlineExceeded("Deadline exceeded while waiting for the request.")
+        try:
+            return primary.result(timeout=delay if deadline is None else min(delay, remaining()))
+        except FutureTimeoutError:
+            pass
+
+        if deadline is not None and deadline.expired:
+            primary.cancel()
+            raise DeadlineExceeded("Deadline exceeded while waiting for the request.")
+        if not self._spend():
+            try:
+                return primary.result(timeout=remaining())
+            except FutureTimeoutError:
+                raise DeadlineExceeded("Deadline exceeded while waiting for the request.") from None
+
+        hedge = self._submit(attempt)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                for future in pending:
+                    future.cancel()
+                raise DeadlineExceeded("Deadline exceeded while waiting for the request.")
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                # The loser cannot be interrupted mid-request; it is cancelled if not started yet
+                # and otherwise finishes in the background and returns its connection to the pool.
+                for other in pending:
+                    other.cancel()
+                with self._lock:
+                    self._counters["hedge_wins" if future is hedge else "primary_wins"] += 1
+                return future.result()
+        raise error
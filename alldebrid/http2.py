@@ -0,0 +1,149 @@
+#pylint: disable=C0301
+"""
+HTTP/2 transport for the AllDebrid client.
+
+Over HTTP/1.1 every in-flight request needs its own connection, so hundreds of concurrent calls mean hundreds of connections to the API host. The HTTP2Transport multiplexes requests as streams over a few HTTP/2 connections instead, with a cap on the number of streams in flight.
+
+It requires httpx, and h2 for HTTP/2 itself (``pip install alldebrid.py[http2]``). Without h2 the transport still works over HTTP/1.1, and servers that do not offer HTTP/2 during the TLS handshake are also spoken to over HTTP/1.1.
+
+Classes
+-------
+HTTP2Transport
+    Sends requests as multiplexed HTTP/2 streams through an httpx client.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.http2 import HTTP2Transport
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", transport=HTTP2Transport(max_connections=2, max_concurrent_streams=200))
+>>> ad.ping()
+{'status': 'success', 'data': {'ping': 'pong'}}
+"""
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+from .transport import StreamingResponse, Transport, TransportError, TransportResponse, _translate, _with_query
+
+try:
+    import httpx
+except ImportError: # pragma: no cover
+    httpx = None
+
+try:
+    import h2 # pylint: disable=W0611
+    HTTP2_AVAILABLE = True
+except ImportError: # pragma: no cover
+    HTTP2_AVAILABLE = False
+
+class HTTP2Transport(Transport):
+    """
+    Sends requests as multiplexed HTTP/2 streams through an httpx client.
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        The number of connections opened to each host, by default 4
+    max_concurrent_streams : int, optional
+        The number of requests in flight at once across all connections; more wait for a free stream, by default 100
+    proxy : Optional[str], optional
+        The proxy to send requests through, by default None
+    http2 : bool, optional
+        Whether to offer HTTP/2, by default True if h2 is installed. When False, or when h2 is missing,
+        requests are sent over HTTP/1.1.
+    prior_knowledge : bool, optional
+        Speak HTTP/2 straight away over plain-text http:// connections (h2c) instead of HTTP/1.1,
+        for servers known to support it, by default False
+    verify : bool, optional
+        Whether to verify TLS certificates, by default True
+
+    Raises
+    ------
+    ImportError
+        If httpx is not installed.
+    """
+
+    def __init__(self, max_connections: int = 4, max_concurrent_streams: int = 100, proxy: Optional[str] = None, http2: bool = True, prior_knowledge: bool = False, verify: bool = True) -> None:
+        if httpx is None:
+            raise ImportError("HTTP2Transport requires httpx; install it with `pip install alldebrid.py[http2]`.")
+        self.max_connections = max_connections
+        self.max_concurrent_streams = max_concurrent_streams
+        self.proxy = proxy
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.prior_knowledge = prior_knowledge and self.http2
+        self.verify = verify
+        self._streams = threading.BoundedSemaphore(max_concurrent_streams)
+        self._lock = threading.Lock()
+        self.client: Optional["httpx.Client"] = None
+
+    def __getstate__(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "max_concurrent_streams": self.max_concurrent_streams,
+            "proxy": self.proxy,
+            "http2": self.http2,
+            "prior_knowledge": self.prior_knowledge,
+            "verify": self.verify,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def _get_client(self) -> "httpx.Client":
+        client = self.client
+        if client is not None:
+            return client
+
+        with self._lock:
+            if self.client is None:
+                limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+                self.client = httpx.Client(http1=not self.prior_knowledge, http2=self.http2, limits=limits, proxy=self.proxy, verify=self.verify, follow_redirects=True)
+            return self.client
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        # httpx would replace the query string already in the URL (the agent) rather than extend it.
+        url = _with_query(url, params)
+
+        client = self._get_client()
+        with self._streams:
+            try:
+                response = client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    data={key: value for key, value in data.items() if value is not None} if data else None,
+                    files=files or None,
+                    timeout=timeout,
+                )
+            except httpx.HTTPError as exc:
+                raise TransportError(str(exc)) from exc
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def stream(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> StreamingResponse:
+        client = self._get_client()
+        # The stream stays taken until the response is closed.
+        self._streams.acquire()
+        try:
+            response = client.send(client.build_request(method, _with_query(url, params), headers=headers, timeout=timeout), stream=True)
+        except httpx.HTTPError as exc:
+            self._streams.release()
+            raise TransportError(str(exc)) from exc
+        except BaseException:
+            self._streams.release()
+            raise
+
+        def close() -> None:
+            try:
+                response.close()
+            finally:
+                self._streams.release()
+
+        return StreamingResponse(response.status_code, _translate(response.iter_bytes(), (httpx.HTTPError,)), response.headers, close)
+
+    def close(self) -> None:
+        with self._lock:
+            client, self.client = self.client, None
+        if client is not None:
+            client.close()
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self.client = None
@@ -0,0 +1,388 @@
+#pylint: disable=C0301
+"""
+Durable job queue for unlock, magnet upload and delayed-link work.
+
+The JobQueue keeps jobs in a SQLite database in WAL mode, so pending work and finished results survive restarts. Workers claim jobs under a lease, run them through the client with a global and a per-host concurrency limit, and store each result in the same transaction that marks the job done. A job whose worker died is claimed again once its lease expires, and submitting the same job twice is a no-op, so a restarted worker resumes where it stopped without redoing finished work.
+
+Jobs run at least once: a crash between the API call and the checkpoint repeats that one call, which is harmless for unlocks, magnet uploads and delayed-link polls.
+
+Classes
+-------
+JobQueue
+    Runs unlock, magnet upload and delayed-link jobs from a SQLite-backed queue.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.jobs import JobQueue
+>>> with JobQueue(AllDebrid(apikey="YOUR_API_KEY"), "jobs.db", workers=16, per_host=4) as queue:
+...     keys = [queue.unlock(link) for link in links]
+...     queue.wait()
+...     queue.result(keys[0])
+{'status': 'done', 'result': {'link': 'https://cdn.example/dl/abc/file', ...}, 'error': None, 'attempts': 1}
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from .alldebrid import APIError
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    owner TEXT,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at, created);
+"""
+
+class _Retry(Exception):
+    """
+    Raised by a job to be run again later without using up an attempt.
+    """
+
+    def __init__(self, delay: float) -> None:
+        super().__init__(f"retry in {delay}s")
+        self.delay = delay
+
+class JobQueue:
+    """
+    Runs unlock, magnet upload and delayed-link jobs from a SQLite-backed queue.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client the jobs are run with.
+    path : str
+        The SQLite database file, created if missing.
+    workers : int, optional
+        The number of jobs run at once by this queue, by default 8
+    per_host : int, optional
+        The number of unlock jobs for the same file host run at once by this queue, by default 2
+    lease : float, optional
+        How long a claimed job belongs to its worker, in seconds; after that another worker may take it
+        over, by default 120
+    max_attempts : int, optional
+        The number of times a job failing with a transient error is tried, by default 5
+    backoff : float, optional
+        The delay before the first retry, in seconds, doubled for every further retry, by default 2
+    poll_delay : float, optional
+        The time between polls of a delayed link that is not ready yet, in seconds, by default 5
+    max_poll_time : Optional[float], optional
+        The time after which a delayed link that is still not ready fails with a TimeoutError, counted
+        from the job's submission, in seconds; None for no limit, by default 300
+    clock : Callable[[], float], optional
+        The wall clock, used for leases and scheduling across restarts, by default time.time
+    """
+
+    def __init__(self, client: Any, path: str, workers: int = 8, per_host: int = 2, lease: float = 120, max_attempts: int = 5, backoff: float = 2, poll_delay: float = 5, max_poll_time: Optional[float] = 300, clock: Callable[[], float] = time.time) -> None:
+        self.client = client
+        self.path = path
+        self.workers = workers
+        self.per_host = per_host
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.poll_delay = poll_delay
+        self.max_poll_time = max_poll_time
+        self.clock = clock
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, Callable[[dict], dict]] = {
+            "unlock": self._run_unlock,
+            "magnet": self._run_magnet,
+            "delayed": self._run_delayed,
+        }
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._running: Dict[str, int] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    def __enter__(self) -> "JobQueue":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+        self.close()
+
+    def _execute(self, sql: str, args: Tuple = ()) -> List[tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def submit(self, kind: str, payload: Dict[str, Any], key: Optional[str] = None, host: Optional[str] = None) -> str:
+        """
+        Adds a job unless a job with the same key exists.
+
+        Parameters
+        ----------
+        kind : str
+            "unlock", "magnet" or "delayed".
+        payload : Dict[str, Any]
+            The job's arguments, as JSON-serialisable values.
+        key : Optional[str], optional
+            The job's idempotency key, by default derived from kind and payload.
+        host : Optional[str], optional
+            The host the per-host limit is counted against, by default none (only the global limit applies).
+
+        Returns
+        -------
+        str
+            The job's key.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind {kind}")
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        if key is None:
+            key = hashlib.sha1(f"{kind}:{encoded}".encode()).hexdigest()
+        now = self.clock()
+        self._execute(
+            "INSERT OR IGNORE INTO jobs (key, kind, payload, host, status, available_at, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, encoded, host or "", PENDING, now, now, now),
+        )
+        with self._cond:
+            self._cond.notify()
+        return key
+
+    def unlock(self, link: str, password: Optional[str] = None) -> str:
+        """
+        Adds a job unlocking ``link`` with download_link.
+
+        Returns
+        -------
+        str
+            The job's key.
+        """
+        payload = {"link": link} if password is None else {"link": link, "password": password}
+        return self.submit("unlock", payload, host=urlparse(link).hostname)
+
+    def upload_magnet(self, magnet: str) -> str:
+        """
+        Adds a job uploading ``magnet`` with upload_magnets.
+
+        Returns
+        -------
+        str
+            The job's key.
+        """
+        return self.submit("magnet", {"magnet": magnet})
+
+    def delayed_link(self, delayed_id: str) -> str:
+        """
+        Adds a job polling delayed_links until the link is ready.
+
+        Returns
+        -------
+        str
+            The job's key.
+        """
+        return self.submit("delayed", {"id": delayed_id})
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the state of a job.
+
+        Parameters
+        ----------
+        key : str
+            The job's key.
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            The job's status, result (once done), last error and number of attempts, or None if there is no such job.
+        """
+        rows = self._execute("SELECT status, result, error, attempts FROM jobs WHERE key = ?", (key,))
+        if not rows:
+            return None
+        status, result, error, attempts = rows[0]
+        return {"status": status, "result": json.loads(result) if result is not None else None, "error": error, "attempts": attempts}
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of jobs in each status.
+        """
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")))
+        return counts
+
+    def _claim(self) -> Optional[Tuple[str, str, dict, str]]:
+        now = self.clock()
+        with self._cond:
+            if sum(self._running.values()) >= self.workers:
+                return None
+            busy = [host for host, running in self._running.items() if host and running >= self.per_host]
+            placeholders = ",".join("?" * len(busy))
+            sql = (
+                "SELECT key, kind, payload, host FROM jobs"
+                " WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?))"
+                + (f" AND host NOT IN ({placeholders})" if busy else "")
+                + " ORDER BY available_at, created LIMIT 1"
+            )
+            with self._db_lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._db.execute(sql, (PENDING, now, RUNNING, now, *busy)).fetchone()
+                    if row is not None:
+                        self._db.execute(
+                            "UPDATE jobs SET status = ?, lease_until = ?, owner = ?, attempts = attempts + 1, updated = ? WHERE key = ?",
+                            (RUNNING, now + self.lease, self.owner, now, row[0]),
+                        )
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+            if row is None:
+                return None
+            self._running[row[3]] = self._running.get(row[3], 0) + 1
+            return row[0], row[1], json.loads(row[2]), row[3]
+
+    def _finish(self, key: str, host: str, sql: str, args: Tuple) -> None:
+        # Only the current lease holder may record the outcome.
+        self._execute(sql + " WHERE key = ? AND owner = ? AND status = ?", (*args, key, self.owner, RUNNING))
+        with self._cond:
+            self._running[host] -= 1
+            self._cond.notify_all()
+
+    def run_once(self) -> bool:
+        """
+        Claims and runs one job in the calling thread.
+
+        Returns
+        -------
+        bool
+            True if a job was run, False if none was ready.
+        """
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        key, kind, payload, host = claimed
+        now = self.clock
+        try:
+            result = self.handlers[kind](payload)
+        except _Retry as retry:
+            created = self._execute("SELECT created FROM jobs WHERE key = ?", (key,))[0][0]
+            if self.max_poll_time is not None and now() - created >= self.max_poll_time:
+                error = TimeoutError(f"Job {key} was still not ready after {self.max_poll_time}s")
+                self._finish(key, host, "UPDATE jobs SET status = ?, error = ?, updated = ?", (FAILED, str(error), now()))
+            else:
+                self._finish(key, host, "UPDATE jobs SET status = ?, attempts = attempts - 1, available_at = ?, updated = ?", (PENDING, now() + retry.delay, now()))
+        except Exception as exc: # pylint: disable=W0703
+            attempts = self._execute("SELECT attempts FROM jobs WHERE key = ?", (key,))[0][0]
+            if self._transient(exc) and attempts < self.max_attempts:
+                delay = self.backoff * 2 ** (attempts - 1)
+                self._finish(key, host, "UPDATE jobs SET status = ?, error = ?, available_at = ?, updated = ?", (PENDING, str(exc), now() + delay, now()))
+            else:
+                self._finish(key, host, "UPDATE jobs SET status = ?, error = ?, updated = ?", (FAILED, str(exc), now()))
+        else:
+            self._finish(key, host, "UPDATE jobs SET status = ?, result = ?, error = NULL, updated = ?", (DONE, json.dumps(result), now()))
+        return True
+
+    @staticmethod
+    def _transient(exc: Exception) -> bool:
+        # HTTP-level failures (numeric codes, including 408 for no response) and timeouts are worth
+        # retrying; API error codes such as LINK_HOST_NOT_SUPPORTED are not.
+        if isinstance(exc, APIError):
+            return isinstance(exc.code, int)
+        return isinstance(exc, (TimeoutError, ConnectionError))
+
+    def _run_unlock(self, payload: dict) -> dict:
+        return self.client.download_link(payload["link"], password=payload.get("password"))["data"]
+
+    def _run_magnet(self, payload: dict) -> dict:
+        return self.client.upload_magnets([payload["magnet"]])["data"]["magnets"][0]
+
+    def _run_delayed(self, payload: dict) -> dict:
+        data = self.client.delayed_links(payload["id"])["data"]
+        if data.get("status") == 1:
+            raise _Retry(self.poll_delay)
+        if data.get("status") != 2:
+            raise ValueError(f"Delayed link {payload['id']} failed with status {data.get('status')}")
+        return data
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            if not self.run_once():
+                with self._cond:
+                    self._cond.wait(0.5)
+
+    def start(self) -> "JobQueue":
+        """
+        Starts the worker threads.
+
+        Returns
+        -------
+        JobQueue
+            The queue itself.
+        """
+        if not self._threads:
+            self._stop.clear()
+            self._threads = [threading.Thread(target=self._worker, name=f"alldebrid-jobs-{i}", daemon=True) for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until no job is pending or running.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            The maximum time to wait in seconds, by default None (no limit)
+
+        Returns
+        -------
+        bool
+            True if the queue drained, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self.counts()
+            if counts[PENDING] == 0 and counts[RUNNING] == 0:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        """
+        Stops the worker threads after their current job.
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        with self._db_lock:
+            self._db.close()
@@ -0,0 +1,159 @@
+#pylint: disable=C0301
+"""
+Incremental parsing of large JSON responses.
+
+List endpoints answer with one JSON document holding every item, e.g. ``{"status": "success", "data": {"links": [...]}}``. The JSONItemStream reads such a document chunk by chunk and yields the items of one array as soon as each is complete, keeping only the current item and one chunk in memory, so memory use does not grow with the length of the list.
+
+Only the objects on the way to the array are walked token by token; every other value, including each item, is decoded in one go by the standard C decoder.
+
+Classes
+-------
+JSONItemStream
+    Yields the items of an array inside a JSON document read in chunks.
+
+Examples
+--------
+>>> from alldebrid.jsonstream import JSONItemStream
+>>> chunks = [b'{"status": "success", "data": {"links": [{"link": "a"}, ', b'{"link": "b"}]}}']
+>>> stream = JSONItemStream(chunks, ("data", "links"))
+>>> list(stream)
+[{'link': 'a'}, {'link': 'b'}]
+>>> stream.envelope
+{'status': 'success'}
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+_WHITESPACE = " \t\n\r"
+
+_NUMBER_TAIL = re.compile(r"[0-9eE.+\-]*")
+
+class JSONItemStream:
+    """
+    Yields the items of an array inside a JSON document read in chunks.
+
+    If the value at ``path`` is an object rather than an array, that object is yielded as the only
+    item; if the path is missing, nothing is. The other top-level fields (such as "status" and
+    "error") are kept in ``envelope`` and are complete once the stream is exhausted.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The document, as UTF-8 encoded chunks of any size.
+    path : Sequence[str]
+        The keys leading from the top-level object to the array, e.g. ("data", "links").
+
+    Raises
+    ------
+    ValueError
+        While iterating, if the document is not valid JSON or ends early.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], path: Sequence[str]) -> None:
+        self.path = tuple(path)
+        self.envelope: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._text = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._peek() != "{":
+            raise ValueError("Expected a JSON object")
+        yield from self._object(self.path, top=True)
+        if self._peek() != "":
+            raise ValueError("Extra data after the JSON document")
+
+    def _fill(self, size: int = 1) -> bool:
+        # Read until at least ``size`` characters are buffered past the consumed prefix, which is dropped.
+        self._text = self._text[self._pos:]
+        self._pos = 0
+        while len(self._text) < size and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                self._text += self._decoder.decode(b"", final=True)
+            else:
+                self._text += self._decoder.decode(chunk)
+        return len(self._text) >= size
+
+    def _peek(self) -> str:
+        while True:
+            text, pos = self._text, self._pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self._fill():
+                return ""
+
+    def _take(self, expected: str) -> str:
+        char = self._peek()
+        if not char or char not in expected:
+            raise ValueError(f"Expected one of {expected!r} at offset {self._pos}, found {char or 'the end'!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # Retry with twice the buffer, so a large value is decoded a logarithmic number of times.
+                self._fill(2 * (len(self._text) - self._pos) + 1)
+                continue
+            # A number running up to the end of the buffer may continue in the next chunk ("12" of "12.5").
+            if not self._eof and not isinstance(value, (str, list, dict)) and _NUMBER_TAIL.match(self._text, end).end() == len(self._text):
+                self._fill(len(self._text) - self._pos + 1)
+                continue
+            self._pos = end
+            return value
+
+    def _object(self, path: Sequence[str], top: bool = False) -> Iterator[Any]:
+        self._take("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Expected an object key")
+            self._take(":")
+            if key == path[0]:
+                yield from self._at(path[1:])
+            else:
+                value = self._value()
+                if top:
+                    self.envelope[key] = value
+            if self._take(",}") == "}":
+                return
+
+    def _at(self, path: Sequence[str]) -> Iterator[Any]:
+        char = self._peek()
+        if path:
+            if char == "{":
+                yield from self._object(path)
+            else:
+                self._value()
+            return
+        if char != "[":
+            value = self._value()
+            if isinstance(value, dict):
+                yield value
+            return
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._take(",]") == "]":
+                return
@@ -0,0 +1,215 @@
+#pylint: disable=C0301
+"""
+Expiry-aware store of unlocked direct links.
+
+The LinkStore keeps the direct URL returned by download_link for every link it has seen, together with when it was unlocked, when it expires and when it was last used. A background refresher unlocks links again shortly before they expire, spending a bounded number of unlocks per cycle on the most recently used links first, so consumers get a valid URL from memory instead of waiting on the API.
+
+Classes
+-------
+LinkStore
+    Caches direct links and refreshes them before they expire.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.linkstore import LinkStore
+>>> store = LinkStore(AllDebrid(apikey="YOUR_API_KEY"), ttl=3600).start()
+>>> store.get("https://host.example/file")
+'https://cdn.example/dl/abc/file'
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+class _Entry:
+    __slots__ = ("url", "unlocked_at", "expires_at", "last_used")
+
+    def __init__(self, url: str, unlocked_at: float, expires_at: float) -> None:
+        self.url = url
+        self.unlocked_at = unlocked_at
+        self.expires_at = expires_at
+        self.last_used = unlocked_at
+
+class LinkStore:
+    """
+    Caches direct links and refreshes them before they expire.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client used to unlock links.
+    ttl : float, optional
+        How long a direct link stays valid after unlocking, in seconds, by default 3600
+    refresh_margin : float, optional
+        Links expiring within this many seconds are refreshed, by default 300
+    refresh_budget : int, optional
+        The maximum number of links unlocked per refresh cycle, by default 10
+    interval : float, optional
+        The time between refresh cycles of the background refresher, in seconds, by default 30
+    idle_timeout : Optional[float], optional
+        Links not used for this long are dropped instead of refreshed, by default None (never)
+    clock : Callable[[], float], optional
+        The monotonic clock used for all timestamps, by default time.monotonic
+    """
+
+    def __init__(self, client: Any, ttl: float = 3600, refresh_margin: float = 300, refresh_budget: int = 10, interval: float = 30, idle_timeout: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        if refresh_margin >= ttl:
+            raise ValueError("refresh_margin must be smaller than ttl")
+        self.client = client
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.refresh_budget = refresh_budget
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, link: str) -> str:
+        """
+        Returns a valid direct URL for ``link``, unlocking it only if the store has none.
+
+        Parameters
+        ----------
+        link : str
+            The source link.
+
+        Returns
+        -------
+        str
+            The direct URL.
+
+        Raises
+        ------
+        APIError
+            If the link has to be unlocked and the API returns an error.
+        """
+        now = self.clock()
+        entry = self._entries.get(link)
+        if entry is not None and entry.expires_at > now:
+            entry.last_used = now
+            return entry.url
+        with self._link_lock(link):
+            entry = self._entries.get(link)
+            if entry is None or entry.expires_at <= self.clock():
+                entry = self._unlock(link)
+            entry.last_used = self.clock()
+            return entry.url
+
+    def invalidate(self, link: str) -> None:
+        """
+        Drops the direct URL of ``link``, e.g. after the file host rejected it.
+
+        Parameters
+        ----------
+        link : str
+            The source link.
+        """
+        self._entries.pop(link, None)
+
+    def expires_in(self, link: str) -> Optional[float]:
+        """
+        The number of seconds until the stored direct URL of ``link`` expires.
+
+        Parameters
+        ----------
+        link : str
+            The source link.
+
+        Returns
+        -------
+        Optional[float]
+            The remaining lifetime, or None if the link is not stored.
+        """
+        entry = self._entries.get(link)
+        return None if entry is None else entry.expires_at - self.clock()
+
+    def __contains__(self, link: str) -> bool:
+        return link in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh_due(self) -> List[str]:
+        """
+        Runs one refresh cycle: drops idle links and unlocks again up to ``refresh_budget`` links
+        nearing expiry, most recently used first.
+
+        Returns
+        -------
+        List[str]
+            The links that were refreshed.
+        """
+        now = self.clock()
+        due = []
+        for link, entry in list(self._entries.items()):
+            if self.idle_timeout is not None and now - entry.last_used > self.idle_timeout:
+                self._entries.pop(link, None)
+                self._locks.pop(link, None)
+            elif entry.expires_at - now <= self.refresh_margin:
+                due.append((entry.last_used, link))
+
+        due.sort(reverse=True)
+        refreshed = []
+        for _, link in due[:self.refresh_budget]:
+            if self._stop.is_set():
+                break
+            with self._link_lock(link):
+                entry = self._entries.get(link)
+                if entry is None or entry.expires_at - self.clock() > self.refresh_margin:
+                    continue
+                try:
+                    fresh = self._unlock(link)
+                except Exception:  # pylint: disable=W0703
+                    # Keep serving the old URL; a failed refresh is retried on the next cycle.
+                    continue
+                fresh.last_used = entry.last_used
+                refreshed.append(link)
+        return refreshed
+
+    def start(self) -> "LinkStore":
+        """
+        Starts the background refresher.
+
+        Returns
+        -------
+        LinkStore
+            The store itself.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alldebrid-linkstore", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the background refresher.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh_due()
+
+    def _link_lock(self, link: str) -> threading.Lock:
+        lock = self._locks.get(link)
+        if lock is None:
+            with self._lock:
+                lock = self._locks.setdefault(link, threading.Lock())
+        return lock
+
+    def _unlock(self, link: str) -> _Entry:
+        response = self.client.download_link(link)
+        url = response.get("data", {}).get("link")
+        if not url:
+            raise ValueError(f"Could not obtain a direct link for {link}")
+        now = self.clock()
+        entry = self._entries[link] = _Entry(url, now, now + self.ttl)
+        return entry
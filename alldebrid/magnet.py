@@ -0,0 +1,188 @@
+#pylint: disable=C0301
+"""
+Batch parsing and normalization of magnet URIs.
+
+Magnets that point to the same torrent can differ in their tracker lists, display names, letter case or in the encoding of their info-hash (40 hex characters or 32 base32 characters). The magnet module reduces a batch of magnets to their canonical lowercase hex info-hashes, removes duplicates and keeps the mapping needed to expand per-hash results back onto the original inputs.
+
+Classes
+-------
+MagnetBatch
+    The result of normalizing a batch of magnets.
+
+Functions
+---------
+- parse_info_hash(): Extracts the canonical info-hash of a single magnet URI or bare hash.
+- normalize_magnets(): Normalizes and deduplicates a batch of magnet URIs or bare hashes.
+
+Examples
+--------
+>>> from alldebrid.magnet import normalize_magnets
+>>> batch = normalize_magnets(["magnet:?xt=urn:btih:ABC...&tr=udp://a", "abc..."])
+>>> batch.hashes
+['abc...']
+>>> batch.index
+[0, 0]
+"""
+import base64
+import binascii
+import re
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+_HASH = r"([0-9a-fA-F]{40}|[A-Za-z2-7]{32})"
+_MAGNET_PATTERN = re.compile(r"[?&]xt=urn:btih:" + _HASH + r"(?![0-9A-Za-z])", re.IGNORECASE)
+_BARE_PATTERN = re.compile(r"\s*" + _HASH + r"\s*")
+
+def _canonical(raw: str) -> str:
+    if len(raw) == 40:
+        return raw.lower()
+    return base64.b32decode(raw.upper()).hex()
+
+def parse_info_hash(magnet: str) -> Optional[str]:
+    """
+    Extracts the canonical info-hash of a magnet URI or bare info-hash.
+
+    Parameters
+    ----------
+    magnet : str
+        A magnet URI with an ``xt=urn:btih:`` parameter, or a bare hex or base32 info-hash.
+
+    Returns
+    -------
+    Optional[str]
+        The info-hash as 40 lowercase hex characters, or None if none could be found.
+    """
+    if not isinstance(magnet, str):
+        return None
+    match = _BARE_PATTERN.fullmatch(magnet) or _MAGNET_PATTERN.search(magnet)
+    if match is None:
+        return None
+    try:
+        return _canonical(match.group(1))
+    except binascii.Error:
+        return None
+
+class MagnetBatch:
+    """
+    The result of normalizing a batch of magnets.
+
+    Parameters
+    ----------
+    magnets : Sequence[str]
+        The original inputs.
+    hashes : List[str]
+        The unique canonical info-hashes, in order of first appearance.
+    index : List[int]
+        For every input, the position of its hash in ``hashes``, or -1 if the input is not a valid magnet.
+    first : List[int]
+        For every unique hash, the position of the first input that carried it.
+    """
+    __slots__ = ("magnets", "hashes", "index", "first")
+
+    def __init__(self, magnets: Sequence[str], hashes: List[str], index: List[int], first: List[int]) -> None:
+        self.magnets = magnets
+        self.hashes = hashes
+        self.index = index
+        self.first = first
+
+    @property
+    def invalid(self) -> List[int]:
+        """
+        The positions of the inputs that are not valid magnets.
+
+        Returns
+        -------
+        List[int]
+            The positions of the invalid inputs.
+        """
+        return [i for i, position in enumerate(self.index) if position < 0]
+
+    @property
+    def representatives(self) -> List[str]:
+        """
+        The first original input for every unique hash, keeping its trackers and display name.
+
+        Returns
+        -------
+        List[str]
+            One original magnet per unique hash.
+        """
+        magnets = self.magnets
+        return [magnets[i] for i in self.first]
+
+    def expand(self, results: Sequence[Any], missing: Any = None, wrap: Optional[Callable[[Any, str], Any]] = None) -> List[Any]:
+        """
+        Maps per-hash results back onto the original inputs.
+
+        Parameters
+        ----------
+        results : Sequence[Any]
+            One result per unique hash, in the order of ``hashes``.
+        missing : Any, optional
+            The value used for invalid inputs, by default None
+        wrap : Optional[Callable[[Any, str], Any]], optional
+            Called with the result and the original input to build each output item, by default the result is used as is.
+
+        Returns
+        -------
+        List[Any]
+            One result per original input.
+        """
+        if len(results) != len(self.hashes):
+            raise ValueError(f"Expected {len(self.hashes)} results, got {len(results)}")
+        if wrap is None:
+            return [results[position] if position >= 0 else missing for position in self.index]
+        magnets = self.magnets
+        return [wrap(results[position], magnets[i]) if position >= 0 else missing for i, position in enumerate(self.index)]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return f"MagnetBatch(inputs={len(self.index)}, unique={len(self.hashes)})"
+
+def normalize_magnets(magnets: Iterable[str]) -> MagnetBatch:
+    """
+    Normalizes and deduplicates a batch of magnet URIs or bare info-hashes.
+
+    Parameters
+    ----------
+    magnets : Iterable[str]
+        The magnets to normalize.
+
+    Returns
+    -------
+    MagnetBatch
+        The unique canonical hashes and the mapping back to the inputs.
+    """
+    magnets = magnets if isinstance(magnets, (list, tuple)) else list(magnets)
+    bare_match = _BARE_PATTERN.fullmatch
+    magnet_search = _MAGNET_PATTERN.search
+    b32decode = base64.b32decode
+
+    seen = {}
+    hashes: List[str] = []
+    first: List[int] = []
+    index: List[int] = [-1] * len(magnets)
+
+    for i, magnet in enumerate(magnets):
+        if not isinstance(magnet, str):
+            continue
+        match = bare_match(magnet) or magnet_search(magnet)
+        if match is None:
+            continue
+        raw = match.group(1)
+        if len(raw) == 40:
+            info_hash = raw.lower()
+        else:
+            try:
+                info_hash = b32decode(raw.upper()).hex()
+            except binascii.Error:
+                continue
+        position = seen.get(info_hash)
+        if position is None:
+            position = seen[info_hash] = len(hashes)
+            hashes.append(info_hash)
+            first.append(i)
+        index[i] = position
+
+    return MagnetBatch(magnets, hashes, index, first)
@@ -0,0 +1,298 @@
+#pylint: disable=C0301
+"""
+Mirror selection for files available from several file hosts.
+
+When the same file is available behind links on different hosts, the MirrorSelector picks which one to unlock. It keeps per-host statistics, smoothed over recent outcomes: unlock latency, the share of unlocks that fail and the download speed reported back after transfers. Links are ranked by the expected time to get the file from their host. Hosts that answered with a temporary refusal (host full, limit reached, unavailable) rest for a cool-down period, and hosts without any history are tried optimistically so they get measured.
+
+Classes
+-------
+HostStats
+    Smoothed performance of one file host.
+MirrorSelector
+    Unlocks the best of several equivalent links, falling back to the others.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.mirrors import MirrorSelector
+>>> selector = MirrorSelector(AllDebrid(apikey="YOUR_API_KEY"), hedge_after=2.0)
+>>> link, response = selector.unlock(["https://rapidgator.net/file/abc", "https://1fichier.com/?xyz"])
+>>> link
+'https://1fichier.com/?xyz'
+>>> selector.record_download(link, 1468006400, 61.5)
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+from .alldebrid import APIError
+
+# Refusals that say the host is busy rather than that the link is bad: the host rests for a while.
+COOL_DOWN_CODES = frozenset({"LINK_HOST_FULL", "LINK_HOST_UNAVAILABLE", "LINK_HOST_LIMIT_REACHED", "LINK_TOO_MANY_DOWNLOADS", "LINK_TEMPORARY_UNAVAILABLE"})
+
+def host_of(link: str) -> str:
+    """
+    Returns the host a link points to, without a leading "www.".
+    """
+    host = (urlparse(link).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class HostStats:
+    """
+    Smoothed performance of one file host.
+
+    Parameters
+    ----------
+    latency : float
+        The assumed unlock latency before any sample, in seconds.
+    success : float
+        The assumed share of successful unlocks before any sample.
+    """
+    __slots__ = ("latency", "success", "speed", "unlocks", "failures", "downloads", "last_error", "resting_until")
+
+    def __init__(self, latency: float, success: float) -> None:
+        self.latency = latency
+        self.success = success
+        self.speed: Optional[float] = None
+        self.unlocks = 0
+        self.failures = 0
+        self.downloads = 0
+        self.last_error: Optional[str] = None
+        self.resting_until = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns the statistics as a dict.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class MirrorSelector:
+    """
+    Unlocks the best of several equivalent links, falling back to the others.
+
+    A link's cost is the expected time to get the file from its host: the unlock latency plus the
+    time to download ``reference_size`` bytes at the host's speed, divided by the host's success
+    rate, plus ``failure_penalty`` for every failure expected before a success. Hosts that have not
+    reported a speed yet are assumed to be as fast as the average host.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client used to unlock links.
+    alpha : float, optional
+        The weight of the newest sample in the smoothed statistics, by default 0.2
+    hedge_after : Optional[float], optional
+        Unlock the next link too if the current one has not answered after this many seconds, keeping
+        whichever succeeds first; None tries the links strictly one after another, by default None
+    cool_down : float, optional
+        How long a host that refused with a busy error is ranked last, in seconds, by default 60
+    reference_size : int, optional
+        The file size used to weigh download speed against unlock latency, in bytes, by default 1 GiB
+    failure_penalty : float, optional
+        The time a failed unlock is taken to cost on top of its latency, in seconds, by default 5
+    clock : Callable[[], float], optional
+        The monotonic clock, by default time.monotonic
+    """
+
+    def __init__(self, client: Any, alpha: float = 0.2, hedge_after: Optional[float] = None, cool_down: float = 60, reference_size: int = 1 << 30, failure_penalty: float = 5, clock: Callable[[], float] = time.monotonic) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.client = client
+        self.alpha = alpha
+        self.hedge_after = hedge_after
+        self.cool_down = cool_down
+        self.reference_size = reference_size
+        self.failure_penalty = failure_penalty
+        self.clock = clock
+        self._hosts: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, host: str) -> HostStats:
+        stats = self._hosts.get(host)
+        if stats is None:
+            # Optimistic priors, so an unknown host gets tried and measured.
+            stats = self._hosts[host] = HostStats(latency=0.0, success=1.0)
+        return stats
+
+    def cost(self, link: str) -> float:
+        """
+        Returns the expected time to get the file behind a link, in seconds; lower is better.
+
+        Parameters
+        ----------
+        link : str
+            The link.
+
+        Returns
+        -------
+        float
+            The cost; infinite while the link's host rests after a busy refusal.
+        """
+        with self._lock:
+            stats = self._stats(host_of(link))
+            if stats.resting_until > self.clock():
+                return float("inf")
+            speeds = [other.speed for other in self._hosts.values() if other.speed]
+            speed = stats.speed or (sum(speeds) / len(speeds) if speeds else None)
+            transfer = self.reference_size / speed if speed else 0.0
+            success = max(stats.success, 0.05)
+            return (stats.latency + transfer) / success + (1 - success) / success * self.failure_penalty
+
+    def rank(self, links: Sequence[str]) -> List[str]:
+        """
+        Returns the links from best to worst, keeping the given order between equal costs.
+
+        Parameters
+        ----------
+        links : Sequence[str]
+            Equivalent links.
+
+        Returns
+        -------
+        List[str]
+            The links, best first.
+        """
+        costs = {link: self.cost(link) for link in links}
+        return sorted(links, key=costs.__getitem__)
+
+    def record_unlock(self, link: str, latency: float, error: Optional[str] = None) -> None:
+        """
+        Records the outcome of an unlock.
+
+        Parameters
+        ----------
+        link : str
+            The link that was unlocked.
+        latency : float
+            How long the unlock took, in seconds.
+        error : Optional[str], optional
+            The error code if it failed, by default None
+        """
+        with self._lock:
+            stats = self._stats(host_of(link))
+            # The first sample replaces the prior latency instead of being averaged into it.
+            stats.latency = latency if stats.unlocks == 0 else stats.latency + self.alpha * (latency - stats.latency)
+            stats.unlocks += 1
+            stats.success += self.alpha * ((error is None) - stats.success)
+            if error is not None:
+                stats.failures += 1
+                stats.last_error = error
+                if error in COOL_DOWN_CODES:
+                    stats.resting_until = self.clock() + self.cool_down
+
+    def record_download(self, link: str, nbytes: int, seconds: float) -> None:
+        """
+        Records the speed of a finished download, so later rankings weigh it in.
+
+        Parameters
+        ----------
+        link : str
+            The source link, or any link on the same host.
+        nbytes : int
+            The bytes transferred.
+        seconds : float
+            How long the transfer took.
+        """
+        if nbytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            stats = self._stats(host_of(link))
+            speed = nbytes / seconds
+            stats.speed = speed if stats.speed is None else stats.speed + self.alpha * (speed - stats.speed)
+            stats.downloads += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a snapshot of the statistics of every host seen.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            Per host: latency, success, speed (bytes per second, None until reported), unlocks,
+            failures, downloads, last_error and resting_until.
+        """
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in sorted(self._hosts.items())}
+
+    def _attempt(self, link: str, password: Optional[str]) -> dict:
+        start = self.clock()
+        try:
+            response = self.client.download_link(link, password=password)
+        except APIError as exc:
+            self.record_unlock(link, self.clock() - start, str(exc.code))
+            raise
+        self.record_unlock(link, self.clock() - start)
+        return response
+
+    @staticmethod
+    def _fatal(exc: APIError) -> bool:
+        # Account-level errors (bad key, banned IP, ...) would fail on every mirror alike.
+        return isinstance(exc.code, str) and not exc.code.startswith(("LINK_", "MUST_BE_PREMIUM"))
+
+    def unlock(self, links: Sequence[str], password: Optional[str] = None) -> Tuple[str, dict]:
+        """
+        Unlocks the best of several links to the same file, falling back to the others.
+
+        Links are tried from best to worst. With ``hedge_after`` set, the next link is started whenever
+        the ones in flight have not answered within that time, and the first success wins.
+
+        Parameters
+        ----------
+        links : Sequence[str]
+            Equivalent links, on different hosts.
+        password : Optional[str], optional
+            The password of the links, by default None
+
+        Returns
+        -------
+        Tuple[str, dict]
+            The link that was unlocked and the download_link response.
+
+        Raises
+        ------
+        ValueError
+            If no links are given.
+        APIError
+            The last error if every link failed, or at once on an error that concerns the account.
+        """
+        if not links:
+            raise ValueError("No links to unlock")
+        ranked = self.rank(list(dict.fromkeys(links)))
+
+        if self.hedge_after is None:
+            error: Optional[APIError] = None
+            for link in ranked:
+                try:
+                    return link, self._attempt(link, password)
+                except APIError as exc:
+                    if self._fatal(exc):
+                        raise
+                    error = exc
+            raise error
+
+        executor = ThreadPoolExecutor(max_workers=len(ranked))
+        pending: Dict[Future, str] = {}
+        remaining = list(ranked)
+        last_error: Optional[APIError] = None
+        try:
+            while remaining or pending:
+                # Start the next link when the previous one failed or is slower than hedge_after.
+                if remaining:
+                    link = remaining.pop(0)
+                    # Copy the context so hedged unlocks keep the caller's priority and deadline.
+                    pending[executor.submit(contextvars.copy_context().run, self._attempt, link, password)] = link
+                done, _ = wait(pending, timeout=self.hedge_after if remaining else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    link = pending.pop(future)
+                    try:
+                        return link, future.result()
+                    except APIError as exc:
+                        if self._fatal(exc):
+                            raise
+                        last_error = exc
+            raise last_error
+        finally:
+            # Losers finish in the background and still update the statistics.
+            executor.shutdown(wait=False)
@@ -0,0 +1,372 @@
+#pylint: disable=C0301
+"""
+One scheduler for every pending delayed-link and magnet poll.
+
+Waiting for a delayed link or a magnet with a sleep loop ties up one thread per pending item, so tens of thousands of pending items need tens of thousands of sleeping threads. The PollScheduler keeps all pending polls in a single heap ordered by due time. One timer thread pops the polls that are due and runs them on a small worker pool; a poll that is not done yet goes back on the heap, and one that is done resolves its future. Magnet polls that fall due together are answered by one magnet status listing instead of one request each. Memory grows by one small record per pending poll, and the thread count stays fixed.
+
+Classes
+-------
+PollScheduler
+    Polls delayed links and magnets on a timer heap and resolves a future for each.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.polling import PollScheduler
+>>> ad = AllDebrid(apikey="YOUR_API_KEY")
+>>> with PollScheduler(ad, interval=3, workers=4) as scheduler:
+...     futures = [scheduler.delayed_link(delayed_id) for delayed_id in delayed_ids]
+...     links = [future.result() for future in futures]
+>>> scheduler.magnet_ready(123).result()["statusCode"]
+4
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .alldebrid import APIError, MaxAttemptsExceededException
+from .deadline import DeadlineExceeded, current_deadline
+
+# Delayed link statuses: still being generated, or ready.
+DELAYED_PROCESSING = 1
+DELAYED_READY = 2
+
+# Magnet status codes: 0-3 are in progress, 4 is ready and anything above is an error.
+MAGNET_READY = 4
+
+class _Poll:
+    """
+    One pending poll and the future it resolves.
+    """
+    __slots__ = ("check", "magnet_id", "future", "context", "deadline", "interval", "max_attempts", "max_delay", "started", "attempts", "counted")
+
+    def __init__(self, check: Callable[[], Tuple[bool, Any]], magnet_id: Optional[int], interval: float, max_attempts: Optional[int], max_delay: Optional[float]) -> None:
+        self.check = check
+        self.magnet_id = magnet_id
+        self.future: Future = Future()
+        # Polls run with the caller's context, so requests keep its priority and deadline.
+        self.context = contextvars.copy_context()
+        self.deadline = current_deadline()
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.max_delay = max_delay
+        self.started = time.monotonic()
+        self.attempts = 0
+        self.counted = True
+
+def _magnet_state(magnet: Dict[str, Any]) -> Tuple[bool, Any]:
+    code = int(magnet.get("statusCode", 0))
+    if code > MAGNET_READY:
+        raise APIError("MAGNET_FAILED", f"{magnet.get('status', 'Error')} (statusCode {code})")
+    return code == MAGNET_READY, magnet
+
+def _settle(future: Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    # A future cancelled by its caller while its poll was running stays cancelled.
+    try:
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+class PollScheduler:
+    """
+    Polls delayed links and magnets on a timer heap and resolves a future for each.
+
+    The first poll runs at once and the next one ``interval`` seconds after the previous one
+    answered, as the sleep loop of StreamLinkProcessor does. Cancelling a future drops its poll.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client the polls are sent with.
+    interval : float, optional
+        The time between two polls of the same item, in seconds, by default 3
+    max_attempts : Optional[int], optional
+        The number of polls after which an item fails with MaxAttemptsExceededException; None polls
+        until it is done, by default 5
+    max_delay : Optional[float], optional
+        The time after which an item that is still pending fails with TimeoutError, in seconds; None
+        never times out, by default 30
+    workers : int, optional
+        The number of polls sent concurrently, by default 4
+    """
+
+    def __init__(self, client: Any, interval: float = 3, max_attempts: Optional[int] = 5, max_delay: Optional[float] = 30, workers: int = 4) -> None:
+        if interval < 0:
+            raise ValueError("interval must not be negative")
+        self.client = client
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.max_delay = max_delay
+        self._heap: List[Tuple[float, int, _Poll]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._active = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alldebrid-poll")
+        self._thread = threading.Thread(target=self._run, name="alldebrid-poll-timer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of polls whose future is not resolved yet.
+        """
+        with self._cond:
+            return self._active
+
+    def schedule(self, check: Callable[[], Tuple[bool, Any]], interval: Optional[float] = None, max_attempts: Optional[int] = None, max_delay: Optional[float] = None) -> Future:
+        """
+        Polls ``check`` until it reports done.
+
+        Parameters
+        ----------
+        check : Callable[[], Tuple[bool, Any]]
+            Sends one poll and returns whether the item is done and its result. An exception fails
+            the future.
+        interval : Optional[float], optional
+            Overrides the scheduler's interval for this poll, by default None
+        max_attempts : Optional[int], optional
+            Overrides the scheduler's max_attempts for this poll, by default None
+        max_delay : Optional[float], optional
+            Overrides the scheduler's max_delay for this poll, by default None
+
+        Returns
+        -------
+        Future
+            Resolves to the result of the poll that reported done.
+
+        Raises
+        ------
+        RuntimeError
+            If the scheduler is closed.
+        """
+        return self._add([(check, None)], interval, max_attempts, max_delay)[0]
+
+    def delayed_link(self, delayed_id: str, interval: Optional[float] = None, max_attempts: Optional[int] = None, max_delay: Optional[float] = None) -> Future:
+        """
+        Polls a delayed link until it is ready.
+
+        Parameters
+        ----------
+        delayed_id : str
+            The "delayed" ID returned by the streaming links endpoint.
+        interval, max_attempts, max_delay : optional
+            Override the scheduler's settings for this poll, as for schedule.
+
+        Returns
+        -------
+        Future
+            Resolves to the direct link, or fails with APIError, TimeoutError, DeadlineExceeded or
+            MaxAttemptsExceededException.
+        """
+        def check() -> Tuple[bool, Any]:
+            data = self.client.delayed_links(download_id=delayed_id)["data"]
+            return data.get("status") == DELAYED_READY, data.get("link")
+
+        return self._add([(check, None)], interval, max_attempts, max_delay)[0]
+
+    def magnet_ready(self, magnet_id: int, interval: Optional[float] = None, max_attempts: Optional[int] = None, max_delay: Optional[float] = None) -> Future:
+        """
+        Polls a magnet until it is ready.
+
+        Parameters
+        ----------
+        magnet_id : int
+            The magnet ID.
+        interval, max_attempts, max_delay : optional
+            Override the scheduler's settings for this poll, as for schedule.
+
+        Returns
+        -------
+        Future
+            Resolves to the magnet, as the magnet status endpoint returns it, or fails with APIError
+            (code "MAGNET_FAILED" if the magnet ended in an error status), TimeoutError,
+            DeadlineExceeded or MaxAttemptsExceededException.
+        """
+        return self.magnets_ready([magnet_id], interval, max_attempts, max_delay)[magnet_id]
+
+    def magnets_ready(self, magnet_ids: Iterable[int], interval: Optional[float] = None, max_attempts: Optional[int] = None, max_delay: Optional[float] = None) -> Dict[int, Future]:
+        """
+        Polls several magnets until each is ready, starting them in the same tick so they share listings.
+
+        Parameters
+        ----------
+        magnet_ids : Iterable[int]
+            The magnet IDs, e.g. those of one upload_magnets call.
+        interval, max_attempts, max_delay : optional
+            Override the scheduler's settings for these polls, as for schedule.
+
+        Returns
+        -------
+        Dict[int, Future]
+            A future per magnet ID, resolving as for magnet_ready.
+        """
+        def check_of(magnet_id: int) -> Callable[[], Tuple[bool, Any]]:
+            def check() -> Tuple[bool, Any]:
+                magnets = self.client.get_magnet_status(magnet_id)["data"]["magnets"]
+                return _magnet_state(magnets[0] if isinstance(magnets, list) else magnets)
+            return check
+
+        ids = list(dict.fromkeys(magnet_ids))
+        futures = self._add([(check_of(magnet_id), magnet_id) for magnet_id in ids], interval, max_attempts, max_delay)
+        return dict(zip(ids, futures))
+
+    def close(self) -> None:
+        """
+        Cancels the polls still waiting and stops the scheduler once the running ones answered.
+        """
+        with self._cond:
+            self._closed = True
+            waiting, self._heap = self._heap, []
+            self._cond.notify()
+        for _, _, poll in waiting:
+            poll.future.cancel()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "PollScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _add(self, checks: List[Tuple[Callable[[], Tuple[bool, Any]], Optional[int]]], interval: Optional[float], max_attempts: Optional[int], max_delay: Optional[float]) -> List[Future]:
+        polls = [
+            _Poll(
+                check,
+                magnet_id,
+                self.interval if interval is None else interval,
+                self.max_attempts if max_attempts is None else max_attempts,
+                self.max_delay if max_delay is None else max_delay,
+            )
+            for check, magnet_id in checks
+        ]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PollScheduler is closed")
+            self._active += len(polls)
+            for poll in polls:
+                self._push(poll, poll.started)
+        for poll in polls:
+            poll.future.add_done_callback(lambda _, poll=poll: self._uncount(poll))
+        return [poll.future for poll in polls]
+
+    def _uncount(self, poll: _Poll) -> None:
+        # Runs before the scheduler resolves a future, so pending is exact once a result is seen; the
+        # done callback covers futures cancelled by their caller.
+        with self._cond:
+            if poll.counted:
+                poll.counted = False
+                self._active -= 1
+
+    def _resolve(self, poll: _Poll, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        self._uncount(poll)
+        _settle(poll.future, result, exc)
+
+    def _push(self, poll: _Poll, due: float) -> None:
+        # Called with the condition held; wake the timer only if the earliest due time moved.
+        heapq.heappush(self._heap, (due, next(self._sequence), poll))
+        if self._heap[0][2] is poll:
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[2])
+            self._dispatch(due)
+
+    def _dispatch(self, due: List[_Poll]) -> None:
+        magnets: List[_Poll] = []
+        for poll in due:
+            if poll.future.done():
+                continue
+            if poll.magnet_id is not None:
+                magnets.append(poll)
+            else:
+                self._executor.submit(poll.context.run, self._poll_one, poll)
+        if len(magnets) == 1:
+            self._executor.submit(magnets[0].context.run, self._poll_one, magnets[0])
+        elif magnets:
+            self._executor.submit(self._poll_magnets, magnets)
+
+    def _poll_one(self, poll: _Poll) -> None:
+        try:
+            done, value = poll.check()
+        except Exception as exc: # pylint: disable=W0703
+            self._after(poll, exc=exc)
+            return
+        self._after(poll, done, value)
+
+    def _poll_magnets(self, polls: List[_Poll]) -> None:
+        # One listing answers every magnet that fell due in the same tick.
+        wanted: Dict[int, List[_Poll]] = {}
+        for poll in polls:
+            wanted.setdefault(int(poll.magnet_id), []).append(poll)
+        found: Dict[int, Dict[str, Any]] = {}
+        try:
+            for magnet in self.client.iter_magnets():
+                if int(magnet.get("id", -1)) in wanted:
+                    found[int(magnet["id"])] = magnet
+        except Exception as exc: # pylint: disable=W0703
+            for poll in polls:
+                self._after(poll, exc=exc)
+            return
+        for magnet_id, group in wanted.items():
+            for poll in group:
+                if magnet_id not in found:
+                    self._after(poll, exc=APIError("MAGNET_INVALID_ID", f"Magnet {magnet_id} is not in the magnet status listing"))
+                    continue
+                try:
+                    done, value = _magnet_state(found[magnet_id])
+                except APIError as exc:
+                    self._after(poll, exc=exc)
+                    continue
+                self._after(poll, done, value)
+
+    def _after(self, poll: _Poll, done: bool = False, value: Any = None, exc: Optional[BaseException] = None) -> None:
+        if poll.future.done():
+            return
+        if exc is not None:
+            self._resolve(poll, exc=exc)
+            return
+        if done:
+            self._resolve(poll, value)
+            return
+
+        poll.attempts += 1
+        if poll.max_attempts is not None and poll.attempts >= poll.max_attempts:
+            self._resolve(poll, exc=MaxAttemptsExceededException("Max attempts reached. Item is not ready."))
+            return
+        now = time.monotonic()
+        if poll.max_delay is not None and now - poll.started >= poll.max_delay:
+            self._resolve(poll, exc=TimeoutError("Max delay reached. Item is not ready."))
+            return
+        if poll.deadline is not None and poll.deadline.remaining() <= poll.interval:
+            # The next poll would start after the deadline; fail now rather than wait through it.
+            self._resolve(poll, exc=DeadlineExceeded("Deadline reached before the item was ready."))
+            return
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                self._push(poll, now + poll.interval)
+        if closed:
+            poll.future.cancel()
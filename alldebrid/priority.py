@@ -0,0 +1,210 @@
+#pylint: disable=C0301
+"""
+Priority lanes for requests sharing one AllDebrid client.
+
+A PriorityDispatcher admits requests onto the client's connection pool by priority. High priority requests have connections (and optionally rate-limit tokens) reserved for them, so interactive calls are not queued behind a background sweep, and the remaining lanes share the rest of the capacity by weighted fair scheduling.
+
+The priority of a request is taken from the calling context, set with the request_priority context manager.
+
+Classes
+-------
+PriorityDispatcher
+    Admits requests onto a bounded number of connections by priority.
+
+Functions
+---------
+- request_priority(): Context manager setting the priority of the requests made inside it.
+- current_priority(): Returns the priority of the current context.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.priority import HIGH, LOW, PriorityDispatcher, request_priority
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", pool_maxsize=16, dispatcher=PriorityDispatcher(capacity=16, reserved=4))
+>>> with request_priority(HIGH):
+...     ad.download_link("https://host.example/file")
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+from .ratelimit import RateLimiter
+
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("alldebrid_priority", default=NORMAL)
+
+def current_priority() -> int:
+    """
+    Returns the priority of the current context.
+
+    Returns
+    -------
+    int
+        HIGH, NORMAL or LOW.
+    """
+    return _priority.get()
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    Sets the priority of the requests made inside the block.
+
+    Notes
+    -----
+    The priority is stored in a context variable, so it follows the current thread (or asyncio task)
+    but not work submitted to other threads; set it inside the submitted function instead.
+
+    Parameters
+    ----------
+    priority : int
+        HIGH, NORMAL or LOW.
+    """
+    if priority not in (HIGH, NORMAL, LOW):
+        raise ValueError(f"Unknown priority {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self) -> None:
+        self.granted = False
+
+class PriorityDispatcher:
+    """
+    Admits requests onto a bounded number of connections by priority.
+
+    Parameters
+    ----------
+    capacity : int
+        The number of requests allowed in flight at once, normally the client's pool_maxsize.
+    reserved : int, optional
+        The part of the capacity only HIGH priority requests may use, by default 1
+    weights : Optional[Dict[int, int]], optional
+        The share of the remaining capacity given to NORMAL and LOW requests when both are
+        waiting, by default {NORMAL: 4, LOW: 1}
+    rate_limiter : Optional[RateLimiter], optional
+        A rate limiter applied to every admitted request, by default None
+    rate_reserve : float, optional
+        The number of rate-limit tokens NORMAL and LOW requests must leave for HIGH ones, by default 0
+    """
+
+    def __init__(self, capacity: int, reserved: int = 1, weights: Optional[Dict[int, int]] = None, rate_limiter: Optional[RateLimiter] = None, rate_reserve: float = 0) -> None:
+        if capacity < 1 or not 0 <= reserved < capacity:
+            raise ValueError("capacity must be at least 1 and reserved smaller than capacity")
+        self.capacity = capacity
+        self.reserved = reserved
+        self.weights = weights or {NORMAL: 4, LOW: 1}
+        self.rate_limiter = rate_limiter
+        self.rate_reserve = rate_reserve
+        self.in_flight = 0
+        self._lanes: Dict[int, Deque[_Ticket]] = {HIGH: deque(), NORMAL: deque(), LOW: deque()}
+        # Stride scheduling: the lane with the lowest pass value goes next.
+        self._pass: Dict[int, float] = {NORMAL: 0.0, LOW: 0.0}
+        self._cond = threading.Condition()
+
+    def _next_shared_lane(self) -> Optional[int]:
+        waiting = [lane for lane in (NORMAL, LOW) if self._lanes[lane]]
+        if not waiting:
+            return None
+        return min(waiting, key=lambda lane: (self._pass[lane], lane))
+
+    def _grant(self) -> None:
+        granted = False
+        while self.in_flight < self.capacity:
+            if self._lanes[HIGH]:
+                ticket = self._lanes[HIGH].popleft()
+            else:
+                if self.in_flight >= self.capacity - self.reserved:
+                    break
+                lane = self._next_shared_lane()
+                if lane is None:
+                    break
+                ticket = self._lanes[lane].popleft()
+                self._pass[lane] += 1.0 / self.weights.get(lane, 1)
+            ticket.granted = True
+            self.in_flight += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a slot in the lane of ``priority`` (by default the current context's priority).
+
+        Parameters
+        ----------
+        priority : Optional[int], optional
+            HIGH, NORMAL or LOW, by default current_priority().
+        timeout : Optional[float], optional
+            The maximum time to wait in seconds, by default None (wait as long as needed)
+
+        Returns
+        -------
+        bool
+            True if a slot was taken, False if the timeout expired first.
+        """
+        priority = current_priority() if priority is None else priority
+        end = None if timeout is None else time.monotonic() + timeout
+        ticket = _Ticket()
+        with self._cond:
+            lane = self._lanes[priority]
+            if priority != HIGH and not lane:
+                # A lane that was idle rejoins at the current virtual time instead of catching up.
+                others = [self._pass[other] for other in (NORMAL, LOW) if other != priority and self._lanes[other]]
+                if others:
+                    self._pass[priority] = max(self._pass[priority], min(others))
+            lane.append(ticket)
+            self._grant()
+            while not ticket.granted:
+                if end is None:
+                    self._cond.wait()
+                    continue
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    lane.remove(ticket)
+                    return False
+                self._cond.wait(remaining)
+
+        if self.rate_limiter is not None:
+            try:
+                taken = self.rate_limiter.acquire(timeout=None if end is None else max(0.0, end - time.monotonic()), reserve=0 if priority == HIGH else self.rate_reserve)
+            except BaseException:
+                self.release()
+                raise
+            if not taken:
+                self.release()
+                return False
+        return True
+
+    def release(self) -> None:
+        """
+        Frees a slot taken with acquire.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._grant()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None) -> Iterator[None]:
+        """
+        Holds a slot for the duration of the block.
+
+        Parameters
+        ----------
+        priority : Optional[int], optional
+            HIGH, NORMAL or LOW, by default current_priority().
+        """
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
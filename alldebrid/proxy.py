@@ -0,0 +1,241 @@
+#pylint: disable=C0301
+"""
+Embeddable local HTTP proxy for AllDebrid-backed content.
+
+The StreamProxy maps stable local URLs to source links. A link is only resolved to a direct URL (through the AllDebrid client) when a player first requests it, the resolved URL is cached for later plays, and every request, including Range requests used for seeking, is passed through to the file host over a pooled keep-alive session.
+
+Classes
+-------
+StreamProxy
+    Local HTTP server resolving registered links on demand.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.proxy import StreamProxy
+>>> proxy = StreamProxy(AllDebrid(apikey="YOUR_API_KEY"))
+>>> proxy.start()
+>>> proxy.register("https://host.example/file")
+'http://127.0.0.1:49152/3f786850e387550f'
+"""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+import requests
+from .linkstore import LinkStore
+
+_EXPIRED_STATUS = (401, 403, 404, 410)
+_FORWARDED_HEADERS = ("Content-Type", "Content-Length", "Content-Range", "Content-Encoding", "Accept-Ranges", "Last-Modified", "ETag", "Content-Disposition")
+
+class _ResolveCache:
+    """
+    Caches resolved direct URLs and collapses concurrent resolutions of the same link into one.
+    """
+
+    def __init__(self, resolver: Callable[[str], str], ttl: float) -> None:
+        self.resolver = resolver
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, link: str) -> str:
+        """
+        Returns the cached direct URL of ``link``, resolving it if missing or stale.
+        """
+        entry = self._entries.get(link)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+        with self._lock:
+            link_lock = self._locks.setdefault(link, threading.Lock())
+        with link_lock:
+            entry = self._entries.get(link)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                return entry[0]
+            url = self.resolver(link)
+            self._entries[link] = (url, time.monotonic())
+            return url
+
+    def invalidate(self, link: str) -> None:
+        """
+        Drops the cached direct URL of ``link``.
+        """
+        self._entries.pop(link, None)
+
+class StreamProxy:
+    """
+    Local HTTP server resolving registered links on demand.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client used to resolve links.
+    host : str, optional
+        The interface to listen on, by default "127.0.0.1"
+    port : int, optional
+        The port to listen on, by default 0 (any free port)
+    resolver : Optional[Callable[[str], str]], optional
+        Turns a source link into a direct URL, by default unlocking it with client.download_link.
+    cache_ttl : float, optional
+        How long a resolved direct URL is reused, in seconds, by default 1800
+    pool_size : int, optional
+        The number of keep-alive connections kept to the file hosts, by default 16
+    chunk_size : int, optional
+        The size of the buffer used to relay bodies, by default 64 KiB
+    timeout : int, optional
+        The timeout of requests to the file hosts, by default 30
+    store : Optional[LinkStore], optional
+        A LinkStore to resolve links through instead of the proxy's own cache, so its background
+        refresher keeps the direct URLs valid, by default None
+    """
+
+    def __init__(self, client: Any, host: str = "127.0.0.1", port: int = 0, resolver: Optional[Callable[[str], str]] = None, cache_ttl: float = 1800, pool_size: int = 16, chunk_size: int = 64 * 1024, timeout: int = 30, store: Optional[LinkStore] = None) -> None:
+        self.client = client
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.cache = store if store is not None else _ResolveCache(resolver or self._unlock, cache_ttl)
+        self.links: Dict[str, str] = {}
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL of the proxy.
+
+        Returns
+        -------
+        str
+            The base URL, without trailing slash.
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def register(self, link: str) -> str:
+        """
+        Registers a source link and returns its stable local URL. Nothing is resolved until the URL is requested.
+
+        Parameters
+        ----------
+        link : str
+            The source link.
+
+        Returns
+        -------
+        str
+            The local URL serving the link.
+        """
+        key = hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+        self.links[key] = link
+        return f"{self.url}/{key}"
+
+    def start(self) -> "StreamProxy":
+        """
+        Starts serving in a background thread.
+
+        Returns
+        -------
+        StreamProxy
+            The proxy itself.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.server.serve_forever, name="alldebrid-proxy", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the upstream connections.
+        """
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+        self.session.close()
+
+    def __enter__(self) -> "StreamProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _unlock(self, link: str) -> str:
+        response = self.client.download_link(link)
+        url = response.get("data", {}).get("link")
+        if not url:
+            raise ValueError(f"Could not obtain a direct link for {link}")
+        return url
+
+    def _open_upstream(self, link: str, method: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        Opens the upstream response, re-resolving the link once if its cached direct URL has expired.
+        """
+        for attempt in range(2):
+            url = self.cache.get(link)
+            response = self.session.request(method, url, headers=headers, stream=True, timeout=self.timeout)
+            if response.status_code not in _EXPIRED_STATUS or attempt == 1:
+                return response
+            response.close()
+            self.cache.invalidate(link)
+        return response
+
+    def _handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # pylint: disable=W0221
+                pass
+
+            def do_GET(self):  # pylint: disable=C0103
+                self._relay("GET")
+
+            def do_HEAD(self):  # pylint: disable=C0103
+                self._relay("HEAD")
+
+            def _error(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _relay(self, method: str) -> None:
+                link = proxy.links.get(self.path.strip("/").split("?", 1)[0])
+                if link is None:
+                    self._error(404)
+                    return
+
+                headers = {name: self.headers[name] for name in ("Range", "If-Range") if self.headers.get(name)}
+                try:
+                    upstream = proxy._open_upstream(link, method, headers)  # pylint: disable=W0212
+                except Exception:  # pylint: disable=W0703
+                    self._error(502)
+                    return
+
+                with upstream:
+                    self.send_response(upstream.status_code)
+                    for name in _FORWARDED_HEADERS:
+                        if name in upstream.headers:
+                            self.send_header(name, upstream.headers[name])
+                    if "Content-Length" not in upstream.headers:
+                        self.close_connection = True
+                    self.end_headers()
+                    if method == "HEAD":
+                        return
+                    try:
+                        for chunk in upstream.raw.stream(proxy.chunk_size, decode_content=False):
+                            self.wfile.write(chunk)
+                    except (BrokenPipeError, ConnectionResetError):
+                        self.close_connection = True
+
+        return Handler
@@ -0,0 +1,152 @@
+#pylint: disable=C0301
+"""
+Token bucket rate limiters for the AllDebrid client.
+
+A RateLimiter throttles the requests of every thread in a process. A SharedRateLimiter keeps its bucket in shared memory so that worker processes created with multiprocessing or ProcessPoolExecutor draw from one budget, which is what the API's per-key limits require.
+
+Classes
+-------
+RateLimiter
+    Thread-safe token bucket.
+SharedRateLimiter
+    Token bucket shared by a process tree.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.ratelimit import SharedRateLimiter
+>>> limiter = SharedRateLimiter(rate=12, burst=12)
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", rate_limiter=limiter)
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from multiprocessing import context as mp_context
+from typing import Optional
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added per second.
+    burst : Optional[int]
+        The capacity of the bucket, by default one second worth of tokens.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._lock = threading.Lock()
+        # [available tokens, time of the last refill]
+        self._state = [float(self.burst), time.monotonic()]
+
+    def _take(self, tokens: float, reserve: float = 0) -> float:
+        """
+        Takes ``tokens`` if available and returns 0, otherwise returns the seconds to wait for them.
+        """
+        with self._lock:
+            state = self._state
+            now = time.monotonic()
+            available = min(self.burst, state[0] + (now - state[1]) * self.rate)
+            state[1] = now
+            if available - reserve >= tokens:
+                state[0] = available - tokens
+                return 0.0
+            state[0] = available
+            return (tokens + reserve - available) / self.rate
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None, reserve: float = 0) -> bool:
+        """
+        Waits until ``tokens`` are available and takes them.
+
+        Parameters
+        ----------
+        tokens : float, optional
+            The number of tokens to take, by default 1
+        timeout : Optional[float], optional
+            The maximum time to wait in seconds, by default None (wait as long as needed)
+        reserve : float, optional
+            The number of tokens that must be left in the bucket after taking, kept for callers
+            that acquire without a reserve, by default 0
+
+        Returns
+        -------
+        bool
+            True if the tokens were taken, False if the timeout expired first.
+        """
+        if tokens + reserve > self.burst:
+            raise ValueError("Cannot acquire more tokens than the bucket holds")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(tokens, reserve)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+# Every SharedRateLimiter known to this process, so pickled references can be resolved by name.
+_shared_limiters: "dict[str, SharedRateLimiter]" = {}
+
+def _lookup_shared_limiter(name: str) -> "SharedRateLimiter":
+    limiter = _shared_limiters.get(name)
+    if limiter is None:
+        raise RuntimeError(
+            f"SharedRateLimiter {name} is not available in this process. Create it before forking, "
+            "or pass it to the worker processes through the pool initializer."
+        )
+    return limiter
+
+def _rebuild_shared_limiter(name: str, rate: float, burst: int, state, lock) -> "SharedRateLimiter":
+    limiter = _shared_limiters.get(name)
+    if limiter is None:
+        limiter = SharedRateLimiter.__new__(SharedRateLimiter)
+        limiter.name, limiter.rate, limiter.burst = name, rate, burst
+        limiter._state, limiter._lock = state, lock  # pylint: disable=W0212
+        _shared_limiters[name] = limiter
+    return limiter
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Token bucket shared by a process tree.
+
+    Notes
+    -----
+    The bucket lives in shared memory. Forked children inherit it, and spawned workers receive it
+    when it is passed through a pool initializer or as a Process argument. Afterwards it, and any
+    AllDebrid client using it, can be pickled freely between those processes: it travels by name.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added per second.
+    burst : Optional[int]
+        The capacity of the bucket, by default one second worth of tokens.
+    ctx : Optional[multiprocessing.context.BaseContext]
+        The multiprocessing context used to allocate the shared state, by default the current one.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, ctx=None) -> None:  # pylint: disable=W0231
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        ctx = ctx or multiprocessing.get_context()
+        self.name = uuid.uuid4().hex
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._lock = ctx.Lock()
+        self._state = ctx.RawArray("d", [float(self.burst), time.monotonic()])
+        _shared_limiters[self.name] = self
+
+    def __reduce__(self):
+        if mp_context.get_spawning_popen() is not None:
+            return _rebuild_shared_limiter, (self.name, self.rate, self.burst, self._state, self._lock)
+        return _lookup_shared_limiter, (self.name,)
@@ -0,0 +1,174 @@
+#pylint: disable=C0301
+"""
+Traffic capture for the AllDebrid client.
+
+The RecordingTransport wraps another transport and appends one JSON line per request to a capture file: when it started, the endpoint and parameters, how long it took, and the response. Credentials and personal fields are redacted before anything is written. Captures are replayed offline with alldebrid.replay.
+
+Classes
+-------
+RecordingTransport
+    A transport that records every request it passes on.
+
+Functions
+---------
+- load_recording(): Reads a capture file.
+- redact(): Returns a copy of a JSON value with sensitive fields replaced.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.recording import RecordingTransport
+>>> from alldebrid.transport import RequestsTransport
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", transport=RecordingTransport(RequestsTransport(), "capture.ndjson"))
+>>> ad.ping()
+{'status': 'success', 'data': {'ping': 'pong'}}
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from .transport import Transport, TransportError, TransportResponse, _query_pairs
+
+# Fields holding credentials or personal data, in parameters and responses alike.
+REDACTED_FIELDS = frozenset({"apikey", "token", "pin", "check", "email", "username", "ip", "password"})
+
+REDACTED = "<redacted>"
+
+def redact(value: Any, fields: Iterable[str] = REDACTED_FIELDS) -> Any:
+    """
+    Returns a copy of a JSON value with the values of sensitive fields replaced.
+
+    Parameters
+    ----------
+    value : Any
+        A JSON value.
+    fields : Iterable[str], optional
+        The names of the fields to redact, at any depth, by default REDACTED_FIELDS
+
+    Returns
+    -------
+    Any
+        The redacted copy.
+    """
+    fields = fields if isinstance(fields, frozenset) else frozenset(fields)
+    if isinstance(value, dict):
+        return {key: REDACTED if key in fields else redact(item, fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, fields) for item in value]
+    return value
+
+def _fields(pairs: List[Tuple[str, Any]]) -> Dict[str, List[str]]:
+    fields: Dict[str, List[str]] = {}
+    for key, value in pairs:
+        fields.setdefault(key, []).append(str(value))
+    return fields
+
+def endpoint_of(url: str) -> str:
+    """
+    Returns the API endpoint of a request URL, e.g. "magnet/status".
+    """
+    path = urlparse(url).path
+    return path.split("/v4/", 1)[1] if "/v4/" in path else path.lstrip("/")
+
+class RecordingTransport(Transport):
+    """
+    A transport that records every request it passes on.
+
+    Each request appends one line to ``path``: a JSON object with ``t`` (start time, seconds since
+    the epoch), ``method``, ``endpoint``, ``params`` and ``data`` (as lists of values per field),
+    ``files`` (file name and size per field), ``latency`` (seconds), and either ``status`` and
+    ``response`` or ``error``. The Authorization header is never recorded.
+
+    Parameters
+    ----------
+    transport : Transport
+        The transport that sends the requests.
+    path : str
+        The capture file, appended to.
+    redact_fields : Iterable[str], optional
+        Fields redacted from parameters and responses, by default REDACTED_FIELDS
+    clock : Callable[[], float], optional
+        The clock for start times, by default time.time
+    """
+
+    def __init__(self, transport: Transport, path: str, redact_fields: Iterable[str] = REDACTED_FIELDS, clock: Callable[[], float] = time.time) -> None:
+        self.transport = transport
+        self.path = path
+        self.redact_fields = frozenset(redact_fields)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8") # pylint: disable=R1732
+            self._file.write(line)
+            self._file.flush()
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        query = parse_qs(urlparse(url).query)
+        for key, values in _fields(_query_pairs(params)).items():
+            query.setdefault(key, []).extend(values)
+        record = {
+            "t": round(self.clock(), 6),
+            "method": method,
+            "endpoint": endpoint_of(url),
+            "params": redact(query, self.redact_fields),
+            "data": redact(_fields(_query_pairs(data)), self.redact_fields),
+            "files": {key: [value[0], len(value[1])] for key, value in (files or {}).items()},
+        }
+
+        start = time.monotonic()
+        try:
+            response = self.transport.request(method, url, headers, params=params, data=data, files=files, timeout=timeout)
+        except TransportError as exc:
+            record["latency"] = round(time.monotonic() - start, 6)
+            record["error"] = str(exc)
+            self._write(record)
+            raise
+        record["latency"] = round(time.monotonic() - start, 6)
+        record["status"] = response.status_code
+        try:
+            record["response"] = redact(response.json(), self.redact_fields)
+        except ValueError:
+            record["response"] = None
+        self._write(record)
+        return response
+
+    def close(self) -> None:
+        """
+        Closes the wrapped transport's connections and the capture file.
+        """
+        self.transport.close()
+        with self._lock:
+            file, self._file = self._file, None
+        if file is not None:
+            file.close()
+
+    def reset_after_fork(self) -> None:
+        # Keep appending to the same file from the child, through its own handle.
+        self.transport.reset_after_fork()
+        self._lock = threading.Lock()
+        self._file = None
+
+def load_recording(path: str) -> List[dict]:
+    """
+    Reads a capture file written by RecordingTransport.
+
+    Parameters
+    ----------
+    path : str
+        The capture file.
+
+    Returns
+    -------
+    List[dict]
+        The records, ordered by start time.
+    """
+    with open(path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    records.sort(key=lambda record: record["t"])
+    return records
@@ -0,0 +1,323 @@
+#pylint: disable=C0301
+"""
+Offline replay of traffic captured with RecordingTransport.
+
+A ReplayServer is a local HTTP stand-in for the API that answers each request with a recorded response after the recorded latency. The replay function drives a client with the recorded requests at their original inter-arrival times, optionally sped up, and reports the latency seen per endpoint, which makes a capture of production traffic usable as a repeatable load test.
+
+Classes
+-------
+ResponseBook
+    Looks up recorded responses for incoming requests.
+ReplayServer
+    A local HTTP server answering with recorded responses.
+ReplayTransport
+    Answers with recorded responses without any I/O.
+
+Functions
+---------
+- replay(): Sends the recorded requests through a client on the recorded schedule and reports the latencies.
+- main(): Command-line entry point, ``python -m alldebrid.replay capture.ndjson --speed 10``.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.recording import load_recording
+>>> from alldebrid.replay import ReplayServer, replay
+>>> records = load_recording("capture.ndjson")
+>>> with ReplayServer(records, speed=10) as server:
+...     report = replay(AllDebrid(apikey="r" * 20, base_url=server.base_url), records, speed=10)
+>>> report["link/unlock"]
+{'count': 1200, 'errors': 0, 'p50': 0.021, 'p99': 0.094}
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from .recording import endpoint_of, load_recording
+from .transport import Transport, TransportError, TransportResponse, _query_pairs
+
+_NOT_FOUND = {"status": "error", "error": {"code": "404", "message": "Endpoint doesn't exist"}}
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # A replay opens many connections at once; a short listen backlog would drop some and stall them.
+    request_queue_size = 1024
+
+def _key(method: str, endpoint: str, fields: Mapping[str, List[str]]) -> Tuple:
+    return (method, endpoint, tuple(sorted((key, tuple(values)) for key, values in fields.items() if key != "agent")))
+
+class ResponseBook:
+    """
+    Looks up recorded responses for incoming requests.
+
+    A request gets the next unused response recorded for the same method, endpoint and parameters;
+    once those run out, or if there were none, it gets the endpoint's responses in turn.
+
+    Parameters
+    ----------
+    records : List[dict]
+        The records, as returned by load_recording.
+    """
+
+    def __init__(self, records: List[dict]) -> None:
+        self._exact: Dict[Tuple, Deque[dict]] = {}
+        self._by_endpoint: Dict[Tuple[str, str], List[dict]] = {}
+        self._turn: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        for record in records:
+            fields = dict(record.get("params") or {})
+            for key, values in (record.get("data") or {}).items():
+                fields.setdefault(key, []).extend(values)
+            self._exact.setdefault(_key(record["method"], record["endpoint"], fields), deque()).append(record)
+            self._by_endpoint.setdefault((record["method"], record["endpoint"]), []).append(record)
+
+    def lookup(self, method: str, endpoint: str, fields: Mapping[str, List[str]]) -> Optional[dict]:
+        """
+        Returns the record answering a request, or None if the endpoint was never recorded.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        endpoint : str
+            The endpoint, e.g. "magnet/status".
+        fields : Mapping[str, List[str]]
+            The query and form fields of the request.
+
+        Returns
+        -------
+        Optional[dict]
+            The record.
+        """
+        with self._lock:
+            exact = self._exact.get(_key(method, endpoint, fields))
+            if exact:
+                return exact.popleft()
+            candidates = self._by_endpoint.get((method, endpoint))
+            if not candidates:
+                return None
+            turn = self._turn.get((method, endpoint), 0)
+            self._turn[(method, endpoint)] = turn + 1
+            return candidates[turn % len(candidates)]
+
+class ReplayServer:
+    """
+    A local HTTP server answering with recorded responses.
+
+    Each response is sent after the recorded latency divided by ``speed``. Requests the capture has
+    no answer for get the API's 404 error.
+
+    Parameters
+    ----------
+    records : List[dict]
+        The records, as returned by load_recording.
+    speed : float, optional
+        How much faster than recorded to answer, by default 1.0
+    host : str, optional
+        The address to listen on, by default "127.0.0.1"
+    port : int, optional
+        The port to listen on, by default 0 (any free port)
+    """
+
+    def __init__(self, records: List[dict], speed: float = 1.0, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.book = ResponseBook(records)
+        self.speed = speed
+        self.server = _Server((host, port), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL to give the client, ending with "/v4/".
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v4/"
+
+    def start(self) -> None:
+        """
+        Starts serving in a background thread.
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops serving.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):  # pylint: disable=W0221
+                pass
+
+            def do_GET(self):  # pylint: disable=C0103
+                self._answer("GET", b"")
+
+            def do_POST(self):  # pylint: disable=C0103
+                length = int(self.headers.get("Content-Length") or 0)
+                self._answer("POST", self.rfile.read(length) if length else b"")
+
+            def _answer(self, method, body):
+                url = urlparse(self.path)
+                fields = parse_qs(url.query)
+                if body and self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                    for key, values in parse_qs(body.decode()).items():
+                        fields.setdefault(key, []).extend(values)
+                record = owner.book.lookup(method, endpoint_of(url.path), fields)
+                if record is not None:
+                    time.sleep(record.get("latency", 0) / owner.speed)
+                status = record.get("status", 200) if record is not None else 200
+                payload = record.get("response") if record is not None else _NOT_FOUND
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+class ReplayTransport(Transport):
+    """
+    Answers with recorded responses without any I/O.
+
+    Recorded transport errors are raised again, after the recorded latency divided by ``speed``.
+
+    Parameters
+    ----------
+    records : List[dict]
+        The records, as returned by load_recording.
+    speed : float, optional
+        How much faster than recorded to answer, by default 1.0
+    """
+
+    def __init__(self, records: List[dict], speed: float = 1.0) -> None:
+        self.book = ResponseBook(records)
+        self.speed = speed
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        fields = parse_qs(urlparse(url).query)
+        for key, value in _query_pairs(params) + _query_pairs(data):
+            fields.setdefault(key, []).append(str(value))
+        record = self.book.lookup(method, endpoint_of(url), fields)
+        if record is None:
+            return TransportResponse(200, json.dumps(_NOT_FOUND).encode())
+        time.sleep(record.get("latency", 0) / self.speed)
+        if "error" in record:
+            raise TransportError(record["error"])
+        return TransportResponse(record.get("status", 200), json.dumps(record.get("response")).encode())
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+def replay(client: Any, records: List[dict], speed: float = 1.0, workers: int = 64) -> Dict[str, Dict[str, float]]:
+    """
+    Sends the recorded requests through a client on the recorded schedule and reports the latencies.
+
+    Requests go through the client's full request path (rate limiter, dispatcher, hedging, transport),
+    started at their recorded offsets divided by ``speed``. Files are replaced by zero bytes of the
+    recorded size.
+
+    Parameters
+    ----------
+    client : AllDebrid
+        The client to drive, normally pointed at a ReplayServer.
+    records : List[dict]
+        The records, as returned by load_recording.
+    speed : float, optional
+        How much faster than recorded to send, by default 1.0
+    workers : int, optional
+        The number of requests that may be in flight at once, by default 64
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Per endpoint: count, errors (failed requests and API errors), p50 and p99 latency in seconds. The "_schedule" entry holds
+        the largest delay in starting a request (max_lag) and the total duration.
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    max_lag = 0.0
+
+    def send(record: dict) -> None:
+        params = {key: values for key, values in (record.get("params") or {}).items() if key != "agent"}
+        data = record.get("data") or {}
+        files = {key: (name, b"\0" * size, "application/octet-stream") for key, (name, size) in (record.get("files") or {}).items()}
+        agent = ((record.get("params") or {}).get("agent") or ["python"])[0]
+        start = time.perf_counter()
+        try:
+            response = client._request(record["method"], record["endpoint"], agent=agent, params=params or None, files=files or None, magnets=data.get("magnets[]"), links=data.get("links[]")) # pylint: disable=W0212
+            failed = response.get("status") == "error"
+        except Exception: # pylint: disable=W0703
+            failed = True
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.setdefault(record["endpoint"], []).append(elapsed)
+            errors[record["endpoint"]] = errors.get(record["endpoint"], 0) + failed
+
+    origin = records[0]["t"] if records else 0.0
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for record in records:
+            due = begin + (record["t"] - origin) / speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                max_lag = max(max_lag, -wait)
+            executor.submit(send, record)
+    duration = time.perf_counter() - begin
+
+    report: Dict[str, Dict[str, float]] = {
+        endpoint: {"count": len(samples), "errors": errors[endpoint], "p50": _percentile(samples, 0.5), "p99": _percentile(samples, 0.99)}
+        for endpoint, samples in sorted(latencies.items())
+    }
+    report["_schedule"] = {"max_lag": max_lag, "duration": duration}
+    return report
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Replays a capture file against a local ReplayServer and prints the report as JSON.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        The command-line arguments, by default sys.argv[1:]
+    """
+    from .alldebrid import AllDebrid # pylint: disable=C0415
+
+    parser = argparse.ArgumentParser(prog="python -m alldebrid.replay", description="Replay a capture written by RecordingTransport against a local mock of the API.")
+    parser.add_argument("capture", help="the capture file (NDJSON)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, e.g. 10 for ten times faster (default 1)")
+    parser.add_argument("--workers", type=int, default=64, help="requests in flight at once (default 64)")
+    parser.add_argument("--pool", type=int, default=64, help="client connection pool size (default 64)")
+    args = parser.parse_args(argv)
+
+    records = load_recording(args.capture)
+    with ReplayServer(records, speed=args.speed) as server:
+        client = AllDebrid(apikey="r" * 20, base_url=server.base_url, pool_maxsize=args.pool)
+        report = replay(client, records, speed=args.speed, workers=args.workers)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
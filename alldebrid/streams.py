@@ -0,0 +1,147 @@
+#pylint: disable=C0301
+"""
+Choice of stream variant for streaming links.
+
+Unlocking a video on a streaming host returns several stream variants in ``data["streams"]``, each with an ``id`` and, depending on the host, a ``quality`` (e.g. 1080), an ``ext`` or ``codec``, a total bitrate ``tb`` and a ``filesize``. A StreamPolicy filters these variants by limits and orders them by preference, so StreamLinkProcessor requests the variant the player wants instead of whichever the host listed first, and knows which variants to try next.
+
+Classes
+-------
+StreamPolicy
+    Filters and orders the stream variants of an unlocked link.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.streams import StreamPolicy
+>>> policy = StreamPolicy(max_quality=1080, formats=("mp4",))
+>>> policy.choose([{"id": "a", "quality": 2160, "ext": "mkv"}, {"id": "b", "quality": 1080, "ext": "mp4"}])
+{'id': 'b', 'quality': 1080, 'ext': 'mp4'}
+>>> AllDebrid(apikey="YOUR_API_KEY").get_direct_stream_link("https://host.example/video", policy=policy, candidates=2)
+'https://cdn.example/stream/b.mp4'
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+HIGHEST = "highest"
+LOWEST = "lowest"
+SMALLEST = "smallest"
+
+_DIGITS = re.compile(r"\d+")
+
+def _number(value: Any) -> Optional[int]:
+    # Qualities come as 1080 or "1080p"; a missing or unparsable value is unknown.
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = _DIGITS.search(str(value)) if value is not None else None
+    return int(match.group()) if match else None
+
+def stream_quality(stream: Dict[str, Any]) -> Optional[int]:
+    """
+    Returns the vertical resolution of a stream variant, e.g. 1080, or None if unknown.
+    """
+    return _number(stream.get("quality"))
+
+def stream_bitrate(stream: Dict[str, Any]) -> Optional[int]:
+    """
+    Returns the total bitrate of a stream variant as the host reports it, or None if unknown.
+    """
+    return _number(stream.get("tb", stream.get("bitrate")))
+
+def stream_size(stream: Dict[str, Any]) -> Optional[int]:
+    """
+    Returns the size of a stream variant in bytes, or None if unknown.
+    """
+    return _number(stream.get("filesize", stream.get("size")))
+
+class StreamPolicy:
+    """
+    Filters and orders the stream variants of an unlocked link.
+
+    Variants without an ``id`` are never chosen. A limit only excludes variants that report the
+    value it limits; variants with unknown values are ranked after the known ones.
+
+    Parameters
+    ----------
+    prefer : str, optional
+        "highest" for the best quality, "lowest" for the lowest quality or "smallest" for the
+        smallest file, which starts playing the soonest on slow connections, by default "highest"
+    min_quality : Optional[int], optional
+        The lowest acceptable quality, e.g. 480, by default None
+    max_quality : Optional[int], optional
+        The highest acceptable quality, e.g. 1080, by default None
+    max_bitrate : Optional[int], optional
+        The highest acceptable total bitrate, in the host's unit, by default None
+    max_size : Optional[int], optional
+        The largest acceptable file, in bytes, by default None
+    formats : Sequence[str], optional
+        Preferred codecs or container extensions, best first, e.g. ("mp4", "h264"); variants in
+        other formats come after them, by default no preference
+    strict : bool, optional
+        Choose nothing rather than fall back to the variants outside the limits, by default False
+    """
+
+    def __init__(self, prefer: str = HIGHEST, min_quality: Optional[int] = None, max_quality: Optional[int] = None, max_bitrate: Optional[int] = None, max_size: Optional[int] = None, formats: Sequence[str] = (), strict: bool = False) -> None:
+        if prefer not in (HIGHEST, LOWEST, SMALLEST):
+            raise ValueError(f"prefer must be one of {HIGHEST!r}, {LOWEST!r} or {SMALLEST!r}")
+        self.prefer = prefer
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.max_bitrate = max_bitrate
+        self.max_size = max_size
+        self.formats = [fmt.lower().lstrip(".") for fmt in formats]
+        self.strict = strict
+
+    def accepts(self, stream: Dict[str, Any]) -> bool:
+        """
+        Returns whether a stream variant is within the policy's limits.
+        """
+        quality, bitrate, size = stream_quality(stream), stream_bitrate(stream), stream_size(stream)
+        return not (
+            (quality is not None and self.min_quality is not None and quality < self.min_quality)
+            or (quality is not None and self.max_quality is not None and quality > self.max_quality)
+            or (bitrate is not None and self.max_bitrate is not None and bitrate > self.max_bitrate)
+            or (size is not None and self.max_size is not None and size > self.max_size)
+        )
+
+    def _format_rank(self, stream: Dict[str, Any]) -> int:
+        names = {str(stream.get(field, "")).lower() for field in ("codec", "ext")}
+        return next((rank for rank, fmt in enumerate(self.formats) if fmt in names), len(self.formats))
+
+    def _key(self, stream: Dict[str, Any]) -> Tuple:
+        quality, size = stream_quality(stream), stream_size(stream)
+        if self.prefer == SMALLEST:
+            primary = (size is None, size or 0)
+        elif self.prefer == LOWEST:
+            primary = (quality is None, quality or 0)
+        else:
+            primary = (quality is None, -(quality or 0))
+        # Among equal choices, the smaller file starts sooner.
+        return (self._format_rank(stream),) + primary + (size is None, size or 0)
+
+    def rank(self, streams: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the stream variants to try, best first.
+
+        Parameters
+        ----------
+        streams : Sequence[Dict[str, Any]]
+            The ``data["streams"]`` list of an unlock response.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The acceptable variants, best first; all the variants if none is acceptable and the
+            policy is not strict. Ties keep the host's order.
+        """
+        usable = [stream for stream in streams or [] if isinstance(stream, dict) and stream.get("id")]
+        accepted = [stream for stream in usable if self.accepts(stream)]
+        if not accepted and not self.strict:
+            accepted = usable
+        return sorted(accepted, key=self._key)
+
+    def choose(self, streams: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the best stream variant, or None if there is none to choose.
+        """
+        ranked = self.rank(streams)
+        return ranked[0] if ranked else None
@@ -0,0 +1,303 @@
+#pylint: disable=C0301
+"""
+Local mirror of the saved links and the download history.
+
+The LinkSync mirrors ``user/links`` and ``user/history`` into a SQLite table indexed by host, date and file name, and answers queries from it, so dashboards read the lists in milliseconds instead of fetching them in full on every call. The API only returns the full lists, so a sync still downloads them, but it writes only what changed: an unchanged list is detected by its digest and costs no writes at all, otherwise only added, changed and removed links are touched.
+
+Classes
+-------
+LinkSync
+    Mirrors the saved links and the history into a local SQLite store.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.sync import LinkSync
+>>> links = LinkSync(AllDebrid(apikey="YOUR_API_KEY"), "links.db", max_age=60)
+>>> links.sync()
+{'saved': {'added': 120, 'updated': 0, 'removed': 0}, 'history': {'added': 35, 'updated': 0, 'removed': 0}}
+>>> links.query("history", host="rapidgator", name="ubuntu", since=1700000000)
+[{'link': 'https://rapidgator.net/file/...', 'filename': 'ubuntu-22.04.iso', 'size': 1474873344, 'date': 1700000123, 'host': 'rapidgator'}]
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+SAVED = "saved"
+HISTORY = "history"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    kind TEXT NOT NULL,
+    link TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    host TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (kind, link)
+);
+CREATE INDEX IF NOT EXISTS links_host ON links (kind, host, date);
+CREATE INDEX IF NOT EXISTS links_date ON links (kind, date);
+CREATE INDEX IF NOT EXISTS links_filename ON links (kind, filename COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+def _row(kind: str, item: Dict[str, Any]) -> Tuple:
+    raw = json.dumps(item, sort_keys=True, separators=(",", ":"))
+    return (kind, item["link"], item.get("filename") or "", item.get("host") or "", int(item.get("size") or 0), int(item.get("date") or 0), raw)
+
+class LinkSync:
+    """
+    Mirrors the saved links and the history into a local SQLite store.
+
+    Parameters
+    ----------
+    client : Any
+        The AllDebrid client the lists are fetched with.
+    path : str
+        The SQLite database file, created if missing. ":memory:" keeps the mirror in memory.
+    max_age : Optional[float], optional
+        Queries sync a list first if it was last synced longer ago than this, in seconds; None never
+        syncs from a query, by default 60
+    clock : Callable[[], float], optional
+        The wall clock, used for the sync times, by default time.time
+    """
+
+    def __init__(self, client: Any, path: str, max_age: Optional[float] = 60, clock: Callable[[], float] = time.time) -> None:
+        self.client = client
+        self.path = path
+        self.max_age = max_age
+        self.clock = clock
+        self.fetchers: Dict[str, Callable[[], dict]] = {
+            SAVED: client.saved_links,
+            HISTORY: client.recent_links,
+        }
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._sync_locks = {kind: threading.Lock() for kind in self.fetchers}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _execute(self, sql: str, args: Iterable = ()) -> List[tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, tuple(args)).fetchall()
+
+    def _fetch(self, kind: str) -> List[Dict[str, Any]]:
+        response = self.fetchers[kind]()
+        # saved_links answers an empty dict rather than an empty list.
+        return (response.get("data") or {}).get("links") or []
+
+    def _apply(self, kind: str, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        rows = {row[1]: row for row in (_row(kind, item) for item in items)}
+        digest = hashlib.sha1("\n".join(sorted(row[6] for row in rows.values())).encode()).hexdigest()
+        now = self.clock()
+        counts = {"added": 0, "updated": 0, "removed": 0}
+
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._db.execute("SELECT digest FROM sync_state WHERE kind = ?", (kind,)).fetchone()
+                if state is None or state[0] != digest:
+                    known = dict(self._db.execute("SELECT link, raw FROM links WHERE kind = ?", (kind,)).fetchall())
+                    changed = [row for link, row in rows.items() if known.get(link) != row[6]]
+                    removed = [(kind, link) for link in known.keys() - rows.keys()]
+                    self._db.executemany("INSERT OR REPLACE INTO links (kind, link, filename, host, size, date, raw) VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+                    self._db.executemany("DELETE FROM links WHERE kind = ? AND link = ?", removed)
+                    counts["updated"] = sum(row[1] in known for row in changed)
+                    counts["added"] = len(changed) - counts["updated"]
+                    counts["removed"] = len(removed)
+                self._db.execute("INSERT OR REPLACE INTO sync_state (kind, digest, synced_at) VALUES (?, ?, ?)", (kind, digest, now))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return counts
+
+    def sync(self, kinds: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Fetches the lists and writes what changed to the store.
+
+        The lists are fetched concurrently. A list that is already being synced by another thread is
+        synced once more after it, so the result is never older than the call.
+
+        Parameters
+        ----------
+        kinds : Optional[Iterable[str]], optional
+            "saved" and/or "history", by default both
+
+        Returns
+        -------
+        Dict[str, Dict[str, int]]
+            Per list, the number of links added, updated and removed.
+
+        Raises
+        ------
+        ValueError
+            If a kind is unknown.
+        """
+        kinds = list(kinds) if kinds is not None else list(self.fetchers)
+        for kind in kinds:
+            if kind not in self.fetchers:
+                raise ValueError(f"Unknown list: {kind}")
+
+        def sync_one(kind: str) -> Dict[str, int]:
+            with self._sync_locks[kind]:
+                return self._apply(kind, self._fetch(kind))
+
+        if len(kinds) == 1:
+            return {kinds[0]: sync_one(kinds[0])}
+        with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+            return dict(zip(kinds, executor.map(sync_one, kinds)))
+
+    def synced_at(self, kind: str) -> Optional[float]:
+        """
+        Returns when a list was last synced, or None if it never was.
+
+        Parameters
+        ----------
+        kind : str
+            "saved" or "history".
+
+        Returns
+        -------
+        Optional[float]
+            The time of the last sync, by the clock.
+        """
+        rows = self._execute("SELECT synced_at FROM sync_state WHERE kind = ?", (kind,))
+        return rows[0][0] if rows else None
+
+    def _ensure_fresh(self, kind: str) -> None:
+        if kind not in self.fetchers:
+            raise ValueError(f"Unknown list: {kind}")
+        if self.max_age is None:
+            return
+        # Concurrent queries on a stale list wait for one sync instead of each fetching the list.
+        with self._sync_locks[kind]:
+            synced_at = self.synced_at(kind)
+            if synced_at is None or self.clock() - synced_at > self.max_age:
+                self._apply(kind, self._fetch(kind))
+
+    def query(self, kind: str, host: Optional[str] = None, name: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the links of a list matching all the given filters, newest first.
+
+        Parameters
+        ----------
+        kind : str
+            "saved" or "history".
+        host : Optional[str], optional
+            The file host, e.g. "rapidgator", by default any
+        name : Optional[str], optional
+            A substring of the file name, matched case-insensitively, by default any
+        since : Optional[int], optional
+            The earliest date, as a Unix timestamp, inclusive, by default any
+        until : Optional[int], optional
+            The latest date, as a Unix timestamp, exclusive, by default any
+        limit : Optional[int], optional
+            The maximum number of links returned, by default all
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The links, as the API returned them.
+
+        Raises
+        ------
+        ValueError
+            If the kind is unknown.
+        """
+        self._ensure_fresh(kind)
+        sql = "SELECT raw FROM links WHERE kind = ?"
+        args: List[Any] = [kind]
+        if host is not None:
+            sql += " AND host = ?"
+            args.append(host)
+        if name is not None:
+            sql += " AND filename LIKE ? ESCAPE '\\'"
+            args.append("%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if since is not None:
+            sql += " AND date >= ?"
+            args.append(since)
+        if until is not None:
+            sql += " AND date < ?"
+            args.append(until)
+        sql += " ORDER BY date DESC, link"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [json.loads(raw) for (raw,) in self._execute(sql, args)]
+
+    def hosts(self, kind: str) -> Dict[str, int]:
+        """
+        Returns the number of links per file host in a list.
+
+        Parameters
+        ----------
+        kind : str
+            "saved" or "history".
+
+        Returns
+        -------
+        Dict[str, int]
+            The link count per host.
+        """
+        self._ensure_fresh(kind)
+        return dict(self._execute("SELECT host, COUNT(*) FROM links WHERE kind = ? GROUP BY host ORDER BY host", (kind,)))
+
+    def start(self, interval: float = 60) -> "LinkSync":
+        """
+        Starts syncing both lists in a background thread every ``interval`` seconds.
+
+        Parameters
+        ----------
+        interval : float, optional
+            The time between syncs, in seconds, by default 60
+
+        Returns
+        -------
+        LinkSync
+            The store itself.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the background sync.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception: # pylint: disable=W0703
+                pass
+            self._stop.wait(interval)
+
+    def close(self) -> None:
+        """
+        Stops the background sync and closes the database.
+        """
+        self.stop()
+        with self._db_lock:
+            self._db.close()
@@ -0,0 +1,359 @@
+#pylint: disable=C0301
+"""
+Local .torrent parsing for the AllDebrid client.
+
+The torrent module contains a small bencode decoder and the helpers needed to turn a .torrent file into its info-hash(es), file list and magnet URI without uploading anything. The AllDebrid client uses it to check instant availability of torrents before deciding whether a multipart upload is needed at all.
+
+Classes
+-------
+TorrentFile
+    A single file entry of a torrent.
+TorrentInfo
+    The metadata extracted from a .torrent payload.
+
+Functions
+---------
+- bdecode(): Decodes a bencoded payload.
+- parse_torrent(): Parses a .torrent file path or payload into a TorrentInfo.
+
+Exceptions
+----------
+BencodeError
+    Raised when a payload is not valid bencode or not a valid torrent.
+
+Examples
+--------
+>>> from alldebrid.torrent import parse_torrent
+>>> info = parse_torrent("ubuntu.torrent")
+>>> info.info_hash
+'3b245504cf5f11bbdbe1201cea6a6bf45aee1bc0'
+"""
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+_DIGITS = frozenset(b"0123456789")
+
+class BencodeError(ValueError):
+    """
+    Raised when a payload is not valid bencode or is not a valid torrent.
+    """
+
+class _Decoder:
+    """
+    Iterative bencode decoder working directly on a memoryview.
+
+    Strings are returned as bytes, integers as int, lists as list and dictionaries as dict with bytes keys. The byte span of the top-level ``info`` dictionary is recorded while decoding so the info-hash can be computed from the original encoding without re-encoding it.
+    """
+
+    def __init__(self, payload: Union[bytes, bytearray, memoryview]) -> None:
+        self.buf = memoryview(payload)
+        self.pos = 0
+        self.info_span: Optional[Tuple[int, int]] = None
+
+    def _read_int(self, terminator: int) -> int:
+        buf = self.buf
+        end = self.pos
+        length = len(buf)
+        while end < length and buf[end] != terminator:
+            end += 1
+        if end >= length:
+            raise BencodeError(f"Unterminated integer at offset {self.pos}")
+        raw = bytes(buf[self.pos:end])
+        if not raw or raw == b"-" or (raw[0] == 0x30 and len(raw) > 1) or raw.startswith(b"-0"):
+            raise BencodeError(f"Invalid integer {raw!r} at offset {self.pos}")
+        try:
+            value = int(raw)
+        except ValueError as exc:
+            raise BencodeError(f"Invalid integer {raw!r} at offset {self.pos}") from exc
+        self.pos = end + 1
+        return value
+
+    def _read_string(self) -> bytes:
+        size = self._read_int(0x3A)  # ':'
+        if size < 0:
+            raise BencodeError(f"Negative string length at offset {self.pos}")
+        end = self.pos + size
+        if end > len(self.buf):
+            raise BencodeError(f"String overruns payload at offset {self.pos}")
+        value = bytes(self.buf[self.pos:end])
+        self.pos = end
+        return value
+
+    def decode(self) -> Any:
+        """
+        Decodes one complete bencoded value starting at the current position.
+        """
+        buf = self.buf
+        length = len(buf)
+        # Each stack frame is [container, pending_key, start_offset, is_info].
+        stack: List[list] = []
+        result: Any = None
+
+        while True:
+            if self.pos >= length:
+                raise BencodeError("Unexpected end of payload")
+            token = buf[self.pos]
+            start = self.pos
+            if token == 0x64:  # 'd'
+                self.pos += 1
+                is_info = len(stack) == 1 and stack[0][1] == b"info"
+                stack.append([{}, None, start, is_info])
+                continue
+            if token == 0x6C:  # 'l'
+                self.pos += 1
+                stack.append([[], None, start, False])
+                continue
+            if token == 0x65:  # 'e'
+                if not stack:
+                    raise BencodeError(f"Unexpected end marker at offset {start}")
+                self.pos += 1
+                container, pending, begin, is_info = stack.pop()
+                if pending is not None:
+                    raise BencodeError(f"Dictionary key {pending!r} has no value")
+                if is_info:
+                    self.info_span = (begin, self.pos)
+                value = container
+            elif token == 0x69:  # 'i'
+                self.pos += 1
+                value = self._read_int(0x65)
+            elif token in _DIGITS:
+                value = self._read_string()
+            else:
+                raise BencodeError(f"Unexpected byte {bytes([token])!r} at offset {start}")
+
+            if not stack:
+                result = value
+                break
+
+            frame = stack[-1]
+            container = frame[0]
+            if isinstance(container, list):
+                container.append(value)
+            elif frame[1] is None:
+                if not isinstance(value, bytes):
+                    raise BencodeError(f"Dictionary key must be a string at offset {start}")
+                frame[1] = value
+            else:
+                container[frame[1]] = value
+                frame[1] = None
+
+        return result
+
+def bdecode(payload: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Decodes a bencoded payload.
+
+    Parameters
+    ----------
+    payload : Union[bytes, bytearray, memoryview]
+        The bencoded payload.
+
+    Returns
+    -------
+    Any
+        The decoded value. Strings are returned as bytes and dictionary keys as bytes.
+
+    Raises
+    ------
+    BencodeError
+        If the payload is not valid bencode or has trailing data.
+    """
+    decoder = _Decoder(payload)
+    value = decoder.decode()
+    if decoder.pos != len(decoder.buf):
+        raise BencodeError(f"Trailing data at offset {decoder.pos}")
+    return value
+
+def _text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+class TorrentFile:
+    """
+    A single file entry of a torrent.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file inside the torrent, using "/" as separator.
+    size : int
+        The size of the file in bytes.
+    """
+    __slots__ = ("path", "size")
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"TorrentFile(path={self.path!r}, size={self.size})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TorrentFile):
+            return NotImplemented
+        return self.path == other.path and self.size == other.size
+
+class TorrentInfo:
+    """
+    The metadata extracted from a .torrent payload.
+
+    Parameters
+    ----------
+    name : str
+        The torrent name.
+    info_hash : Optional[str]
+        The v1 (SHA-1) info-hash as lowercase hex, None for v2-only torrents.
+    info_hash_v2 : Optional[str]
+        The v2 (SHA-256) info-hash as lowercase hex, None for v1-only torrents.
+    files : List[TorrentFile]
+        The files contained in the torrent.
+    trackers : List[str]
+        The announce URLs of the torrent.
+    source : Optional[str]
+        The path the torrent was read from, if any.
+    """
+
+    def __init__(self, name: str, info_hash: Optional[str], info_hash_v2: Optional[str], files: List[TorrentFile], trackers: List[str], source: Optional[str] = None) -> None:
+        self.name = name
+        self.info_hash = info_hash
+        self.info_hash_v2 = info_hash_v2
+        self.files = files
+        self.trackers = trackers
+        self.source = source
+
+    @property
+    def hash(self) -> str:
+        """
+        The hash AllDebrid identifies the torrent by (v1 when available, v2 otherwise).
+
+        Returns
+        -------
+        str
+            The info-hash as lowercase hex.
+        """
+        return self.info_hash or self.info_hash_v2
+
+    @property
+    def total_size(self) -> int:
+        """
+        The total size of all files in bytes.
+
+        Returns
+        -------
+        int
+            The total size of the torrent.
+        """
+        return sum(file.size for file in self.files)
+
+    def magnet_uri(self, trackers: bool = True) -> str:
+        """
+        Builds a magnet URI for the torrent.
+
+        Parameters
+        ----------
+        trackers : bool, optional
+            Whether to include the announce URLs, by default True
+
+        Returns
+        -------
+        str
+            The magnet URI.
+        """
+        parts = []
+        if self.info_hash:
+            parts.append("xt=urn:btih:" + self.info_hash)
+        if self.info_hash_v2:
+            parts.append("xt=urn:btmh:1220" + self.info_hash_v2)
+        if self.name:
+            parts.append("dn=" + quote(self.name, safe=""))
+        if trackers:
+            parts.extend("tr=" + quote(tracker, safe="") for tracker in self.trackers)
+        return "magnet:?" + "&".join(parts)
+
+    def __repr__(self) -> str:
+        return f"TorrentInfo(name={self.name!r}, hash={self.hash!r}, files={len(self.files)})"
+
+def _v1_files(info: Dict[bytes, Any], name: str) -> List[TorrentFile]:
+    if b"files" not in info:
+        return [TorrentFile(name, int(info.get(b"length", 0)))]
+    files = []
+    for entry in info[b"files"]:
+        segments = entry.get(b"path.utf-8") or entry.get(b"path") or []
+        files.append(TorrentFile("/".join([name] + [_text(segment) for segment in segments]), int(entry.get(b"length", 0))))
+    return files
+
+def _v2_files(tree: Dict[bytes, Any], name: str) -> List[TorrentFile]:
+    files = []
+    stack = [(tree, "")]
+    while stack:
+        node, prefix = stack.pop()
+        for key in sorted(node, reverse=True):
+            child = node[key]
+            if key == b"":
+                files.append(TorrentFile(prefix, int(child.get(b"length", 0))))
+            else:
+                stack.append((child, prefix + "/" + _text(key) if prefix else _text(key)))
+    if len(files) > 1:
+        for file in files:
+            file.path = name + "/" + file.path
+    return files
+
+def _read_payload(torrent: Union[str, bytes, bytearray, memoryview]) -> Tuple[bytes, Optional[str]]:
+    if isinstance(torrent, (bytes, bytearray, memoryview)):
+        return torrent, None
+    if not isinstance(torrent, str) or not os.path.isfile(torrent):
+        raise ValueError(f"Torrent path is not valid. ({torrent})")
+    with open(torrent, "rb") as file:
+        return file.read(), torrent
+
+def parse_torrent(torrent: Union[str, bytes, bytearray, memoryview]) -> TorrentInfo:
+    """
+    Parses a .torrent file path or payload.
+
+    Parameters
+    ----------
+    torrent : Union[str, bytes, bytearray, memoryview]
+        The path of a .torrent file or its raw content.
+
+    Returns
+    -------
+    TorrentInfo
+        The info-hash(es), name, files and trackers of the torrent.
+
+    Raises
+    ------
+    ValueError
+        If the path is not a file.
+    BencodeError
+        If the payload is not a valid torrent.
+    """
+    payload, source = _read_payload(torrent)
+    decoder = _Decoder(payload)
+    meta = decoder.decode()
+    if not isinstance(meta, dict) or not isinstance(meta.get(b"info"), dict) or decoder.info_span is None:
+        raise BencodeError("Torrent has no info dictionary")
+
+    info = meta[b"info"]
+    start, end = decoder.info_span
+    raw_info = decoder.buf[start:end]
+    is_v2 = info.get(b"meta version") == 2 and b"file tree" in info
+    is_v1 = b"pieces" in info or not is_v2
+
+    name = _text(info.get(b"name.utf-8") or info.get(b"name") or b"")
+    info_hash = hashlib.sha1(raw_info).hexdigest() if is_v1 else None
+    info_hash_v2 = hashlib.sha256(raw_info).hexdigest() if is_v2 else None
+    files = _v1_files(info, name) if is_v1 else _v2_files(info[b"file tree"], name)
+
+    trackers = []
+    if b"announce" in meta:
+        trackers.append(_text(meta[b"announce"]))
+    for tier in meta.get(b"announce-list") or []:
+        for tracker in tier:
+            tracker = _text(tracker)
+            if tracker not in trackers:
+                trackers.append(tracker)
+
+    return TorrentInfo(name, info_hash, info_hash_v2, files, trackers, source)
@@ -0,0 +1,466 @@
+#pylint: disable=C0301
+"""
+Transports carrying the AllDebrid client's HTTP requests.
+
+The client builds each request (URL, headers, parameters, body) and hands it to a transport, which sends it and returns a TransportResponse. Swapping the transport changes how requests are sent without touching the client logic.
+
+Classes
+-------
+Transport
+    The interface every transport implements.
+TransportResponse
+    The status, body and headers of a response.
+StreamingResponse
+    The status and headers of a response whose body is read in chunks.
+RequestsTransport
+    Sends requests through a pooled requests.Session. This is the default.
+Urllib3Transport
+    Sends requests straight through a urllib3 PoolManager, skipping the requests layer for lower per-call overhead.
+InMemoryTransport
+    Answers requests from Python callables without any I/O, for tests and benchmarks.
+
+Exceptions
+----------
+TransportError
+    Raised when a request could not be sent or no response was received.
+
+Examples
+--------
+>>> from alldebrid import AllDebrid
+>>> from alldebrid.transport import InMemoryTransport, Urllib3Transport
+>>> ad = AllDebrid(apikey="YOUR_API_KEY", transport=Urllib3Transport(pool_maxsize=32))
+>>> fake = InMemoryTransport({"user": lambda params: {"status": "success", "data": {"user": {"username": "test"}}}})
+>>> AllDebrid(apikey="YOUR_API_KEY", transport=fake).user()
+{'status': 'success', 'data': {'user': {'username': 'test'}}}
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+import requests
+import urllib3
+from .dnscache import CachingHTTPAdapter, DNSCache, cached_pool_classes
+
+class TransportError(Exception):
+    """
+    Raised when a request could not be sent or no response was received.
+    """
+
+class TransportResponse:
+    """
+    The status, body and headers of a response.
+
+    Parameters
+    ----------
+    status_code : int
+        The HTTP status code.
+    content : bytes
+        The response body.
+    headers : Optional[Mapping[str, str]], optional
+        The response headers, by default none.
+    """
+    __slots__ = ("status_code", "content", "headers")
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Mapping[str, str]] = None) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+
+    @property
+    def text(self) -> str:
+        """
+        The body decoded as UTF-8.
+        """
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """
+        The body parsed as JSON.
+        """
+        return json.loads(self.content)
+
+class StreamingResponse:
+    """
+    The status and headers of a response whose body is read in chunks.
+
+    Iterating yields the body in chunks of bytes, raising TransportError if the connection fails
+    midway. Close the response, or use it as a context manager, to release its connection.
+
+    Parameters
+    ----------
+    status_code : int
+        The HTTP status code.
+    chunks : Iterable[bytes]
+        The body.
+    headers : Optional[Mapping[str, str]], optional
+        The response headers, by default none.
+    close : Optional[Callable[[], None]], optional
+        Releases the connection, by default nothing.
+    """
+    __slots__ = ("status_code", "headers", "_chunks", "_close")
+
+    def __init__(self, status_code: int, chunks: Iterable[bytes], headers: Optional[Mapping[str, str]] = None, close: Optional[Callable[[], None]] = None) -> None:
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._chunks)
+
+    def read(self) -> bytes:
+        """
+        Reads the rest of the body.
+        """
+        return b"".join(self)
+
+    def close(self) -> None:
+        """
+        Releases the connection.
+        """
+        close, self._close = self._close, None
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "StreamingResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def _translate(chunks: Iterable[bytes], errors: Tuple[type, ...]) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    except errors as exc:
+        raise TransportError(str(exc)) from exc
+
+class Transport:
+    """
+    The interface every transport implements.
+
+    Transports must be safe to use from several threads at once. Non-2xx responses are returned,
+    not raised; TransportError is raised only when no response was received.
+    """
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        """
+        Sends one request.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL, which may already carry a query string.
+        headers : Mapping[str, str]
+            The request headers.
+        params : Optional[Dict[str, Any]], optional
+            Query parameters to add; list values are sent as repeated keys and None values are dropped.
+        data : Optional[Dict[str, Any]], optional
+            Form fields sent as an urlencoded body.
+        files : Optional[Dict[str, Tuple]], optional
+            Files sent as a multipart body, as (filename, content, content type) tuples.
+        timeout : Optional[float], optional
+            The connect and read timeout in seconds.
+
+        Returns
+        -------
+        TransportResponse
+            The response.
+
+        Raises
+        ------
+        TransportError
+            If no response was received.
+        """
+        raise NotImplementedError
+
+    def stream(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> StreamingResponse:
+        """
+        Sends one request and returns the response before its body has been read.
+
+        Transports that cannot stream read the whole body and return it as a single chunk.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL, which may already carry a query string.
+        headers : Mapping[str, str]
+            The request headers.
+        params : Optional[Dict[str, Any]], optional
+            Query parameters to add, as for request.
+        timeout : Optional[float], optional
+            The connect timeout and the timeout for each read, in seconds.
+
+        Returns
+        -------
+        StreamingResponse
+            The response, to be closed by the caller.
+
+        Raises
+        ------
+        TransportError
+            If no response was received.
+        """
+        response = self.request(method, url, headers, params=params, timeout=timeout)
+        return StreamingResponse(response.status_code, [response.content], response.headers)
+
+    def close(self) -> None:
+        """
+        Closes the open connections; the next request opens new ones.
+        """
+
+    def reset_after_fork(self) -> None:
+        """
+        Drops connections inherited from the parent process without closing them.
+        """
+
+# Bytes read from the socket at a time by streaming responses.
+_CHUNK_SIZE = 64 * 1024
+
+def _query_pairs(params: Optional[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    pairs = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            pairs.extend((key, item) for item in value)
+        else:
+            pairs.append((key, value))
+    return pairs
+
+def _with_query(url: str, params: Optional[Dict[str, Any]]) -> str:
+    query = _query_pairs(params)
+    if not query:
+        return url
+    return url + ("&" if "?" in url else "?") + urlencode(query)
+
+class RequestsTransport(Transport):
+    """
+    Sends requests through a pooled requests.Session. This is the default.
+
+    Parameters
+    ----------
+    pool_maxsize : int, optional
+        The number of connections kept per host, by default 50
+    proxy : Optional[str], optional
+        The proxy to send requests through, by default None
+    dns_cache : Optional[DNSCache], optional
+        Caches resolved addresses for new connections, by default a new DNSCache
+    """
+
+    def __init__(self, pool_maxsize: int = 50, proxy: Optional[str] = None, dns_cache: Optional[DNSCache] = None) -> None:
+        self.pool_maxsize = pool_maxsize
+        self.proxy = proxy
+        self.dns_cache = dns_cache if dns_cache is not None else DNSCache()
+        self._lock = threading.Lock()
+        self.session: Optional[requests.Session] = self._new_session()
+
+    def __getstate__(self) -> dict:
+        return {"pool_maxsize": self.pool_maxsize, "proxy": self.proxy}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+
+        session.mount('http://', CachingHTTPAdapter(self.dns_cache, pool_connections=10, pool_maxsize=self.pool_maxsize, pool_block=True))
+        session.mount('https://', CachingHTTPAdapter(self.dns_cache, pool_connections=10, pool_maxsize=self.pool_maxsize, pool_block=True))
+
+        if self.proxy is not None:
+            session.proxies = {"http": self.proxy, "https": self.proxy}
+
+        return session
+
+    def _get_session(self) -> requests.Session:
+        # Hot path without locking: the session is only ever replaced as a whole.
+        session = self.session
+        if session is not None:
+            return session
+
+        with self._lock:
+            if self.session is None:
+                self.session = self._new_session()
+            return self.session
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        try:
+            response = self._get_session().request(method=method, url=url, headers=headers, params=params, data=data, files=files, timeout=timeout)
+        except requests.exceptions.RequestException as exc:
+            raise TransportError(str(exc)) from exc
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def stream(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> StreamingResponse:
+        try:
+            response = self._get_session().request(method=method, url=url, headers=headers, params=params, timeout=timeout, stream=True)
+        except requests.exceptions.RequestException as exc:
+            raise TransportError(str(exc)) from exc
+        chunks = _translate(response.iter_content(_CHUNK_SIZE), (requests.exceptions.RequestException,))
+        return StreamingResponse(response.status_code, chunks, response.headers, response.close)
+
+    def close(self) -> None:
+        # In-flight requests complete on the old session and the next request opens a new one.
+        with self._lock:
+            session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+    def reset_after_fork(self) -> None:
+        # Replace the lock too, in case it was held during the fork.
+        self._lock = threading.Lock()
+        self.session = None
+
+class Urllib3Transport(Transport):
+    """
+    Sends requests straight through a urllib3 PoolManager, skipping the requests layer for lower per-call overhead.
+
+    Redirects are followed; failed connections and reads are not retried, as with requests.
+
+    Parameters
+    ----------
+    pool_maxsize : int, optional
+        The number of connections kept per host, by default 50
+    proxy : Optional[str], optional
+        The proxy to send requests through, by default None
+    dns_cache : Optional[DNSCache], optional
+        Caches resolved addresses for new connections, by default a new DNSCache. Not used through a proxy.
+    """
+
+    def __init__(self, pool_maxsize: int = 50, proxy: Optional[str] = None, dns_cache: Optional[DNSCache] = None) -> None:
+        self.pool_maxsize = pool_maxsize
+        self.proxy = proxy
+        self.dns_cache = dns_cache if dns_cache is not None else DNSCache()
+        self._retries = urllib3.Retry(total=None, connect=0, read=False, other=0, status=0, redirect=5, raise_on_redirect=False)
+        self._default_headers = urllib3.make_headers(accept_encoding=True)
+        self._lock = threading.Lock()
+        self.manager: Optional[urllib3.PoolManager] = None
+
+    def __getstate__(self) -> dict:
+        return {"pool_maxsize": self.pool_maxsize, "proxy": self.proxy}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def _get_manager(self) -> urllib3.PoolManager:
+        manager = self.manager
+        if manager is not None:
+            return manager
+
+        with self._lock:
+            if self.manager is None:
+                if self.proxy is not None:
+                    self.manager = urllib3.ProxyManager(self.proxy, num_pools=10, maxsize=self.pool_maxsize, block=True)
+                else:
+                    self.manager = urllib3.PoolManager(num_pools=10, maxsize=self.pool_maxsize, block=True)
+                    self.manager.pool_classes_by_scheme = cached_pool_classes(self.dns_cache)
+            return self.manager
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        url = _with_query(url, params)
+        headers = {**self._default_headers, **headers}
+        body = None
+        fields = None
+        if files:
+            fields = _query_pairs(data) + list(files.items())
+        elif data:
+            body = urlencode(_query_pairs(data))
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        try:
+            response = self._get_manager().request(
+                method,
+                url,
+                body=body,
+                fields=fields,
+                headers=headers,
+                timeout=urllib3.Timeout(connect=timeout, read=timeout),
+                retries=self._retries,
+            )
+        except urllib3.exceptions.HTTPError as exc:
+            raise TransportError(str(exc)) from exc
+        return TransportResponse(response.status, response.data, response.headers)
+
+    def stream(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> StreamingResponse:
+        try:
+            response = self._get_manager().request(
+                method,
+                _with_query(url, params),
+                headers={**self._default_headers, **headers},
+                timeout=urllib3.Timeout(connect=timeout, read=timeout),
+                retries=self._retries,
+                preload_content=False,
+            )
+        except urllib3.exceptions.HTTPError as exc:
+            raise TransportError(str(exc)) from exc
+
+        def close() -> None:
+            # A fully read response has already gone back to the pool; an abandoned one closes its connection.
+            response.close()
+            response.release_conn()
+
+        chunks = _translate(response.stream(_CHUNK_SIZE), (urllib3.exceptions.HTTPError,))
+        return StreamingResponse(response.status, chunks, response.headers, close)
+
+    def close(self) -> None:
+        with self._lock:
+            manager, self.manager = self.manager, None
+        if manager is not None:
+            manager.clear()
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self.manager = None
+
+class InMemoryTransport(Transport):
+    """
+    Answers requests from Python callables without any I/O, for tests and benchmarks.
+
+    Parameters
+    ----------
+    routes : Optional[Dict[str, Callable]], optional
+        Maps endpoints (e.g. "magnet/status") to callables taking the request parameters, as a dict of
+        lists like urllib.parse.parse_qs returns, and returning the JSON body or a (status code, JSON body)
+        tuple. "ping" answers "pong" unless overridden. Unknown endpoints answer the API's 404 error.
+    latency : Optional[Dict[str, Callable[[], float]]], optional
+        Maps endpoints to callables returning the seconds to wait before answering, by default none.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Callable]] = None, latency: Optional[Dict[str, Callable[[], float]]] = None) -> None:
+        self.routes = {"ping": lambda params: {"status": "success", "data": {"ping": "pong"}}}
+        self.routes.update(routes or {})
+        self.latency = latency or {}
+        self.calls: List[Tuple[str, str, Dict[str, List[str]]]] = []
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, files: Optional[Dict[str, Tuple]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        parsed = urlparse(url)
+        path = parsed.path
+        endpoint = path.split("/v4/", 1)[1] if "/v4/" in path else path.lstrip("/")
+        fields = parse_qs(parsed.query)
+        for key, value in _query_pairs(params) + _query_pairs(data):
+            fields.setdefault(key, []).append(str(value))
+        for key, value in (files or {}).items():
+            fields.setdefault(key, []).append(value[0])
+        with self._lock:
+            self.calls.append((method, endpoint, fields))
+
+        latency = self.latency.get(endpoint)
+        if latency is not None:
+            delay = latency()
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise TransportError(f"Read timed out. (read timeout={timeout})")
+            time.sleep(delay)
+
+        route = self.routes.get(endpoint)
+        if route is None:
+            return TransportResponse(200, b'{"status": "error", "error": {"code": "404", "message": "Endpoint doesn\'t exist"}}')
+        payload = route(fields)
+        status = 200
+        if isinstance(payload, tuple):
+            status, payload = payload
+        return TransportResponse(status, json.dumps(payload).encode())
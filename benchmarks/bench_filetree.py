@@ -0,0 +1,94 @@
+#pylint: disable=C0301
+"""
+File selection over many magnet file trees: nested dicts against the FileTable.
+
+Generates magnets with nested folders of files, then times picking the largest video file of every magnet and summing the file sizes per magnet by walking the response dicts and with a FileTable, and compares the memory each representation takes.
+
+Usage:
+    python benchmarks/bench_filetree.py [--magnets 5000] [--files 40]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.filetree import VIDEO_EXTENSIONS, FileTable # pylint: disable=C0413
+
+def make_magnets(count, files, seed=1):
+    """
+    Returns ``count`` instant-availability results with about ``files`` files each, in two folder levels.
+    """
+    rng = random.Random(seed)
+    extensions = ["mkv", "mp4", "srt", "nfo", "jpg", "txt"]
+
+    def file(index):
+        return {"n": f"file.{index}.{rng.choice(extensions)}", "s": rng.randint(1, 4 << 30)}
+
+    return [
+        {"hash": f"{magnet:040x}", "instant": True, "files": [{"n": f"Season {season}", "e": [file(i) for i in range(files // 4)]} for season in range(3)] + [file(i) for i in range(files // 4)]}
+        for magnet in range(count)
+    ]
+
+def walk(magnets):
+    """
+    Picks the largest video file and the total size of every magnet by walking the dicts.
+    """
+    best, totals = {}, []
+    for magnet in magnets:
+        largest, total, stack = None, 0, [("", entry) for entry in magnet["files"]]
+        while stack:
+            prefix, entry = stack.pop()
+            if "e" in entry:
+                stack.extend((prefix + entry["n"] + "/", child) for child in entry["e"])
+                continue
+            total += entry["s"]
+            if entry["n"].rsplit(".", 1)[-1].lower() in VIDEO_EXTENSIONS and (largest is None or entry["s"] > largest[1]):
+                largest = (prefix + entry["n"], entry["s"])
+        best[magnet["hash"]] = largest
+        totals.append(total)
+    return best, totals
+
+def measure(build):
+    """
+    Returns the result of ``build()`` and the memory it holds, in bytes.
+    """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    """
+    Times both representations and prints the comparison.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--magnets", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=40)
+    args = parser.parse_args()
+
+    magnets, dict_bytes = measure(lambda: make_magnets(args.magnets, args.files))
+    table, table_bytes = measure(lambda: FileTable.from_magnets(magnets))
+    start = time.perf_counter()
+    FileTable.from_magnets(magnets)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = walk(magnets)
+    walked = time.perf_counter() - start
+    start = time.perf_counter()
+    result = (table.main_files(VIDEO_EXTENSIONS), table.total_sizes())
+    queried = time.perf_counter() - start
+    assert result == expected
+    start = time.perf_counter()
+    table.main_files(VIDEO_EXTENSIONS)
+    again = time.perf_counter() - start
+
+    print(f"{len(table)} entries in {args.magnets} magnets")
+    print(f"memory: dicts {dict_bytes / 1e6:.1f} MB, table {table_bytes / 1e6:.1f} MB")
+    print(f"select: walk {walked * 1e3:.1f} ms, table {queried * 1e3:.1f} ms, repeated {again * 1e3:.1f} ms (built once in {build * 1e3:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
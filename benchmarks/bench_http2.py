@@ -0,0 +1,69 @@
+#pylint: disable=C0301
+"""
+Concurrent throughput over HTTP/1.1 connections versus multiplexed HTTP/2 streams.
+
+Many threads call ping against local servers answering after a fixed latency: once through an HTTP/1.1 transport limited to a pool of connections, and once through the HTTP2Transport over a couple of h2c connections. Requests per second, p99 latency and the connections used are reported.
+
+Requires httpx and h2 (pip install alldebrid.py[http2]).
+
+Usage:
+    python benchmarks/bench_http2.py [--threads 256] [--calls 4000] [--latency 0.02] [--pool 32] [--h2-connections 2]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/../tests")
+from alldebrid.transport import Urllib3Transport # pylint: disable=C0413
+from conftest import H2API # pylint: disable=C0413
+from mock_server import MockServer, percentile # pylint: disable=C0413
+
+def run(client, args):
+    """
+    Makes ``args.calls`` pings from ``args.threads`` threads and returns the wall time and latencies.
+    """
+    def call(_):
+        start = time.perf_counter()
+        client.ping()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        latencies = list(executor.map(call, range(args.calls)))
+    return time.perf_counter() - start, latencies
+
+def report(name, elapsed, latencies, connections):
+    """
+    Prints one scenario's results.
+    """
+    print(f"{name:>9}: {len(latencies) / elapsed:8.0f} req/s   p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   {connections} connections")
+
+def main():
+    """
+    Runs both scenarios and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=256)
+    parser.add_argument("--calls", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--pool", type=int, default=32)
+    parser.add_argument("--h2-connections", type=int, default=2)
+    args = parser.parse_args()
+
+    with MockServer({"ping": lambda: args.latency}) as server:
+        elapsed, latencies = run(server.client(transport=Urllib3Transport(pool_maxsize=args.pool)), args)
+        report("HTTP/1.1", elapsed, latencies, args.pool)
+
+    h2_server = H2API()
+    h2_server.delay["ping"] = lambda: args.latency
+    h2_server.start()
+    try:
+        elapsed, latencies = run(h2_server.client(max_connections=args.h2_connections, max_concurrent_streams=args.threads), args)
+        report("HTTP/2", elapsed, latencies, h2_server.connections)
+    finally:
+        h2_server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#pylint: disable=C0301
+"""
+Interactive latency under background saturation, with and without priority lanes.
+
+Background threads hammer check_magnet_instant at LOW priority while one interactive thread calls ping at HIGH priority. The p50/p99 interactive latency is reported for a client without a dispatcher and for one with a PriorityDispatcher reserving part of the pool.
+
+Usage:
+    python benchmarks/bench_priority.py [--background 64] [--samples 200] [--pool 16] [--reserved 4]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.priority import HIGH, LOW, PriorityDispatcher, request_priority # pylint: disable=C0413
+from mock_server import MockServer, percentile # pylint: disable=C0413
+
+def run(server, dispatcher, args):
+    """
+    Runs one scenario and returns the interactive latencies in seconds.
+    """
+    client = server.client(pool_maxsize=args.pool, dispatcher=dispatcher)
+    stop = threading.Event()
+
+    def background():
+        with request_priority(LOW):
+            while not stop.is_set():
+                client.check_magnet_instant(["magnet:?xt=urn:btih:" + "0" * 40])
+
+    threads = [threading.Thread(target=background, daemon=True) for _ in range(args.background)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    latencies = []
+    with request_priority(HIGH):
+        for _ in range(args.samples):
+            start = time.perf_counter()
+            client.ping()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+def main():
+    """
+    Runs both scenarios and prints the latency percentiles.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--background", type=int, default=64)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--pool", type=int, default=16)
+    parser.add_argument("--reserved", type=int, default=4)
+    args = parser.parse_args()
+
+    latency = {"magnet/instant": lambda: random.uniform(0.02, 0.08), "ping": lambda: 0.002}
+    with MockServer(latency) as server:
+        scenarios = [
+            ("shared pool", None),
+            ("priority lanes", PriorityDispatcher(capacity=args.pool, reserved=args.reserved)),
+        ]
+        for name, dispatcher in scenarios:
+            latencies = run(server, dispatcher, args)
+            print(f"{name:>15}: p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   p99 {percentile(latencies, 0.99) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#pylint: disable=C0301
+"""
+Per-call overhead of each transport.
+
+Calls ping sequentially through a client using the requests transport and the urllib3 transport against the local mock server, and through the in-memory transport, which measures the client logic alone. The mean and p99 time per call are reported.
+
+Usage:
+    python benchmarks/bench_transport.py [--calls 5000]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+from alldebrid.transport import InMemoryTransport, RequestsTransport, Urllib3Transport # pylint: disable=C0413
+from mock_server import MockServer, percentile # pylint: disable=C0413
+
+def run(client, calls):
+    """
+    Calls ping ``calls`` times and returns the latencies in seconds.
+    """
+    for _ in range(100):
+        client.ping()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client.ping()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    """
+    Runs every transport and prints the per-call times.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    with MockServer() as server:
+        scenarios = [
+            ("requests", server.client(transport=RequestsTransport(pool_maxsize=1))),
+            ("urllib3", server.client(transport=Urllib3Transport(pool_maxsize=1))),
+            ("in-memory", AllDebrid(apikey="a" * 20, transport=InMemoryTransport())),
+        ]
+        for name, client in scenarios:
+            latencies = run(client, args.calls)
+            mean = sum(latencies) / len(latencies)
+            print(f"{name:>10}: mean {mean * 1e6:8.1f} us   p99 {percentile(latencies, 0.99) * 1e6:8.1f} us")
+
+if __name__ == "__main__":
+    main()
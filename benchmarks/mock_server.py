@@ -0,0 +1,95 @@
+#pylint: disable=C0301
+"""
+Local stand-in for the AllDebrid API used by the benchmarks.
+
+Every endpoint answers {"status": "success", "data": {}} unless a handler is registered, after an optional per-endpoint latency.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+class MockServer:
+    """
+    Local HTTP server answering AllDebrid endpoints.
+
+    Parameters
+    ----------
+    latency : dict
+        Maps endpoint names (e.g. "ping") to a callable returning the seconds to wait before answering.
+    """
+
+    def __init__(self, latency=None) -> None:
+        self.latency = latency or {}
+        self.routes = {}
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL to give the client.
+        """
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v4/"
+
+    def client(self, **kwargs) -> AllDebrid:
+        """
+        An AllDebrid client pointed at this server.
+        """
+        return AllDebrid(apikey="a" * 20, base_url=self.base_url, **kwargs)
+
+    def __enter__(self) -> "MockServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):  # pylint: disable=W0221
+                pass
+
+            def do_GET(self):  # pylint: disable=C0103
+                self._answer()
+
+            def do_POST(self):  # pylint: disable=C0103
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                self._answer()
+
+            def _answer(self):
+                endpoint = urlparse(self.path).path.split("/v4/", 1)[-1]
+                latency = owner.latency.get(endpoint)
+                if latency is not None:
+                    time.sleep(latency())
+                route = owner.routes.get(endpoint)
+                raw = json.dumps(route() if route else {"status": "success", "data": {}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+def percentile(samples, fraction):
+    """
+    Returns the ``fraction`` percentile of ``samples``.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
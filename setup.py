@@ -8,4 +8,10 @@ setup(
     install_requires=[
         'Requests==2.30.0'
     ],
+    extras_require={
+        'http2': ['httpx[http2]'],
+    },
+    entry_points={
+        'console_scripts': ['alldebrid=alldebrid.cli:main'],
+    },
 )
\ No newline at end of file
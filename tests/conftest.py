@@ -0,0 +1,321 @@
+#pylint: disable=C0301
+"""
+Shared fixtures: local HTTP servers standing in for the AllDebrid API and CDN.
+"""
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+class RangedServer:
+    """
+    A local file host serving ``content`` under any non-expired path, with HTTP Range support.
+    """
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.expired = set()
+        self.fail_after = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        """
+        The absolute URL of ``path`` on the server.
+        """
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{path.lstrip('/')}"
+
+    def expire(self, path: str, after_bytes: int = 0) -> None:
+        """
+        Makes ``path`` answer 403 once ``after_bytes`` bytes have been served from it.
+        """
+        with self.lock:
+            if after_bytes:
+                self.fail_after["/" + path.lstrip("/")] = after_bytes
+            else:
+                self.expired.add("/" + path.lstrip("/"))
+
+    def _handler(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):  # pylint: disable=W0221
+                pass
+
+            def do_HEAD(self):  # pylint: disable=C0103
+                self._serve(body=False)
+
+            def do_GET(self):  # pylint: disable=C0103
+                self._serve(body=True)
+
+            def _serve(self, body):
+                with owner.lock:
+                    owner.requests.append((self.path, self.headers.get("Range")))
+                    expired = self.path in owner.expired
+                if expired:
+                    self.send_response(403)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content = owner.content
+                start, end, status = 0, len(content) - 1, 200
+                match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+                if match:
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)) if match.group(2) else end, len(content) - 1)
+                    status = 206
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(end - start + 1))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+                self.end_headers()
+                if not body:
+                    return
+                position = start
+                while position <= end:
+                    with owner.lock:
+                        budget = owner.fail_after.get(self.path)
+                        if budget is not None:
+                            if budget <= 0:
+                                owner.expired.add(self.path)
+                                self.close_connection = True
+                                return
+                            owner.fail_after[self.path] = budget - min(4096, end - position + 1)
+                    piece = content[position:min(end + 1, position + 4096)]
+                    self.wfile.write(piece)
+                    position += len(piece)
+
+        return Handler
+
+@pytest.fixture
+def ranged_server():
+    """
+    A running RangedServer serving 1 MiB of deterministic bytes.
+    """
+    server = RangedServer(bytes(range(256)) * 4096)
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+class MockAPI:
+    """
+    A local stand-in for the AllDebrid API.
+
+    ``routes`` maps endpoint names (e.g. "ping") to callables taking the query parameters and returning the JSON body. ``delay`` maps endpoint names to a callable returning the seconds to wait before answering.
+    """
+
+    def __init__(self) -> None:
+        self.routes = {"ping": lambda params: {"status": "success", "data": {"ping": "pong"}}}
+        self.delay = {}
+        self.calls = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL to give the client, ending with "/v4/".
+        """
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v4/"
+
+    def client(self, **kwargs):
+        """
+        An AllDebrid client pointed at this server.
+        """
+        from alldebrid.alldebrid import AllDebrid  # pylint: disable=C0415
+        return AllDebrid(apikey="a" * 20, base_url=self.base_url, **kwargs)
+
+    def _handler(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):  # pylint: disable=W0221
+                pass
+
+            def do_GET(self):  # pylint: disable=C0103
+                self._answer()
+
+            def do_POST(self):  # pylint: disable=C0103
+                length = int(self.headers.get("Content-Length") or 0)
+                self._answer(self.rfile.read(length) if length else b"")
+
+            def _answer(self, body=b""):
+                url = urlparse(self.path)
+                endpoint = url.path.split("/v4/", 1)[-1]
+                params = parse_qs(url.query)
+                if body and self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                    for key, values in parse_qs(body.decode()).items():
+                        params.setdefault(key, []).extend(values)
+                with owner.lock:
+                    owner.calls.append((endpoint, params))
+                    owner.connections.add(self.client_address)
+                delay = owner.delay.get(endpoint)
+                if delay is not None:
+                    time.sleep(delay())
+                route = owner.routes.get(endpoint)
+                payload = route(params) if route else {"status": "error", "error": {"code": "404", "message": "Endpoint doesn't exist"}}
+                raw = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+@pytest.fixture
+def mock_api():
+    """
+    A running MockAPI.
+    """
+    server = MockAPI()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+class H2API:
+    """
+    A local stand-in for the AllDebrid API speaking HTTP/2 over plain text (h2c, prior knowledge).
+
+    ``routes`` and ``delay`` work as for MockAPI. ``connections`` counts accepted connections and ``peak_streams`` the most requests in flight at once.
+    """
+
+    def __init__(self) -> None:
+        self.routes = {"ping": lambda params: {"status": "success", "data": {"ping": "pong"}}}
+        self.delay = {}
+        self.calls = []
+        self.connections = 0
+        self.streams = 0
+        self.peak_streams = 0
+        self.lock = threading.Lock()
+        self.sock = socket.create_server(("127.0.0.1", 0), backlog=64)
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL to give the client, ending with "/v4/".
+        """
+        return f"http://127.0.0.1:{self.sock.getsockname()[1]}/v4/"
+
+    def client(self, **kwargs):
+        """
+        An AllDebrid client using an h2c HTTP2Transport pointed at this server.
+        """
+        from alldebrid.alldebrid import AllDebrid  # pylint: disable=C0415
+        from alldebrid.http2 import HTTP2Transport  # pylint: disable=C0415
+        transport = HTTP2Transport(prior_knowledge=True, **kwargs)
+        return AllDebrid(apikey="a" * 20, base_url=self.base_url, transport=transport)
+
+    def start(self) -> None:
+        """
+        Starts accepting connections.
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops accepting connections.
+        """
+        self.sock.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.connections += 1
+            threading.Thread(target=self._connection, args=(conn,), daemon=True).start()
+
+    def _connection(self, sock) -> None:
+        import h2.config  # pylint: disable=C0415
+        import h2.connection  # pylint: disable=C0415
+        import h2.events  # pylint: disable=C0415
+
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        send_lock = threading.Lock()
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        paths = {}
+        with sock:
+            while True:
+                try:
+                    data = sock.recv(65535)
+                except OSError:
+                    return
+                if not data:
+                    return
+                with send_lock:
+                    events = conn.receive_data(data)
+                    sock.sendall(conn.data_to_send())
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        paths[event.stream_id] = dict(event.headers)[":path"]
+                    elif isinstance(event, h2.events.DataReceived):
+                        with send_lock:
+                            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                            sock.sendall(conn.data_to_send())
+                    elif isinstance(event, h2.events.StreamEnded):
+                        threading.Thread(target=self._respond, args=(conn, sock, send_lock, event.stream_id, paths.pop(event.stream_id)), daemon=True).start()
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+
+    def _respond(self, conn, sock, send_lock, stream_id, path) -> None:
+        url = urlparse(path)
+        endpoint = url.path.split("/v4/", 1)[-1]
+        params = parse_qs(url.query)
+        with self.lock:
+            self.calls.append((endpoint, params))
+            self.streams += 1
+            self.peak_streams = max(self.peak_streams, self.streams)
+        delay = self.delay.get(endpoint)
+        if delay is not None:
+            time.sleep(delay())
+        route = self.routes.get(endpoint)
+        payload = route(params) if route else {"status": "error", "error": {"code": "404", "message": "Endpoint doesn't exist"}}
+        raw = json.dumps(payload).encode()
+        with self.lock:
+            self.streams -= 1
+        with send_lock:
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(raw)))])
+            conn.send_data(stream_id, raw, end_stream=True)
+            try:
+                sock.sendall(conn.data_to_send())
+            except OSError:
+                pass
+
+@pytest.fixture
+def h2_api():
+    """
+    A running H2API; skipped when httpx or h2 is not installed.
+    """
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    server = H2API()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,84 @@
+#pylint: disable=C0301
+"""
+Tests for the BatchAggregator against the local mock API.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError # pylint: disable=C0413
+from alldebrid.batching import BatchAggregator # pylint: disable=C0413
+
+def instant(params):
+    """
+    Answers magnet/instant with one entry per magnet; magnets containing "bad" are invalid.
+    """
+    magnets = params.get("magnets[]", [])
+    entries = [
+        {"magnet": magnet, "error": {"code": "MAGNET_INVALID_URI", "message": "Magnet is not valid"}} if "bad" in magnet else {"magnet": magnet, "instant": magnet.endswith("0")}
+        for magnet in magnets
+    ]
+    return {"status": "success", "data": {"magnets": entries}}
+
+class TestBatching:
+    """
+    Tests for merging single calls into batches.
+    """
+    def test_single_calls_are_merged(self, mock_api):
+        """
+        Concurrent single-magnet checks are sent in a few batched requests and fanned back out.
+        """
+        mock_api.routes["magnet/instant"] = instant
+        magnets = [f"magnet-{i}" for i in range(200)] + ["magnet-0"]
+
+        with BatchAggregator(mock_api.client(), max_batch=50, max_wait=0.05) as batcher:
+            with ThreadPoolExecutor(max_workers=64) as executor:
+                results = list(executor.map(lambda magnet: batcher.check_magnet_instant(magnet).result(timeout=5), magnets))
+
+        assert [result["magnet"] for result in results] == magnets
+        assert [result["instant"] for result in results] == [magnet.endswith("0") for magnet in magnets]
+        batches = [params["magnets[]"] for endpoint, params in mock_api.calls if endpoint == "magnet/instant"]
+        assert 200 <= sum(len(batch) for batch in batches) <= 201
+        assert len(batches) < 20
+
+    def test_item_errors_fail_only_their_future(self, mock_api):
+        """
+        An error entry fails its own caller while the rest of the batch succeeds.
+        """
+        mock_api.routes["magnet/instant"] = instant
+
+        with BatchAggregator(mock_api.client(), max_wait=0.05) as batcher:
+            good = batcher.check_magnet_instant("magnet-10")
+            bad = batcher.check_magnet_instant("bad-magnet")
+
+            assert good.result(timeout=5)["instant"] is True
+            with pytest.raises(APIError):
+                bad.result(timeout=5)
+
+        assert len(mock_api.calls) == 1
+
+    def test_unlocks_are_sent_one_link_per_request(self, mock_api):
+        """
+        The unlock endpoint takes one link, so each queued unlock is its own request, sent concurrently.
+        """
+        def unlock(params):
+            link = params["link"][0]
+            if "down" in link:
+                return {"status": "error", "error": {"code": "LINK_DOWN", "message": "This link is not available on the file hoster website"}}
+            return {"status": "success", "data": {"link": "direct/" + link, "host": "host"}}
+
+        mock_api.routes["link/unlock"] = unlock
+        mock_api.delay["link/unlock"] = lambda: 0.2
+
+        with BatchAggregator(mock_api.client(), max_wait=0.05, workers=8) as batcher:
+            start = time.monotonic()
+            futures = [batcher.download_link(f"https://host/{i}") for i in range(5)]
+            down = batcher.download_link("https://host/down")
+            assert [future.result(timeout=5)["link"] for future in futures] == [f"direct/https://host/{i}" for i in range(5)]
+            with pytest.raises(APIError):
+                down.result(timeout=5)
+            assert time.monotonic() - start < 0.6
+
+        assert sorted(params["link"] for _, params in mock_api.calls) == sorted([[f"https://host/{i}"] for i in range(5)] + [["https://host/down"]])
@@ -0,0 +1,90 @@
+#pylint: disable=C0301
+"""
+Tests for bulk magnet deletion, restart and cleanup.
+"""
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+INVALID = {"status": "error", "error": {"code": "MAGNET_INVALID_ID", "message": "This magnet ID does not exists or is invalid"}}
+
+class TestBulk:
+    """
+    Tests for delete_magnets, restart_magnets and cleanup_magnets.
+    """
+    def setup_magnets(self, mock_api, magnets):
+        """
+        Serves ``magnets`` (id to status code) through the status, delete and restart endpoints.
+        """
+        lock = threading.Lock()
+
+        def delete(params):
+            magnet_id = int(params["id"][0])
+            with lock:
+                if magnets.pop(magnet_id, None) is None:
+                    return INVALID
+            return {"status": "success", "data": {"message": "Magnet was successfully deleted"}}
+
+        def restart(params):
+            ids = [int(value) for value in params["ids"]]
+            if any(magnet_id not in magnets for magnet_id in ids):
+                return INVALID
+            return {"status": "success", "data": {"magnets": [{"magnet": str(magnet_id), "message": "Magnet restarted"} if magnets[magnet_id] >= 5 else {"magnet": str(magnet_id), "error": {"code": "MAGNET_PROCESSING", "message": "Already processing"}} for magnet_id in ids]}}
+
+        mock_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"magnets": [{"id": magnet_id, "statusCode": code} for magnet_id, code in sorted(magnets.items())]}}
+        mock_api.routes["magnet/delete"] = delete
+        mock_api.routes["magnet/restart"] = restart
+
+    def test_delete_concurrently(self, mock_api):
+        """
+        Deletions run concurrently and a missing magnet fails only itself.
+        """
+        magnets = {magnet_id: 4 for magnet_id in range(1, 41)}
+        self.setup_magnets(mock_api, magnets)
+        mock_api.delay["magnet/delete"] = lambda: 0.05
+
+        start = time.monotonic()
+        results = mock_api.client().delete_magnets(list(range(1, 41)) + [99, 99], max_workers=10)
+        assert time.monotonic() - start < 1.0
+        assert magnets == {}
+        assert results[99] == {"status": "error", "error": {"code": "MAGNET_INVALID_ID", "message": "This magnet ID does not exists or is invalid"}}
+        assert sum(outcome["status"] == "success" for outcome in results.values()) == 40
+
+    def test_restart_isolates_bad_ids(self, mock_api):
+        """
+        A chunk rejected for one bad id is split until only that id fails, and per-magnet errors are kept.
+        """
+        magnets = {magnet_id: 5 for magnet_id in range(1, 21)}
+        magnets[3] = 1
+        self.setup_magnets(mock_api, magnets)
+
+        results = mock_api.client().restart_magnets(list(range(1, 21)) + [77], chunk_size=8)
+        assert results[77]["error"]["code"] == "MAGNET_INVALID_ID"
+        assert results[3]["error"]["code"] == "MAGNET_PROCESSING"
+        assert [magnet_id for magnet_id, outcome in results.items() if outcome["status"] == "success"] == [magnet_id for magnet_id in range(1, 21) if magnet_id != 3]
+        assert len([call for call in mock_api.calls if call[0] == "magnet/restart"]) == 9
+
+    def test_cleanup_from_one_listing(self, mock_api):
+        """
+        cleanup_magnets lists the magnets once and acts only on those the predicate selects.
+        """
+        magnets = {1: 4, 2: 7, 3: 11, 4: 4}
+        self.setup_magnets(mock_api, magnets)
+
+        assert mock_api.client().cleanup_magnets(lambda magnet: magnet["statusCode"] >= 5) == {2: {"status": "success"}, 3: {"status": "success"}}
+        assert magnets == {1: 4, 4: 4}
+        assert len([call for call in mock_api.calls if call[0] == "magnet/status"]) == 1
+        assert mock_api.client().cleanup_magnets(lambda magnet: True, action="restart") == {1: {"status": "error", "error": {"code": "MAGNET_PROCESSING", "message": "Already processing"}}, 4: {"status": "error", "error": {"code": "MAGNET_PROCESSING", "message": "Already processing"}}}
+
+    def test_restart_fails_chunk_on_account_error(self, mock_api):
+        """
+        An error that is not about the ids fails the whole chunk without splitting it.
+        """
+        mock_api.routes["magnet/restart"] = lambda params: {"status": "error", "error": {"code": "AUTH_BAD_APIKEY", "message": "The auth apikey is invalid"}}
+
+        results = mock_api.client().restart_magnets(list(range(1, 21)), chunk_size=8)
+        assert sorted(results) == list(range(1, 21))
+        assert all(outcome["status"] == "error" and outcome["error"]["code"] == "AUTH_BAD_APIKEY" for outcome in results.values())
+        assert len([call for call in mock_api.calls if call[0] == "magnet/restart"]) == 3
@@ -0,0 +1,100 @@
+#pylint: disable=C0301
+"""
+Tests for the command-line interface.
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.cli import main # pylint: disable=C0413
+
+HASHES = ["a" * 40, "b" * 40, "c" * 40]
+
+def run(mock_api, monkeypatch, capsys, argv, stdin=""):
+    """
+    Runs the CLI against the mock API and returns the exit status and the parsed output lines.
+    """
+    monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+    status = main(["--apikey", "a" * 20, "--base-url", mock_api.base_url] + argv)
+    return status, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+class TestCli:
+    """
+    Tests for the alldebrid command.
+    """
+    def test_unlock_runs_in_parallel(self, mock_api, monkeypatch, capsys, tmp_path):
+        """
+        Links from a file are unlocked with -j requests in flight, one result line per link, errors included.
+        """
+        active = [0, 0]
+        lock = threading.Lock()
+
+        def delay():
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            return 0.05
+
+        def unlock(params):
+            with lock:
+                active[0] -= 1
+            link = params["link"][0]
+            if link.endswith("bad"):
+                return {"status": "error", "error": {"code": "LINK_DOWN", "message": "This link is not available on the file hoster website"}}
+            return {"status": "success", "data": {"link": link + "/direct"}}
+
+        mock_api.routes["link/unlock"] = unlock
+        mock_api.delay["link/unlock"] = delay
+        links = [f"https://host.example/{i}" for i in range(23)] + ["https://host.example/bad"]
+        path = tmp_path / "links.txt"
+        path.write_text("# links\n" + "\n".join(links) + "\n\n")
+
+        status, lines = run(mock_api, monkeypatch, capsys, ["-j", "8", "unlock", str(path)])
+        assert status == 1
+        assert sorted(line["input"] for line in lines) == sorted(links)
+        by_input = {line["input"]: line for line in lines}
+        assert by_input["https://host.example/3"] == {"input": "https://host.example/3", "status": "success", "data": {"link": "https://host.example/3/direct"}}
+        assert by_input["https://host.example/bad"]["error"]["code"] == "LINK_DOWN"
+        assert 4 < active[1] <= 8
+
+    def test_batched_magnet_commands(self, mock_api, monkeypatch, capsys):
+        """
+        Magnets from standard input are checked and uploaded in batches, with one result line per magnet.
+        """
+        mock_api.routes["magnet/instant"] = lambda params: {"status": "success", "data": {"magnets": [{"magnet": value, "hash": value, "instant": value == HASHES[0]} for value in params["magnets[]"]]}}
+        mock_api.routes["magnet/upload"] = lambda params: {"status": "success", "data": {"magnets": [{"magnet": value, "id": index + 1} for index, value in enumerate(params["magnets"])]}}
+        magnets = "\n".join(f"magnet:?xt=urn:btih:{value}" for value in HASHES) + "\nnot-a-magnet\n"
+
+        status, lines = run(mock_api, monkeypatch, capsys, ["instant-check", "--batch", "2"], magnets)
+        assert status == 1 and len(lines) == 4
+        assert [line["data"]["instant"] for line in lines if line["status"] == "success"].count(True) == 1
+        assert [line for line in lines if line["status"] == "error"][0]["input"] == "not-a-magnet"
+        assert len([call for call in mock_api.calls if call[0] == "magnet/instant"]) == 2
+
+        status, lines = run(mock_api, monkeypatch, capsys, ["magnet", "upload"], magnets.replace("not-a-magnet\n", ""))
+        assert status == 0 and sorted(line["data"]["id"] for line in lines) == [1, 2, 3]
+
+    def test_magnet_status_and_listings(self, mock_api, monkeypatch, capsys):
+        """
+        Magnet IDs are looked up one by one, and listings stream one line per link.
+        """
+        mock_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"magnets": {"id": int(params["id"][0]), "status": "Ready"}}}
+        mock_api.routes["user/history"] = lambda params: {"status": "success", "data": {"links": [{"link": "https://a.example/1", "filename": "one"}, {"link": "https://a.example/2", "filename": "two"}]}}
+
+        status, lines = run(mock_api, monkeypatch, capsys, ["magnet", "status", "-"], "1\n2\n")
+        assert status == 0 and sorted(line["data"]["id"] for line in lines) == [1, 2]
+
+        status, lines = run(mock_api, monkeypatch, capsys, ["history"])
+        assert status == 0 and [line["data"]["filename"] for line in lines] == ["one", "two"]
+
+    def test_module_entry_point(self):
+        """
+        ``python -m alldebrid`` runs the CLI and rejects a missing API key.
+        """
+        env = {key: value for key, value in os.environ.items() if key != "ALLDEBRID_API_KEY"}
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-m", "alldebrid", "history"], cwd=root, env=env, capture_output=True, text=True, timeout=60, check=False)
+        assert result.returncode == 2 and "API key" in result.stderr
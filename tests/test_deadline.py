@@ -0,0 +1,130 @@
+#pylint: disable=C0301
+"""
+Tests for deadline propagation against the local mock API.
+"""
+import os
+import sys
+import threading
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.deadline import Deadline, DeadlineExceeded, current_deadline # pylint: disable=C0413
+from alldebrid.hedging import HedgePolicy # pylint: disable=C0413
+from alldebrid.priority import PriorityDispatcher # pylint: disable=C0413
+
+class TestDeadline:
+    """
+    Tests for Deadline and its use by the client.
+    """
+    def test_request_timeout_is_shrunk(self, mock_api):
+        """
+        A slow request fails when the deadline passes, not after the client's own timeout.
+        """
+        mock_api.delay["ping"] = lambda: 1.0
+        alldebrid = mock_api.client(timeout=10)
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0.2):
+                alldebrid.ping()
+        assert time.monotonic() - start < 0.6
+
+    def test_expired_deadline_sends_nothing(self, mock_api):
+        """
+        No request is sent once the deadline has passed.
+        """
+        alldebrid = mock_api.client()
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0):
+                alldebrid.ping()
+        assert not mock_api.calls
+
+    def test_waits_are_bounded(self, mock_api):
+        """
+        Waiting for a dispatch slot or for a hedged request ends when the deadline passes.
+        """
+        dispatcher = PriorityDispatcher(capacity=1, reserved=0)
+        assert dispatcher.acquire()
+        assert not dispatcher.acquire(timeout=0.05)
+        alldebrid = mock_api.client(dispatcher=dispatcher)
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0.2):
+                alldebrid.ping()
+        assert time.monotonic() - start < 0.6 and not mock_api.calls
+        dispatcher.release()
+        assert dispatcher.in_flight == 0
+
+        policy = HedgePolicy(initial_delay=0.05, budget=0.0)
+        for _ in range(2):
+            start = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                with Deadline(0.2):
+                    policy.execute("ping", lambda: time.sleep(1.0))
+            assert time.monotonic() - start < 0.6
+        assert policy.metrics()["hedged"] == 1 and policy.metrics()["budget_denied"] == 1
+
+    def test_polling_stops_early(self, mock_api):
+        """
+        get_direct_stream_link gives up as soon as another poll cannot finish in time.
+        """
+        mock_api.routes["link/unlock"] = lambda params: {"status": "success", "data": {"id": "abc", "streams": [{"id": "720p"}]}}
+        mock_api.routes["link/streaming"] = lambda params: {"status": "success", "data": {"delayed": 42}}
+        mock_api.routes["link/delayed"] = lambda params: {"status": "success", "data": {"status": 1}}
+        alldebrid = mock_api.client()
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            alldebrid.get_direct_stream_link("https://host.example/video", deadline=1.0)
+        assert time.monotonic() - start < 0.5
+        assert [endpoint for endpoint, _ in mock_api.calls] == ["link/unlock", "link/streaming", "link/delayed"]
+
+    def test_nested_deadlines(self):
+        """
+        An inner deadline cannot extend the outer one, and the outer one is restored afterwards.
+        """
+        assert current_deadline() is None
+        with Deadline(10) as outer:
+            with Deadline(60):
+                assert current_deadline() is outer
+            with Deadline(1) as inner:
+                assert current_deadline() is inner
+            assert current_deadline() is outer
+        assert current_deadline() is None
+
+    def test_shared_across_threads(self):
+        """
+        One deadline can be entered from several threads at once, each restoring its own context.
+        """
+        shared = Deadline(30)
+        steps = [threading.Event() for _ in range(4)]
+        errors = []
+
+        def worker(may_enter, entered, may_exit, exited):
+            # The threads leave the shared deadline in the order they entered it.
+            try:
+                with Deadline(60) as own:
+                    may_enter.wait(timeout=5)
+                    with shared:
+                        entered.set()
+                        may_exit.wait(timeout=5)
+                        assert current_deadline() is shared
+                    assert current_deadline() is own
+            except Exception as exc: # pylint: disable=W0703
+                errors.append(exc)
+            finally:
+                entered.set()
+                exited.set()
+
+        steps[0].set()
+        threads = [
+            threading.Thread(target=worker, args=(steps[0], steps[1], steps[2], steps[3])),
+            threading.Thread(target=worker, args=(steps[1], steps[2], steps[3], threading.Event())),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert not errors
+        assert current_deadline() is None
@@ -0,0 +1,79 @@
+#pylint: disable=C0301
+"""
+Tests for the SegmentedDownloader against a local ranged HTTP server.
+"""
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.downloader import SegmentedDownloader # pylint: disable=C0413
+
+class FakeClient:
+    """
+    Unlocks every link to a new path on the ranged server.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.unlocks = 0
+
+    def download_link(self, links, password=None):  # pylint: disable=W0613
+        """
+        Returns a fresh direct URL, like a new unlock would.
+        """
+        self.unlocks += 1
+        return {"status": "success", "data": {"link": self.server.url(f"file/{self.unlocks}")}}
+
+class TestDownloader:
+    """
+    Tests for segmented, resumable downloads.
+    """
+    def test_parallel_segments(self, ranged_server, tmp_path):
+        """
+        The file is fetched in several Range segments into a preallocated file.
+        """
+        path = str(tmp_path / "out.bin")
+        downloader = SegmentedDownloader(FakeClient(ranged_server), segments=4, chunk_size=8192, min_segment_size=64 * 1024)
+
+        assert downloader.download("https://host.example/a", path) == path
+
+        with open(path, "rb") as file:
+            assert file.read() == ranged_server.content
+        ranges = {header for _, header in ranged_server.requests}
+        assert len(ranges - {"bytes=0-0"}) == 4
+        assert not os.path.exists(path + ".state")
+
+    def test_reunlocks_expired_link(self, ranged_server, tmp_path):
+        """
+        When the direct URL expires mid-transfer the link is unlocked again and the download completes.
+        """
+        client = FakeClient(ranged_server)
+        ranged_server.expire("file/1", after_bytes=200 * 1024)
+        path = str(tmp_path / "out.bin")
+
+        SegmentedDownloader(client, segments=2, chunk_size=4096, min_segment_size=64 * 1024).download("https://host.example/a", path)
+
+        assert client.unlocks == 2
+        with open(path, "rb") as file:
+            assert file.read() == ranged_server.content
+
+    def test_resumes_from_state(self, ranged_server, tmp_path):
+        """
+        A saved state makes the download fetch only the missing bytes.
+        """
+        path = str(tmp_path / "out.bin")
+        size = len(ranged_server.content)
+        half = size // 2
+        with open(path, "wb") as file:
+            file.write(ranged_server.content[:half])
+            file.truncate(size)
+        with open(path + ".state", "w", encoding="utf-8") as file:
+            json.dump({"link": "https://host.example/a", "url": ranged_server.url("file/9"), "size": size, "segments": [[0, size - 1, half]]}, file)
+
+        client = FakeClient(ranged_server)
+        SegmentedDownloader(client, segments=1).download("https://host.example/a", path)
+
+        assert client.unlocks == 0
+        assert ranged_server.requests == [("/file/9", f"bytes={half}-{size - 1}")]
+        with open(path, "rb") as file:
+            assert file.read() == ranged_server.content
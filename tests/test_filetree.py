@@ -0,0 +1,90 @@
+#pylint: disable=C0301
+"""
+Tests for the columnar file tree table.
+"""
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.filetree import VIDEO_EXTENSIONS, FileTable # pylint: disable=C0413
+
+INSTANT = [
+    {"hash": "a" * 40, "instant": True, "files": [
+        {"n": "Show", "e": [
+            {"n": "Season 1", "e": [{"n": "E01.MKV", "s": 700}, {"n": "E02.mkv", "s": 900}, {"n": "E02.srt", "s": 5}]},
+            {"n": "poster.jpg", "s": 2000},
+        ]},
+        {"n": "readme.txt", "s": 10},
+    ]},
+    {"hash": "b" * 40, "instant": False},
+    {"hash": "c" * 40, "instant": True, "files": [{"n": "notes.txt", "s": 3}, {"n": "empty", "e": []}]},
+]
+
+def random_tree(rng, depth=0):
+    """
+    A random list of files and folders.
+    """
+    entries = []
+    for index in range(rng.randint(0, 6)):
+        if depth < 3 and rng.random() < 0.3:
+            entries.append({"n": f"dir{index}", "e": random_tree(rng, depth + 1)})
+        else:
+            entries.append({"n": f"f{index}.{rng.choice(['mkv', 'MP4', 'srt', 'nfo', 'noext'])}", "s": rng.randint(0, 10)})
+    return entries
+
+def walk(entries, prefix=""):
+    """
+    The (path, size) of every file, depth first.
+    """
+    for entry in entries:
+        if "e" in entry:
+            yield from walk(entry["e"], prefix + entry["n"] + "/")
+        else:
+            yield prefix + entry["n"], entry["s"]
+
+class TestFileTable:
+    """
+    Tests for FileTable.
+    """
+    def test_queries(self):
+        """
+        Largest file, extension matches and totals come out per magnet, with paths through the folders.
+        """
+        table = FileTable.from_magnets(INSTANT)
+        assert table.magnet_count == 3 and len(table) == 9
+        assert table.main_files(VIDEO_EXTENSIONS) == {"a" * 40: ("Show/Season 1/E02.mkv", 900), "b" * 40: None, "c" * 40: None}
+        assert table.main_files() == {"a" * 40: ("Show/poster.jpg", 2000), "b" * 40: None, "c" * 40: ("notes.txt", 3)}
+        assert [table.path(entry) for entry in table.matching({".MKV", "srt"})] == ["Show/Season 1/E01.MKV", "Show/Season 1/E02.mkv", "Show/Season 1/E02.srt"]
+        assert table.total_sizes() == [3615, 0, 3]
+        assert table.names.count("E02.mkv") == 1 and table.nbytes > 0
+
+    def test_magnet_status_links(self):
+        """
+        Magnet status results are read from their links, by magnet ID.
+        """
+        magnets = [{"id": 7, "status": "Ready", "links": [{"link": "https://a/1", "filename": "movie.mp4", "size": 50, "files": [{"n": "movie.mp4", "s": 50}]}, {"link": "https://a/2", "filename": "extra.mkv", "size": 60}]}]
+        assert FileTable.from_magnets(magnets).main_files(VIDEO_EXTENSIONS) == {7: ("extra.mkv", 60)}
+
+    def test_matches_walking_the_dicts(self):
+        """
+        On random trees, every query agrees with walking the nested dicts.
+        """
+        rng = random.Random(3)
+        magnets = [{"hash": str(index), "files": random_tree(rng)} for index in range(300)]
+        table = FileTable.from_magnets(magnets)
+        table.main_files({"mkv", "mp4"})
+        table.add({"hash": "late", "files": [{"n": "late.mkv", "s": 99}]})
+        magnets.append({"hash": "late", "files": [{"n": "late.mkv", "s": 99}]})
+
+        for extensions in (None, {"mkv", "mp4"}, {"srt"}):
+            expected = {}
+            for magnet in magnets:
+                best = None
+                for path, size in walk(magnet["files"]):
+                    if extensions is None or path.rsplit(".", 1)[-1].lower() in extensions:
+                        if best is None or size > best[1]:
+                            best = (path, size)
+                expected[magnet["hash"]] = best
+            assert table.main_files(extensions) == expected
+        assert table.total_sizes() == [sum(size for _, size in walk(magnet["files"])) for magnet in magnets]
+        assert len(table.matching(["srt"])) == sum(path.endswith(".srt") for magnet in magnets for path, _ in walk(magnet["files"]))
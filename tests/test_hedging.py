@@ -0,0 +1,89 @@
+#pylint: disable=C0301
+"""
+Tests for hedged requests against the local mock API.
+"""
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.hedging import HedgePolicy # pylint: disable=C0413
+
+class TestHedging:
+    """
+    Tests for the HedgePolicy.
+    """
+    def test_slow_attempt_is_hedged(self, mock_api):
+        """
+        A second request is sent when the first is slow, and its answer is returned.
+        """
+        counter = itertools.count()
+        mock_api.delay["ping"] = lambda: 1.0 if next(counter) == 0 else 0
+        alldebrid = mock_api.client(hedge_policy=HedgePolicy(initial_delay=0.05))
+
+        start = time.monotonic()
+        assert alldebrid.ping()["status"] == "success"
+        assert time.monotonic() - start < 0.5
+
+        metrics = alldebrid.hedge_policy.metrics()
+        assert metrics["hedged"] == 1 and metrics["hedge_wins"] == 1 and metrics["hedge_win_rate"] == 1.0
+        assert [endpoint for endpoint, _ in mock_api.calls] == ["ping", "ping"]
+
+    def test_budget_limits_hedges(self, mock_api):
+        """
+        Once the budget is spent, slow requests wait for their single attempt.
+        """
+        mock_api.delay["ping"] = lambda: 0.05
+        alldebrid = mock_api.client(hedge_policy=HedgePolicy(initial_delay=0.01, budget=0.0))
+
+        for _ in range(3):
+            alldebrid.ping()
+
+        metrics = alldebrid.hedge_policy.metrics()
+        assert metrics["requests"] == 3 and metrics["hedged"] == 1 and metrics["budget_denied"] == 2
+        assert len(mock_api.calls) == 4
+
+    def test_only_idempotent_reads_are_hedged(self, mock_api):
+        """
+        POST requests and endpoints outside the policy are sent once.
+        """
+        policy = HedgePolicy(initial_delay=0.0)
+        assert policy.applies("GET", "magnet/status")
+        assert not policy.applies("POST", "magnet/status")
+        assert not policy.applies("GET", "link/unlock")
+
+        mock_api.routes["magnet/upload"] = lambda params: {"status": "success", "data": {"magnets": []}}
+        mock_api.delay["magnet/upload"] = lambda: 0.05
+        alldebrid = mock_api.client(hedge_policy=policy)
+        alldebrid.upload_magnets("magnet:?xt=urn:btih:" + "0" * 40)
+        assert len(mock_api.calls) == 1 and policy.metrics()["requests"] == 0
+
+    def test_delay_follows_percentile(self):
+        """
+        The hedge delay is the configured percentile of recent latencies, within the bounds.
+        """
+        policy = HedgePolicy(percentile=0.9, min_samples=10, min_delay=0.0, max_delay=0.5)
+        assert policy.delay_for("ping") == policy.initial_delay
+        for latency in range(100):
+            policy.record("ping", latency / 1000)
+        assert policy.delay_for("ping") == 0.09
+
+        for _ in range(200):
+            policy.record("ping", 2.0)
+        assert policy.delay_for("ping") == 0.5
+
+    def test_queueing_does_not_trigger_hedges(self, mock_api):
+        """
+        Concurrent calls up to the client's pool size all run at once, and none is hedged for waiting on a thread.
+        """
+        mock_api.delay["ping"] = lambda: 0.3
+        alldebrid = mock_api.client(pool_maxsize=64, hedge_policy=HedgePolicy(initial_delay=0.5))
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            results = list(executor.map(lambda _: alldebrid.ping()["status"], range(64)))
+        assert results == ["success"] * 64
+        assert time.monotonic() - start < 0.9
+        metrics = alldebrid.hedge_policy.metrics()
+        assert metrics["requests"] == 64 and metrics["hedged"] == 0 and metrics["budget_denied"] == 0
@@ -0,0 +1,61 @@
+#pylint: disable=C0301
+"""
+Tests for the HTTP/2 transport against a local h2c server.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import API_HOST, AllDebrid # pylint: disable=C0413
+
+class TestHTTP2:
+    """
+    Tests for multiplexing requests over HTTP/2.
+    """
+    def test_requests_share_one_connection(self, h2_api):
+        """
+        Many concurrent requests are multiplexed as streams over a single connection.
+        """
+        h2_api.delay["ping"] = lambda: 0.05
+        h2_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"id": params["id"]}}
+        alldebrid = h2_api.client(max_connections=1)
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            results = list(executor.map(lambda _: alldebrid.ping(), range(64)))
+        elapsed = time.monotonic() - start
+
+        assert all(result["data"]["ping"] == "pong" for result in results)
+        assert h2_api.connections == 1 and h2_api.peak_streams > 16
+        assert elapsed < 1.5
+        assert alldebrid.get_magnet_status(3)["data"]["id"] == ["3"]
+        assert h2_api.calls[-1][1]["agent"] == ["python"]
+
+    def test_stream_limit(self, h2_api):
+        """
+        No more than max_concurrent_streams requests are in flight at once.
+        """
+        h2_api.delay["ping"] = lambda: 0.02
+        alldebrid = h2_api.client(max_connections=1, max_concurrent_streams=4)
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(lambda _: alldebrid.ping(), range(64)))
+        assert h2_api.peak_streams <= 4
+
+    def test_http1_fallback(self, mock_api):
+        """
+        Servers without HTTP/2 are spoken to over HTTP/1.1.
+        """
+        pytest.importorskip("httpx")
+        from alldebrid.http2 import HTTP2Transport # pylint: disable=C0415
+        alldebrid = mock_api.client(transport=HTTP2Transport())
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+
+    def test_https_is_the_default(self):
+        """
+        The API is reached over HTTPS unless another base URL is given.
+        """
+        assert API_HOST.startswith("https://")
+        assert AllDebrid(apikey="a" * 20).base_url == API_HOST
+        assert AllDebrid(apikey="a" * 20, base_url="http://localhost:8080/v4/").base_url == "http://localhost:8080/v4/"
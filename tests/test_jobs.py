@@ -0,0 +1,165 @@
+#pylint: disable=C0301
+"""
+Tests for the SQLite-backed job queue.
+"""
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError # pylint: disable=C0413
+from alldebrid.jobs import JobQueue # pylint: disable=C0413
+
+class FakeClient:
+    """
+    Stands in for AllDebrid, recording calls and the concurrency per host.
+    """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.failures = {}
+        self.delayed_status = []
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def download_link(self, link, password=None):
+        """
+        Unlocks ``link``, failing with the queued errors first.
+        """
+        host = link.split("/")[2]
+        with self.lock:
+            self.calls.append(link)
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            errors = self.failures.get(link)
+            error = errors.pop(0) if errors else None
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[host] -= 1
+        if error is not None:
+            raise error
+        return {"status": "success", "data": {"link": link.replace("host", "cdn")}}
+
+    def upload_magnets(self, magnets):
+        """
+        Uploads magnets.
+        """
+        self.calls.extend(magnets)
+        return {"status": "success", "data": {"magnets": [{"magnet": magnet, "id": 1} for magnet in magnets]}}
+
+    def delayed_links(self, download_id):
+        """
+        Reports the queued statuses, then a ready link.
+        """
+        self.calls.append(download_id)
+        status = self.delayed_status.pop(0) if self.delayed_status else 2
+        return {"status": "success", "data": {"status": status, "link": "https://cdn.example/ready" if status == 2 else None}}
+
+class TestJobs:
+    """
+    Tests for running, retrying and resuming jobs.
+    """
+    def test_runs_jobs_within_limits(self, tmp_path):
+        """
+        Jobs run concurrently without exceeding the per-host limit, and their results are stored.
+        """
+        client = FakeClient(delay=0.02)
+        links = [f"https://host{i % 2}.example/file{i}" for i in range(20)]
+        with JobQueue(client, str(tmp_path / "jobs.db"), workers=6, per_host=2) as queue:
+            keys = [queue.unlock(link) for link in links]
+            keys.append(queue.upload_magnet("magnet:?xt=urn:btih:" + "0" * 40))
+            assert queue.wait(timeout=10)
+            assert queue.result(keys[3]) == {"status": "done", "result": {"link": "https://cdn1.example/file3"}, "error": None, "attempts": 1}
+            assert queue.result(keys[-1])["result"]["id"] == 1
+            assert queue.counts()["done"] == 21
+
+        assert len(client.calls) == 21
+        assert max(client.peak.values()) == 2
+
+    def test_resume_skips_finished_work(self, tmp_path):
+        """
+        Submitting finished jobs again after a restart does not run them again.
+        """
+        path = str(tmp_path / "jobs.db")
+        client = FakeClient()
+        links = [f"https://host.example/file{i}" for i in range(5)]
+        with JobQueue(client, path) as queue:
+            for link in links:
+                queue.unlock(link)
+            assert queue.wait(timeout=10)
+
+        with JobQueue(client, path) as queue:
+            keys = [queue.unlock(link) for link in links + ["https://host.example/new"]]
+            assert queue.wait(timeout=10)
+            assert all(queue.result(key)["status"] == "done" for key in keys)
+        assert len(client.calls) == 6
+
+    def test_crashed_job_is_taken_over(self, tmp_path):
+        """
+        A job left running by a dead worker is run again once its lease expires.
+        """
+        path = str(tmp_path / "jobs.db")
+        client = FakeClient()
+        crashed = JobQueue(client, path, lease=60)
+        key = crashed.unlock("https://host.example/file")
+        assert crashed._claim() is not None  # pylint: disable=W0212
+        crashed.close()
+
+        queue = JobQueue(client, path, lease=60)
+        assert not queue.run_once()
+        queue.clock = lambda: time.time() + 61
+        assert queue.run_once()
+        assert queue.result(key)["status"] == "done" and queue.result(key)["attempts"] == 2
+        queue.close()
+
+    def test_retries_and_failures(self, tmp_path):
+        """
+        Transient errors are retried with backoff; API errors fail the job at once.
+        """
+        client = FakeClient()
+        client.failures["https://host.example/flaky"] = [APIError(408, "timed out")]
+        client.failures["https://host.example/bad"] = [APIError("LINK_HOST_NOT_SUPPORTED", "This host or link is not supported")]
+        queue = JobQueue(client, str(tmp_path / "jobs.db"), backoff=0)
+        flaky = queue.unlock("https://host.example/flaky")
+        bad = queue.unlock("https://host.example/bad")
+        while queue.run_once():
+            pass
+
+        assert queue.result(flaky)["status"] == "done" and queue.result(flaky)["attempts"] == 2
+        assert queue.result(bad)["status"] == "failed" and queue.result(bad)["attempts"] == 1
+        assert "LINK_HOST_NOT_SUPPORTED" in queue.result(bad)["error"]
+        queue.close()
+
+    def test_delayed_link_polls_until_ready(self, tmp_path):
+        """
+        A delayed link that is still processing is polled again without using up attempts.
+        """
+        client = FakeClient()
+        client.delayed_status = [1, 1]
+        queue = JobQueue(client, str(tmp_path / "jobs.db"), poll_delay=0)
+        key = queue.delayed_link("abc")
+        while queue.run_once():
+            pass
+
+        assert queue.result(key)["result"]["link"] == "https://cdn.example/ready"
+        assert queue.result(key)["attempts"] == 1 and client.calls == ["abc"] * 3
+        queue.close()
+
+    def test_delayed_link_gives_up(self, tmp_path):
+        """
+        A delayed link that stays in processing fails once max_poll_time has passed since its submission.
+        """
+        client = FakeClient()
+        client.delayed_status = [1] * 100
+        queue = JobQueue(client, str(tmp_path / "jobs.db"), poll_delay=0, max_poll_time=60)
+        key = queue.delayed_link("abc")
+        assert queue.run_once() and queue.run_once()
+        assert queue.result(key)["status"] == "pending"
+
+        queue.clock = lambda: time.time() + 61
+        while queue.run_once():
+            pass
+        assert queue.result(key)["status"] == "failed" and "not ready after 60s" in queue.result(key)["error"]
+        assert client.calls == ["abc"] * 3
+        queue.close()
@@ -0,0 +1,84 @@
+#pylint: disable=C0301
+"""
+Tests for the expiry-aware LinkStore.
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.linkstore import LinkStore # pylint: disable=C0413
+
+class FakeClock:
+    """
+    A manually advanced clock.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeClient:
+    """
+    Unlocks links to URLs numbered by unlock count.
+    """
+
+    def __init__(self):
+        self.unlocks = []
+
+    def download_link(self, links, password=None):  # pylint: disable=W0613
+        """
+        Returns a new direct URL for every unlock.
+        """
+        self.unlocks.append(links)
+        return {"status": "success", "data": {"link": f"https://cdn.example/{len(self.unlocks)}"}}
+
+class TestLinkStore:
+    """
+    Tests for caching, expiry and refresh prioritization.
+    """
+    def test_get_serves_from_memory_until_expiry(self):
+        """
+        A link is unlocked once and unlocked again only after it expired.
+        """
+        clock, client = FakeClock(), FakeClient()
+        store = LinkStore(client, ttl=100, refresh_margin=10, clock=clock)
+
+        assert store.get("a") == store.get("a") == "https://cdn.example/1"
+        assert store.expires_in("a") == 100
+        clock.now += 101
+        assert store.get("a") == "https://cdn.example/2"
+        assert client.unlocks == ["a", "a"]
+
+    def test_refresh_budget_prefers_recently_used(self):
+        """
+        Only links near expiry are refreshed, within the budget, most recently used first.
+        """
+        clock, client = FakeClock(), FakeClient()
+        store = LinkStore(client, ttl=100, refresh_margin=10, refresh_budget=2, clock=clock)
+        for link in ("a", "b", "c"):
+            store.get(link)
+        clock.now += 50
+        store.get("d")
+        for link in ("c", "a", "b"):
+            clock.now += 1
+            store.get(link)
+
+        assert store.refresh_due() == []
+        clock.now += 40
+        assert store.refresh_due() == ["b", "a"]
+        assert store.expires_in("b") == 100
+        assert store.refresh_due() == ["c"]
+
+    def test_idle_links_are_dropped(self):
+        """
+        Links unused for longer than idle_timeout are evicted instead of refreshed.
+        """
+        clock, client = FakeClock(), FakeClient()
+        store = LinkStore(client, ttl=100, refresh_margin=10, idle_timeout=30, clock=clock)
+        store.get("a")
+        clock.now += 95
+
+        assert store.refresh_due() == []
+        assert "a" not in store
+        assert len(client.unlocks) == 1
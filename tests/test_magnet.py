@@ -0,0 +1,87 @@
+#pylint: disable=C0301
+"""
+Tests for the magnet module and deduplicated magnet requests.
+"""
+import base64
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+from alldebrid.magnet import normalize_magnets, parse_info_hash # pylint: disable=C0413
+
+HEX = "3b245504cf5f11bbdbe1201cea6a6bf45aee1bc0"
+BASE32 = base64.b32encode(bytes.fromhex(HEX)).decode()
+
+class TestMagnet:
+    """
+    Tests for magnet parsing and normalization.
+    """
+    def test_parse_info_hash(self):
+        """
+        Hex and base32 hashes in magnets or bare strings canonicalize to lowercase hex.
+        """
+        assert parse_info_hash(f"magnet:?xt=urn:btih:{HEX.upper()}&dn=x") == HEX
+        assert parse_info_hash(f"magnet:?dn=x&xt=urn:btih:{BASE32.lower()}&tr=udp://a") == HEX
+        assert parse_info_hash(BASE32) == HEX
+        assert parse_info_hash(f" {HEX} ") == HEX
+        assert parse_info_hash(f"magnet:?XT=URN:BTIH:{HEX}") == HEX
+        assert parse_info_hash(f"magnet:?dn=x&xt=Urn:Btih:{BASE32}") == HEX
+        assert parse_info_hash("magnet:?xt=urn:btih:1234") is None
+        assert parse_info_hash(None) is None
+
+    def test_normalize_magnets_dedups_and_expands(self):
+        """
+        Duplicates collapse to one hash and results map back onto every input.
+        """
+        other = "a" * 40
+        inputs = [f"magnet:?xt=urn:btih:{HEX}&tr=udp://a", "not a magnet", f"magnet:?xt=urn:btih:{BASE32}&tr=udp://b", other]
+        batch = normalize_magnets(inputs)
+
+        assert batch.hashes == [HEX, other]
+        assert batch.index == [0, -1, 0, 1]
+        assert batch.invalid == [1]
+        assert batch.representatives == [inputs[0], other]
+        assert batch.expand(["first", "second"], missing="bad") == ["first", "bad", "first", "second"]
+
+    def test_normalize_large_batch(self):
+        """
+        Large batches with many duplicates are reduced to their unique hashes.
+        """
+        hashes = [f"{i:040x}" for i in range(1000)]
+        batch = normalize_magnets(f"magnet:?xt=urn:btih:{hashes[i % 1000]}&dn={i}" for i in range(100000))
+
+        assert batch.hashes == hashes
+        assert len(batch) == 100000
+
+    def test_check_magnet_instant_deduplicate(self, monkeypatch):
+        """
+        Only unique hashes are sent and the response is expanded onto the original magnets.
+        """
+        sent = []
+
+        def fake_request(method, endpoint, **kwargs):
+            sent.extend(kwargs["magnets"])
+            return {"status": "success", "data": {"magnets": [{"magnet": HEX, "hash": HEX, "instant": True}]}}
+
+        alldebrid = AllDebrid(apikey="a" * 20)
+        monkeypatch.setattr(alldebrid, "_request", fake_request)
+
+        inputs = [f"magnet:?xt=urn:btih:{HEX}", BASE32, "bogus"]
+        response = alldebrid.check_magnet_instant(inputs, deduplicate=True)
+
+        assert sent == [HEX]
+        magnets = response["data"]["magnets"]
+        assert [magnet["magnet"] for magnet in magnets] == inputs
+        assert magnets[0]["instant"] and magnets[1]["instant"]
+        assert magnets[2]["error"]["code"] == "MAGNET_INVALID_URI"
+
+    def test_short_answer_is_reported(self, monkeypatch):
+        """
+        A deduplicated request answered with fewer results than unique hashes fails clearly.
+        """
+        alldebrid = AllDebrid(apikey="a" * 20)
+        monkeypatch.setattr(alldebrid, "_request", lambda method, endpoint, **kwargs: {"status": "success", "data": {"magnets": []}})
+
+        with pytest.raises(ValueError, match="Expected 1 results, got 0"):
+            alldebrid.check_magnet_instant([f"magnet:?xt=urn:btih:{HEX}", BASE32], deduplicate=True)
@@ -0,0 +1,123 @@
+#pylint: disable=C0301
+"""
+Tests for host-aware mirror selection.
+"""
+import os
+import sys
+import threading
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError # pylint: disable=C0413
+from alldebrid.deadline import Deadline, current_deadline # pylint: disable=C0413
+from alldebrid.mirrors import MirrorSelector, host_of # pylint: disable=C0413
+from alldebrid.priority import HIGH, current_priority, request_priority # pylint: disable=C0413
+
+class FakeClient:
+    """
+    Unlocks links after a per-host delay, failing with the per-host error codes queued.
+    """
+    def __init__(self, delays=None, errors=None):
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def download_link(self, link, password=None):
+        """
+        Unlocks ``link``.
+        """
+        host = host_of(link)
+        with self.lock:
+            self.calls.append(host)
+            queued = self.errors.get(host)
+            error = queued.pop(0) if queued else None
+        time.sleep(self.delays.get(host, 0))
+        if error is not None:
+            raise APIError(error, "refused")
+        return {"status": "success", "data": {"link": link + "/direct", "host": host}}
+
+LINKS = ["https://www.slow.example/f", "https://fast.example/f", "https://flaky.example/f"]
+
+class TestMirrors:
+    """
+    Tests for MirrorSelector.
+    """
+    def test_learns_the_best_host(self):
+        """
+        Latency and failures move a host down the ranking; unknown hosts are tried first.
+        """
+        client = FakeClient(delays={"slow.example": 0.05}, errors={"flaky.example": ["LINK_DOWN"] * 3})
+        selector = MirrorSelector(client)
+        for link in LINKS:
+            try:
+                selector.unlock([link])
+            except APIError:
+                pass
+
+        assert selector.rank(LINKS + ["https://new.example/f"]) == ["https://new.example/f", "https://fast.example/f", "https://www.slow.example/f", "https://flaky.example/f"]
+        link, response = selector.unlock(LINKS)
+        assert link == "https://fast.example/f" and response["data"]["host"] == "fast.example"
+        stats = selector.stats()
+        assert stats["flaky.example"]["failures"] == 1 and stats["flaky.example"]["last_error"] == "LINK_DOWN"
+        assert stats["fast.example"]["unlocks"] == 2
+
+    def test_download_speed_and_cool_down(self):
+        """
+        Reported download speed outweighs unlock latency, and a busy host rests for the cool-down.
+        """
+        now = [0.0]
+        client = FakeClient(errors={"fast.example": ["LINK_HOST_FULL"]})
+        selector = MirrorSelector(client, alpha=1.0, cool_down=30, clock=lambda: now[0])
+        selector.record_unlock(LINKS[0], 2.0)
+        selector.record_unlock(LINKS[1], 0.1)
+        selector.record_download(LINKS[0], 1 << 30, 10)
+        selector.record_download(LINKS[1], 1 << 30, 100)
+        assert selector.rank(LINKS[:2]) == LINKS[:2]
+
+        selector.record_download(LINKS[0], 1 << 30, 1000)
+        assert selector.rank(LINKS[:2])[0] == LINKS[1]
+        link, _ = selector.unlock(LINKS[:2])
+        assert link == LINKS[0] and client.calls == ["fast.example", "slow.example"]
+        assert selector.cost(LINKS[1]) == float("inf")
+        now[0] += 31
+        assert selector.cost(LINKS[1]) < float("inf")
+
+    def test_hedged_fallback(self):
+        """
+        With hedge_after, a slow best link is raced by the next one, and failures fall through to the rest.
+        """
+        client = FakeClient(delays={"slow.example": 0.5, "fast.example": 0.02}, errors={"flaky.example": ["LINK_HOST_UNAVAILABLE"]})
+        selector = MirrorSelector(client, hedge_after=0.05)
+        start = time.monotonic()
+        link, _ = selector.unlock(LINKS)
+        assert link == "https://fast.example/f" and time.monotonic() - start < 0.3
+
+        client = FakeClient(errors={host: ["LINK_DOWN"] for host in ("slow.example", "fast.example", "flaky.example")})
+        with pytest.raises(APIError):
+            MirrorSelector(client, hedge_after=0.05).unlock(LINKS)
+        assert sorted(client.calls) == ["fast.example", "flaky.example", "slow.example"]
+
+        client = FakeClient(errors={"slow.example": ["AUTH_BAD_APIKEY"]})
+        with pytest.raises(APIError):
+            MirrorSelector(client).unlock(LINKS)
+        assert client.calls == ["slow.example"]
+
+    def test_hedged_unlocks_keep_the_context(self):
+        """
+        Hedged unlocks run with the caller's priority and deadline.
+        """
+        seen = []
+
+        class ContextClient(FakeClient):
+            """
+            Records the priority and deadline each unlock runs with.
+            """
+            def download_link(self, link, password=None):
+                seen.append((current_priority(), current_deadline()))
+                return super().download_link(link, password)
+
+        client = ContextClient(delays={"slow.example": 0.2})
+        with request_priority(HIGH), Deadline(5) as deadline:
+            MirrorSelector(client, hedge_after=0.05).unlock(LINKS[:2])
+        assert len(seen) == 2 and all(entry == (HIGH, deadline) for entry in seen)
@@ -0,0 +1,116 @@
+#pylint: disable=C0301
+"""
+Tests for the shared poll scheduler.
+"""
+import os
+import sys
+import threading
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError, MaxAttemptsExceededException # pylint: disable=C0413
+from alldebrid.deadline import Deadline, DeadlineExceeded # pylint: disable=C0413
+from alldebrid.polling import PollScheduler # pylint: disable=C0413
+
+class FakeClient:
+    """
+    Delayed links and magnets that become ready after a given number of polls.
+    """
+    def __init__(self, ready_after=None, magnets=None):
+        self.ready_after = ready_after or {}
+        self.magnets = magnets or {}
+        self.polls = {}
+        self.listings = 0
+        self.singles = 0
+        self.lock = threading.Lock()
+
+    def delayed_links(self, download_id):
+        """
+        Answers status 2 once ``download_id`` was polled ``ready_after`` times.
+        """
+        with self.lock:
+            count = self.polls[download_id] = self.polls.get(download_id, 0) + 1
+        if count >= self.ready_after.get(download_id, 1):
+            return {"status": "success", "data": {"status": 2, "link": f"https://cdn.example/{download_id}"}}
+        return {"status": "success", "data": {"status": 1}}
+
+    def get_magnet_status(self, magnet_id):
+        """
+        Returns the next status code queued for one magnet.
+        """
+        with self.lock:
+            self.singles += 1
+        return {"status": "success", "data": {"magnets": self._next(magnet_id)}}
+
+    def _next(self, magnet_id):
+        with self.lock:
+            codes = self.magnets[magnet_id]
+            code = codes.pop(0) if len(codes) > 1 else codes[0]
+        return {"id": magnet_id, "statusCode": code, "status": "Ready" if code == 4 else "Downloading"}
+
+    def iter_magnets(self):
+        """
+        Lists every magnet with its next status code.
+        """
+        with self.lock:
+            self.listings += 1
+        for magnet_id in list(self.magnets):
+            yield self._next(magnet_id)
+
+class TestPollScheduler:
+    """
+    Tests for PollScheduler.
+    """
+    def test_many_delayed_links_on_fixed_threads(self):
+        """
+        Thousands of pending delayed links resolve without a thread per link.
+        """
+        ids = [f"d{index}" for index in range(3000)]
+        client = FakeClient(ready_after={delayed_id: 1 + index % 3 for index, delayed_id in enumerate(ids)})
+        with PollScheduler(client, interval=0.01, max_delay=None, workers=4) as scheduler:
+            futures = [scheduler.delayed_link(delayed_id) for delayed_id in ids]
+            assert sum(thread.name.startswith("alldebrid-poll") for thread in threading.enumerate()) <= 5
+            links = [future.result(timeout=30) for future in futures]
+            assert scheduler.pending == 0
+        assert links == [f"https://cdn.example/{delayed_id}" for delayed_id in ids]
+        assert sum(client.polls.values()) == sum(1 + index % 3 for index in range(len(ids)))
+
+    def test_magnet_polls_share_one_listing(self):
+        """
+        Magnets that fall due together are answered by one listing, and errors fail their own future only.
+        """
+        client = FakeClient(magnets={1: [1, 4], 2: [4], 3: [1, 7]})
+        with PollScheduler(client, interval=0.05) as scheduler:
+            futures = scheduler.magnets_ready([1, 2, 3, 99])
+            assert futures[1].result(timeout=5)["statusCode"] == 4
+            assert futures[2].result(timeout=5)["id"] == 2
+            assert scheduler.magnet_ready(2).result(timeout=5)["statusCode"] == 4
+            with pytest.raises(APIError) as error:
+                futures[3].result(timeout=5)
+            assert error.value.code == "MAGNET_FAILED"
+            with pytest.raises(APIError) as error:
+                futures[99].result(timeout=5)
+            assert error.value.code == "MAGNET_INVALID_ID"
+        assert client.listings == 2 and client.singles == 1
+
+    def test_limits_deadline_and_cancel(self):
+        """
+        Polls stop at max_attempts or before the deadline, and a cancelled future is polled no more.
+        """
+        client = FakeClient(ready_after={"slow": 100, "late": 100, "dropped": 100})
+        with PollScheduler(client, interval=0.02, max_attempts=3) as scheduler:
+            with pytest.raises(MaxAttemptsExceededException):
+                scheduler.delayed_link("slow").result(timeout=5)
+            assert client.polls["slow"] == 3
+
+            with Deadline(0.1):
+                late = scheduler.delayed_link("late", max_attempts=1000)
+            with pytest.raises(DeadlineExceeded):
+                late.result(timeout=5)
+
+            dropped = scheduler.delayed_link("dropped", interval=0.5, max_attempts=1000)
+            threading.Event().wait(0.1)
+            assert dropped.cancel()
+            threading.Event().wait(0.6)
+            assert client.polls["dropped"] == 1 and scheduler.pending == 0
+        with pytest.raises(RuntimeError):
+            scheduler.delayed_link("closed")
@@ -0,0 +1,109 @@
+#pylint: disable=C0301
+"""
+Tests for priority lanes.
+"""
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.priority import HIGH, LOW, NORMAL, PriorityDispatcher, current_priority, request_priority # pylint: disable=C0413
+
+def wait_until(predicate, timeout=5):
+    """
+    Polls ``predicate`` until it is true.
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+class TestPriority:
+    """
+    Tests for the PriorityDispatcher.
+    """
+    def test_reserved_capacity(self):
+        """
+        Background requests cannot use the reserved slots, high priority requests can.
+        """
+        dispatcher = PriorityDispatcher(capacity=2, reserved=1)
+        dispatcher.acquire(LOW)
+        waiter = threading.Thread(target=dispatcher.acquire, args=(LOW,))
+        waiter.start()
+        wait_until(lambda: len(dispatcher._lanes[LOW]) == 1)  # pylint: disable=W0212
+
+        dispatcher.acquire(HIGH)
+        assert dispatcher.in_flight == 2
+
+        dispatcher.release()
+        assert waiter.is_alive()
+        dispatcher.release()
+        waiter.join(timeout=5)
+        assert not waiter.is_alive() and dispatcher.in_flight == 1
+
+    def test_weighted_fair_order(self):
+        """
+        NORMAL requests get most of the shared capacity without starving LOW ones.
+        """
+        dispatcher = PriorityDispatcher(capacity=2, reserved=1, weights={NORMAL: 4, LOW: 1})
+        dispatcher.acquire(NORMAL)
+        order = []
+
+        def worker(priority):
+            dispatcher.acquire(priority)
+            order.append(priority)
+            time.sleep(0.005)
+            dispatcher.release()
+
+        threads = [threading.Thread(target=worker, args=(priority,)) for priority in [LOW] * 4 + [NORMAL] * 8]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: sum(len(lane) for lane in dispatcher._lanes.values()) == 12)  # pylint: disable=W0212
+        dispatcher.release()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert sorted(order) == sorted([LOW] * 4 + [NORMAL] * 8)
+        assert order[:5].count(LOW) == 1
+        assert LOW in order[:8]
+
+    def test_request_priority_context(self):
+        """
+        The priority follows the context and is restored afterwards.
+        """
+        assert current_priority() == NORMAL
+        with request_priority(HIGH):
+            assert current_priority() == HIGH
+        assert current_priority() == NORMAL
+
+    def test_interactive_latency_under_saturation(self, mock_api):
+        """
+        A HIGH request is served promptly while LOW requests saturate the shared capacity.
+        """
+        mock_api.delay["magnet/instant"] = lambda: 0.3
+        mock_api.routes["magnet/instant"] = lambda params: {"status": "success", "data": {"magnets": []}}
+        alldebrid = mock_api.client(pool_maxsize=4, dispatcher=PriorityDispatcher(capacity=4, reserved=2))
+        alldebrid.ping()
+        stop = threading.Event()
+
+        def background():
+            with request_priority(LOW):
+                while not stop.is_set():
+                    alldebrid.check_magnet_instant(["x"])
+
+        threads = [threading.Thread(target=background) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        try:
+            wait_until(lambda: alldebrid.dispatcher.in_flight == 2)
+            with request_priority(HIGH):
+                start = time.monotonic()
+                alldebrid.ping()
+                latency = time.monotonic() - start
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        assert latency < 0.15
+        assert alldebrid.dispatcher.in_flight == 0
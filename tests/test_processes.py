@@ -0,0 +1,90 @@
+#pylint: disable=C0301
+"""
+Tests for pickling the AllDebrid client and using it from worker processes.
+"""
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+from alldebrid.ratelimit import SharedRateLimiter # pylint: disable=C0413
+
+fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+INHERITED = {}
+
+def ping_in_worker(client):
+    """
+    Pings from a worker process with a client received through pickling.
+    """
+    return client.ping()["data"]["ping"]
+
+def ping_inherited(_):
+    """
+    Pings from a forked worker with the client inherited from the parent.
+    """
+    client = INHERITED["client"]
+    pong = client.ping()["data"]["ping"]
+    return pong, client.session is not INHERITED["parent_session"]
+
+def acquire_in_worker(limiter, count):
+    """
+    Takes ``count`` tokens from a shared limiter.
+    """
+    for _ in range(count):
+        limiter.acquire()
+    return count
+
+class TestProcesses:
+    """
+    Tests for pickle and fork safety.
+    """
+    def test_pickle_keeps_config_only(self):
+        """
+        A pickled client carries its configuration and builds a new session.
+        """
+        alldebrid = AllDebrid(apikey="a" * 20, proxy="http://proxy:3128", timeout=5, pool_maxsize=7)
+        alldebrid.base_url = "http://localhost/v4/"
+
+        clone = pickle.loads(pickle.dumps(alldebrid))
+
+        assert (clone.apikey, clone.proxy, clone.timeout, clone.pool_maxsize, clone.base_url) == ("a" * 20, "http://proxy:3128", 5, 7, "http://localhost/v4/")
+        assert clone.session is not alldebrid.session
+        assert clone.session.proxies == {"http": "http://proxy:3128", "https": "http://proxy:3128"}
+
+    @fork
+    def test_forked_worker_uses_own_session(self, mock_api):
+        """
+        Forked workers drop the inherited session and open their own; pickled clients work too.
+        """
+        alldebrid = INHERITED["client"] = mock_api.client()
+        alldebrid.ping()
+        INHERITED["parent_session"] = alldebrid.session
+
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork")) as executor:
+            inherited = list(executor.map(ping_inherited, range(4)))
+            pickled = list(executor.map(ping_in_worker, [alldebrid] * 4))
+
+        assert inherited == [("pong", True)] * 4
+        assert pickled == ["pong"] * 4
+        assert alldebrid.session is INHERITED["parent_session"]
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+
+    @fork
+    def test_shared_rate_limiter_across_processes(self):
+        """
+        Worker processes draw from one shared token bucket.
+        """
+        ctx = multiprocessing.get_context("fork")
+        limiter = SharedRateLimiter(rate=20, burst=1, ctx=ctx)
+        clone = pickle.loads(pickle.dumps(limiter))
+        assert clone is limiter
+
+        start = time.monotonic()
+        with ProcessPoolExecutor(max_workers=2, mp_context=ctx) as executor:
+            assert sum(executor.map(acquire_in_worker, [limiter, limiter], [5, 5])) == 10
+        assert time.monotonic() - start >= 9 / 20
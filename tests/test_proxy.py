@@ -0,0 +1,62 @@
+#pylint: disable=C0301
+"""
+Tests for the StreamProxy against a local ranged HTTP server.
+"""
+import os
+import sys
+import requests
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.proxy import StreamProxy # pylint: disable=C0413
+
+class FakeClient:
+    """
+    Unlocks every link to a new path on the ranged server.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.unlocks = 0
+
+    def download_link(self, links, password=None):  # pylint: disable=W0613
+        """
+        Returns a fresh direct URL, like a new unlock would.
+        """
+        self.unlocks += 1
+        return {"status": "success", "data": {"link": self.server.url(f"file/{self.unlocks}")}}
+
+class TestProxy:
+    """
+    Tests for lazy resolution and Range pass-through.
+    """
+    def test_range_requests_reuse_resolution(self, ranged_server):
+        """
+        Seeks are served as ranged responses and the link is resolved only once.
+        """
+        client = FakeClient(ranged_server)
+        with StreamProxy(client) as proxy:
+            local_url = proxy.register("https://host.example/a")
+            assert local_url == proxy.register("https://host.example/a")
+            assert client.unlocks == 0
+
+            full = requests.get(local_url, timeout=5)
+            seek = requests.get(local_url, headers={"Range": "bytes=1000-1999"}, timeout=5)
+
+        assert full.status_code == 200 and full.content == ranged_server.content
+        assert seek.status_code == 206
+        assert seek.headers["Content-Range"] == f"bytes 1000-1999/{len(ranged_server.content)}"
+        assert seek.content == ranged_server.content[1000:2000]
+        assert client.unlocks == 1
+
+    def test_expired_link_is_resolved_again(self, ranged_server):
+        """
+        An expired direct URL is dropped from the cache and the link is unlocked again.
+        """
+        client = FakeClient(ranged_server)
+        ranged_server.expire("file/1")
+        with StreamProxy(client) as proxy:
+            response = requests.get(proxy.register("https://host.example/a"), headers={"Range": "bytes=0-9"}, timeout=5)
+            missing = requests.get(proxy.url + "/unknown", timeout=5)
+
+        assert response.status_code == 206 and response.content == ranged_server.content[:10]
+        assert client.unlocks == 2
+        assert missing.status_code == 404
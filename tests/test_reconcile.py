@@ -0,0 +1,70 @@
+#pylint: disable=C0301
+"""
+Tests for reconciling the saved links with a desired set.
+"""
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+class TestReconcile:
+    """
+    Tests for AllDebrid.reconcile_saved_links.
+    """
+    def setup_routes(self, mock_api, saved):
+        """
+        Serves ``saved`` as the saved links and applies saves and deletes to it.
+        """
+        lock = threading.Lock()
+
+        def save(params):
+            if any(link.endswith("bad") for link in params["links[]"]):
+                return {"status": "error", "error": {"code": "LINK_HOST_NOT_SUPPORTED", "message": "This host or link is not supported"}}
+            with lock:
+                saved.update(params["links[]"])
+            return {"status": "success", "data": {"message": "Link(s) successfully saved"}}
+
+        def delete(params):
+            with lock:
+                saved.difference_update(params["links[]"])
+            return {"status": "success", "data": {"message": "Link(s) successfully deleted"}}
+
+        mock_api.routes["user/links"] = lambda params: {"status": "success", "data": {"links": [{"link": link, "filename": link[-1], "size": 1, "date": 0} for link in sorted(saved)]}}
+        mock_api.routes["user/links/save"] = save
+        mock_api.routes["user/links/delete"] = delete
+
+    def test_sends_only_the_delta(self, mock_api):
+        """
+        Only missing links are saved and only undesired ones deleted, in chunks, with a result per link.
+        """
+        saved = {f"https://host.example/{i}" for i in range(10)}
+        self.setup_routes(mock_api, saved)
+        desired = [f"https://host.example/{i}" for i in range(5, 15)] + ["https://host.example/5"]
+
+        result = mock_api.client().reconcile_saved_links(desired, chunk_size=2)
+        assert saved == set(desired)
+        assert result["unchanged"] == 5
+        assert {link: outcome["action"] for link, outcome in result["links"].items()} == {
+            **{f"https://host.example/{i}": "save" for i in range(10, 15)},
+            **{f"https://host.example/{i}": "delete" for i in range(5)},
+        }
+        assert all(outcome["status"] == "success" for outcome in result["links"].values())
+        calls = [call[0] for call in mock_api.calls]
+        assert calls.count("user/links") == 1 and calls.count("user/links/save") == 3 and calls.count("user/links/delete") == 3
+
+        mock_api.calls.clear()
+        assert mock_api.client().reconcile_saved_links(desired) == {"unchanged": 10, "links": {}}
+        assert [call[0] for call in mock_api.calls] == ["user/links"]
+
+    def test_failed_chunk_and_keep_extra(self, mock_api):
+        """
+        A failed chunk fails only its links, and delete=False keeps saved links that are not desired.
+        """
+        saved = {"https://host.example/old"}
+        self.setup_routes(mock_api, saved)
+        desired = ["https://host.example/new", "https://host.example/bad", "https://host.example/other"]
+
+        result = mock_api.client().reconcile_saved_links(desired, delete=False, chunk_size=1)
+        assert saved == {"https://host.example/old", "https://host.example/new", "https://host.example/other"}
+        assert result["links"]["https://host.example/bad"] == {"action": "save", "status": "error", "error": {"code": "LINK_HOST_NOT_SUPPORTED", "message": "This host or link is not supported"}}
+        assert result["links"]["https://host.example/new"]["status"] == "success"
@@ -0,0 +1,80 @@
+#pylint: disable=C0301
+"""
+Tests for recording traffic and replaying it offline.
+"""
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+from alldebrid.recording import RecordingTransport, load_recording # pylint: disable=C0413
+from alldebrid.replay import ReplayServer, ReplayTransport, replay # pylint: disable=C0413
+from alldebrid.transport import RequestsTransport # pylint: disable=C0413
+
+def record_session(mock_api, path):
+    """
+    Makes a few calls through a recording client and returns it.
+    """
+    mock_api.routes["user"] = lambda params: {"status": "success", "data": {"user": {"username": "alice", "email": "alice@example.com", "isPremium": True}}}
+    mock_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"magnets": {"id": int(params["id"][0]), "status": "Ready"}}}
+    mock_api.routes["user/links/save"] = lambda params: {"status": "success", "data": {"saved": len(params["links[]"])}}
+    mock_api.delay["magnet/status"] = lambda: 0.05
+    alldebrid = mock_api.client(transport=RecordingTransport(RequestsTransport(), str(path)))
+    alldebrid.user()
+    alldebrid.get_magnet_status(1)
+    time.sleep(0.2)
+    alldebrid.get_magnet_status(2)
+    alldebrid.save_new_link(["https://a.example/1", "https://a.example/2"])
+    alldebrid.transport.close()
+    return alldebrid
+
+class TestReplay:
+    """
+    Tests for RecordingTransport and the replay tools.
+    """
+    def test_capture_is_redacted(self, mock_api, tmp_path):
+        """
+        Every request is appended as one JSON line, without credentials or personal data.
+        """
+        path = tmp_path / "capture.ndjson"
+        record_session(mock_api, path)
+
+        raw = path.read_text()
+        assert "a" * 20 not in raw and "alice" not in raw
+        records = load_recording(str(path))
+        assert [record["endpoint"] for record in records] == ["user", "magnet/status", "magnet/status", "user/links/save"]
+        assert records[0]["response"]["data"]["user"] == {"username": "<redacted>", "email": "<redacted>", "isPremium": True}
+        assert records[1]["params"]["id"] == ["1"] and records[1]["latency"] >= 0.05
+        assert records[3]["data"] == {"links[]": ["https://a.example/1", "https://a.example/2"]}
+        assert all(json.loads(line) for line in raw.splitlines())
+
+    def test_replay_against_local_server(self, mock_api, tmp_path):
+        """
+        The replay keeps the recorded schedule, scaled by the speed, and gets the recorded answers.
+        """
+        path = tmp_path / "capture.ndjson"
+        record_session(mock_api, path)
+        records = load_recording(str(path))
+
+        with ReplayServer(records, speed=2) as server:
+            client = AllDebrid(apikey="r" * 20, base_url=server.base_url)
+            report = replay(client, records, speed=2)
+            assert client.get_magnet_status(3)["status"] == "success"
+
+        assert report["magnet/status"]["count"] == 2 and report["magnet/status"]["errors"] == 0
+        assert report["magnet/status"]["p50"] >= 0.025
+        assert report["user/links/save"]["count"] == 1
+        assert 0.1 <= report["_schedule"]["duration"] < 0.5
+
+    def test_replay_transport(self, mock_api, tmp_path):
+        """
+        The in-memory replay answers matching requests with their own recorded responses.
+        """
+        path = tmp_path / "capture.ndjson"
+        record_session(mock_api, path)
+        client = AllDebrid(apikey="r" * 20, transport=ReplayTransport(load_recording(str(path)), speed=100))
+
+        assert client.get_magnet_status(2)["data"]["magnets"]["id"] == 2
+        assert client.get_magnet_status(1)["data"]["magnets"]["id"] == 1
+        assert client.save_new_link(["https://a.example/1", "https://a.example/2"])["data"]["saved"] == 2
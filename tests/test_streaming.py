@@ -0,0 +1,119 @@
+#pylint: disable=C0301
+"""
+Tests for streaming list responses.
+"""
+import json
+import os
+import random
+import sys
+import tracemalloc
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError # pylint: disable=C0413
+from alldebrid.jsonstream import JSONItemStream # pylint: disable=C0413
+from alldebrid.transport import InMemoryTransport, Urllib3Transport # pylint: disable=C0413
+
+def split(raw, rng, largest=40):
+    """
+    Splits ``raw`` into chunks of random sizes.
+    """
+    chunks, position = [], 0
+    while position < len(raw):
+        size = rng.randint(1, largest)
+        chunks.append(raw[position:position + size])
+        position += size
+    return chunks
+
+def links(count):
+    """
+    A list of saved links as the API returns them.
+    """
+    return [{"link": f"https://host.example/{i}", "filename": f"file-{i}.bin", "size": i * 1024, "date": 1700000000 + i, "host": "host"} for i in range(count)]
+
+class TestJSONItemStream:
+    """
+    Tests for the incremental parser.
+    """
+    def test_matches_json_loads_for_any_chunking(self):
+        """
+        Items and envelope are the same however the document is split, even inside strings, escapes and numbers.
+        """
+        rng = random.Random(7)
+        for _ in range(200):
+            items = [rng.choice([{"id": i, "name": "é\"\\u00e9" * rng.randint(0, 3), "files": [{"n": "a", "s": 12.5e3}] * rng.randint(0, 2)}, -1.25e-3, 123456789, None, True, "x", []]) for i in range(rng.randint(0, 20))]
+            document = {"status": "success", "data": {"before": [1, {"a": 2}], "magnets": items, "after": 1.5}, "extra": -10}
+            stream = JSONItemStream(split(json.dumps(document, indent=rng.choice([None, 1])).encode(), rng), ("data", "magnets"))
+            assert list(stream) == items
+            assert stream.envelope == {"status": "success", "extra": -10}
+
+    def test_shapes_and_errors(self):
+        """
+        An object at the path is its only item, a missing path yields nothing, and broken documents raise.
+        """
+        assert list(JSONItemStream([b'{"data": {"magnets": {"id": 1}}}'], ("data", "magnets"))) == [{"id": 1}]
+        stream = JSONItemStream([b'{"status": "error", "error": {"code": "AUTH_BAD_APIKEY", "message": "bad"}}'], ("data", "links"))
+        assert list(stream) == [] and stream.envelope["error"]["code"] == "AUTH_BAD_APIKEY"
+        for broken in [b'{"data": {"links": [1, 2', b'{"data": {"links": [1 2]}}', b'[1]', b'{"a": 1} {}']:
+            with pytest.raises(ValueError):
+                list(JSONItemStream([broken], ("data", "links")))
+
+    def test_memory_does_not_grow_with_the_list(self):
+        """
+        Parsing a large list keeps only about one chunk and one item in memory.
+        """
+        raw = json.dumps({"status": "success", "data": {"links": links(50000)}}).encode()
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in JSONItemStream((raw[i:i + 65536] for i in range(0, len(raw), 65536)), ("data", "links")))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert count == 50000
+        assert peak < len(raw) / 10
+
+class TestStreamingClient:
+    """
+    Tests for the iter_* methods of the client.
+    """
+    def test_iter_over_http(self, mock_api):
+        """
+        Saved links, history and magnets stream through the requests and urllib3 transports.
+        """
+        mock_api.routes["user/links"] = lambda params: {"status": "success", "data": {"links": links(5000)}}
+        mock_api.routes["user/history"] = lambda params: {"status": "success", "data": {"links": links(3)}}
+        mock_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"magnets": [{"id": 1, "status": params["status"][0]}]}}
+
+        for alldebrid in (mock_api.client(), mock_api.client(transport=Urllib3Transport())):
+            assert list(alldebrid.iter_saved_links()) == links(5000)
+            assert [link["size"] for link in alldebrid.iter_recent_links()] == [0, 1024, 2048]
+            assert list(alldebrid.iter_magnets(status="ready")) == [{"id": 1, "status": "ready"}]
+            assert alldebrid.ping()["data"]["ping"] == "pong"
+
+    def test_api_errors(self, mock_api):
+        """
+        Error envelopes raise APIError once the stream ends; nothing is sent before iteration starts.
+        """
+        mock_api.routes["user/links"] = lambda params: {"status": "error", "error": {"code": "AUTH_BLOCKED", "message": "Blocked"}}
+        alldebrid = mock_api.client()
+        links_iterator = alldebrid.iter_saved_links()
+        assert not [call for call in mock_api.calls if call[0] == "user/links"]
+        with pytest.raises(APIError) as info:
+            list(links_iterator)
+        assert info.value.code == "AUTH_BLOCKED"
+
+    def test_transport_without_streaming(self, mock_api):
+        """
+        Transports that cannot stream fall back to reading the whole body.
+        """
+        transport = InMemoryTransport({"user/history": lambda params: {"status": "success", "data": {"links": links(2)}}})
+        assert list(mock_api.client(transport=transport).iter_recent_links()) == links(2)
+
+    def test_iter_over_http2(self, h2_api):
+        """
+        Streams over HTTP/2 release their stream slot when done.
+        """
+        h2_api.routes["user/links"] = lambda params: {"status": "success", "data": {"links": links(100)}}
+        alldebrid = h2_api.client(max_concurrent_streams=1)
+        for _ in range(3):
+            assert len(list(alldebrid.iter_saved_links())) == 100
+        assert alldebrid.ping()["data"]["ping"] == "pong"
@@ -0,0 +1,115 @@
+#pylint: disable=C0301
+"""
+Tests for stream variant selection and parallel stream generation.
+"""
+import os
+import sys
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import MaxAttemptsExceededException, StreamLinkProcessor # pylint: disable=C0413
+from alldebrid.polling import PollScheduler # pylint: disable=C0413
+from alldebrid.streams import StreamPolicy # pylint: disable=C0413
+
+STREAMS = [
+    {"id": "s480", "quality": 480, "ext": "mp4", "filesize": 300, "tb": 900},
+    {"id": "s2160", "quality": "2160p", "ext": "mkv", "filesize": 9000, "tb": 20000},
+    {"id": "s1080", "quality": 1080, "ext": "mkv", "filesize": 2000, "tb": 5000},
+    {"id": "s720", "quality": 720, "ext": "mp4", "filesize": 900, "tb": 2500},
+    {"quality": 1440},
+]
+
+def route_streams(mock_api, ready_after):
+    """
+    Serves STREAMS, with the delayed link of each variant ready after its number of polls (None never).
+    """
+    polls = {}
+    mock_api.routes["link/unlock"] = lambda params: {"status": "success", "data": {"id": "abc", "streams": STREAMS}}
+    mock_api.routes["link/streaming"] = lambda params: {"status": "success", "data": {"delayed": params["stream"][0]}}
+
+    def delayed(params):
+        stream = params["id"][0]
+        polls[stream] = polls.get(stream, 0) + 1
+        needed = ready_after.get(stream)
+        if needed is not None and polls[stream] >= needed:
+            return {"status": "success", "data": {"status": 2, "link": f"https://cdn.example/{stream}"}}
+        return {"status": "success", "data": {"status": 1}}
+
+    mock_api.routes["link/delayed"] = delayed
+    return polls
+
+def requested(mock_api):
+    """
+    The stream IDs sent to the streaming endpoint, in order.
+    """
+    return [params["stream"][0] for endpoint, params in mock_api.calls if endpoint == "link/streaming"]
+
+class TestStreamPolicy:
+    """
+    Tests for StreamPolicy.
+    """
+    def test_ranking(self):
+        """
+        Limits filter, preferences order, and variants without an ID are never chosen.
+        """
+        ids = lambda streams: [stream["id"] for stream in streams]
+        assert ids(StreamPolicy().rank(STREAMS)) == ["s2160", "s1080", "s720", "s480"]
+        assert ids(StreamPolicy(max_quality=1080, formats=("mp4",)).rank(STREAMS)) == ["s720", "s480", "s1080"]
+        assert ids(StreamPolicy(prefer="smallest", max_bitrate=3000).rank(STREAMS)) == ["s480", "s720"]
+        assert StreamPolicy(prefer="lowest").choose(STREAMS)["id"] == "s480"
+        assert StreamPolicy(min_quality=4320).choose(STREAMS)["id"] == "s2160"
+        assert StreamPolicy(min_quality=4320, strict=True).choose(STREAMS) is None
+        assert StreamPolicy(max_size=1000).rank(STREAMS + [{"id": "unknown"}])[-1]["id"] == "unknown"
+
+class TestStreamLinks:
+    """
+    Tests for get_direct_stream_link and StreamLinkProcessor with stream variants.
+    """
+    def test_requests_the_chosen_variant(self, mock_api):
+        """
+        A link with stream variants resolves, using the variant the policy picks.
+        """
+        route_streams(mock_api, {"s720": 1, "s2160": 1})
+        alldebrid = mock_api.client()
+        assert alldebrid.get_direct_stream_link("https://host.example/video") == "https://cdn.example/s2160"
+        assert requested(mock_api) == ["s2160"]
+        mock_api.calls.clear()
+        assert alldebrid.get_direct_stream_link("https://host.example/video", policy=StreamPolicy(max_quality=720)) == "https://cdn.example/s720"
+        assert requested(mock_api) == ["s720"]
+
+    def test_first_ready_candidate_wins(self, mock_api):
+        """
+        Several candidates are requested at once and the first one ready is returned, polled or scheduled.
+        """
+        polls = route_streams(mock_api, {"s1080": 2, "s720": 1})
+        alldebrid = mock_api.client()
+        processor = StreamLinkProcessor(alldebrid, retry_delay=0.05, max_attempts=50, candidates=3)
+        start = time.monotonic()
+        assert processor.get_delayed_link("https://host.example/video") == "https://cdn.example/s720"
+        assert time.monotonic() - start < 1
+        assert sorted(requested(mock_api)) == ["s1080", "s2160", "s720"]
+        time.sleep(0.2)
+        assert polls.get("s2160", 0) <= 2
+
+        route_streams(mock_api, {"s1080": 1})
+        mock_api.calls.clear()
+        with PollScheduler(alldebrid, interval=0.05) as scheduler:
+            link = alldebrid.get_direct_stream_link(["https://host.example/a", "https://host.example/b"], policy=StreamPolicy(max_quality=1080), candidates=2, scheduler=scheduler)
+        assert link == ["https://cdn.example/s1080", "https://cdn.example/s1080"]
+        assert sorted(requested(mock_api)) == ["s1080", "s1080", "s720", "s720"]
+
+    def test_scheduler_uses_processor_settings(self, mock_api):
+        """
+        A scheduled wait polls at the processor's retry_delay and stops at its max_attempts, not the scheduler's.
+        """
+        polls = route_streams(mock_api, {})
+        alldebrid = mock_api.client()
+        with PollScheduler(alldebrid, interval=10, max_attempts=100) as scheduler:
+            processor = StreamLinkProcessor(alldebrid, retry_delay=0.05, max_attempts=3, scheduler=scheduler)
+            start = time.monotonic()
+            with pytest.raises(MaxAttemptsExceededException):
+                processor.get_delayed_link("https://host.example/video")
+            with pytest.raises(MaxAttemptsExceededException):
+                processor.submit("https://host.example/video").result(timeout=5)
+        assert time.monotonic() - start < 1
+        assert polls == {"s2160": 6}
@@ -0,0 +1,77 @@
+#pylint: disable=C0301
+"""
+Tests for the local mirror of saved links and history.
+"""
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.sync import LinkSync # pylint: disable=C0413
+
+def link(index, host="rapidgator", date=1700000000):
+    """
+    A link entry as the API lists it.
+    """
+    return {"link": f"https://{host}.example/{index}", "filename": f"Ubuntu-{index}.iso" if index % 2 else f"debian_{index}.iso", "size": index * 1000, "date": date + index, "host": host}
+
+class TestSync:
+    """
+    Tests for LinkSync.
+    """
+    def test_sync_writes_only_changes(self, mock_api, tmp_path):
+        """
+        A sync reports what was added, updated and removed, and an unchanged list costs nothing.
+        """
+        saved = [link(i) for i in range(10)]
+        mock_api.routes["user/links"] = lambda params: {"status": "success", "data": {"links": list(saved)}}
+        mock_api.routes["user/history"] = lambda params: {"status": "success", "data": {"links": [link(i, "uptobox") for i in range(3)]}}
+        store = LinkSync(mock_api.client(), str(tmp_path / "links.db"))
+
+        assert store.sync() == {"saved": {"added": 10, "updated": 0, "removed": 0}, "history": {"added": 3, "updated": 0, "removed": 0}}
+        assert store.sync(["saved"]) == {"saved": {"added": 0, "updated": 0, "removed": 0}}
+
+        saved[0] = dict(saved[0], filename="renamed.iso")
+        del saved[5]
+        saved.append(link(42))
+        assert store.sync(["saved"]) == {"saved": {"added": 1, "updated": 1, "removed": 1}}
+        assert len(store.query("saved")) == 10
+        store.close()
+
+        reopened = LinkSync(mock_api.client(), str(tmp_path / "links.db"), max_age=None)
+        assert reopened.query("saved", name="renamed")[0]["link"] == "https://rapidgator.example/0"
+        reopened.close()
+
+    def test_queries(self, mock_api):
+        """
+        Queries filter by host, file name substring and date range, newest first.
+        """
+        history = [link(i) for i in range(6)] + [link(i, "1fichier") for i in range(6, 9)]
+        mock_api.routes["user/history"] = lambda params: {"status": "success", "data": {"links": history}}
+        store = LinkSync(mock_api.client(), ":memory:")
+
+        assert [item["link"] for item in store.query("history", host="1fichier")] == [f"https://1fichier.example/{i}" for i in (8, 7, 6)]
+        assert [item["filename"] for item in store.query("history", name="ubuntu")] == ["Ubuntu-7.iso", "Ubuntu-5.iso", "Ubuntu-3.iso", "Ubuntu-1.iso"]
+        assert [item["size"] for item in store.query("history", since=1700000002, until=1700000005)] == [4000, 3000, 2000]
+        assert store.query("history", name="_", limit=1) == [history[8]]
+        assert store.query("history", name="%") == []
+        assert store.hosts("history") == {"1fichier": 3, "rapidgator": 6}
+
+    def test_queries_sync_when_stale(self, mock_api):
+        """
+        Queries are answered locally and sync only once the list is older than max_age, once for concurrent callers.
+        """
+        mock_api.routes["user/links"] = lambda params: {"status": "success", "data": {"links": [link(1)]}}
+        mock_api.delay["user/links"] = lambda: 0.05
+        now = [1000.0]
+        store = LinkSync(mock_api.client(), ":memory:", max_age=60, clock=lambda: now[0])
+
+        threads = [threading.Thread(target=store.query, args=("saved",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(100):
+            store.query("saved", host="rapidgator")
+        now[0] += 61
+        store.query("saved")
+        assert len([call for call in mock_api.calls if call[0] == "user/links"]) == 2
@@ -0,0 +1,88 @@
+#pylint: disable=C0301
+"""
+Stress tests for sharing one AllDebrid instance between many threads.
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import StreamLinkProcessor # pylint: disable=C0413
+
+class TestThreadSafety:
+    """
+    Tests for a shared client under contention.
+    """
+    def test_shared_pool_under_contention(self, mock_api):
+        """
+        Many threads share one pool and never open more connections than its size.
+        """
+        alldebrid = mock_api.client(pool_maxsize=8)
+
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            results = list(executor.map(lambda _: alldebrid.ping(), range(2000)))
+
+        assert all(result["data"]["ping"] == "pong" for result in results)
+        assert len(mock_api.calls) == 2000
+        assert len(mock_api.connections) <= 8
+
+    def test_close_connection_during_requests(self, mock_api):
+        """
+        Closing the connection from one thread does not break requests running on others.
+        """
+        alldebrid = mock_api.client(pool_maxsize=4)
+        errors = []
+        done = threading.Event()
+
+        def closer():
+            while not done.is_set():
+                alldebrid.close_connection()
+
+        def worker(_):
+            try:
+                return alldebrid.ping()
+            except Exception as exc:  # pylint: disable=W0703
+                errors.append(exc)
+                raise
+
+        thread = threading.Thread(target=closer)
+        thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list(executor.map(worker, range(500)))
+        finally:
+            done.set()
+            thread.join()
+
+        assert not errors
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+
+    def test_processor_keeps_shared_session(self, mock_api):
+        """
+        StreamLinkProcessor leaves the shared session open unless asked to close it.
+        """
+        alldebrid = mock_api.client()
+        session = alldebrid.session
+
+        class Downloader:
+            """
+            Raises immediately, which still runs the processor's cleanup.
+            """
+            def download_link(self, link):
+                """
+                Fails the unlock.
+                """
+                raise ValueError(link)
+
+            def close_connection(self):
+                """
+                Delegates to the shared client.
+                """
+                alldebrid.close_connection()
+
+        for close_session in (False, True):
+            try:
+                StreamLinkProcessor(Downloader(), close_session=close_session).get_delayed_link("x")
+            except ValueError:
+                pass
+            assert (alldebrid.session is session) is not close_session
@@ -0,0 +1,95 @@
+#pylint: disable=C0301
+"""
+Tests for the torrent module and AllDebrid.upload_torrents.
+"""
+import hashlib
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import AllDebrid # pylint: disable=C0413
+from alldebrid.torrent import BencodeError, bdecode, parse_torrent # pylint: disable=C0413
+
+def bencode(value):
+    """
+    Minimal bencode encoder used to build test torrents.
+    """
+    if isinstance(value, int):
+        return b"i%de" % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b"%d:%s" % (len(value), value)
+    if isinstance(value, list):
+        return b"l" + b"".join(bencode(item) for item in value) + b"e"
+    items = sorted((key.encode() if isinstance(key, str) else key, item) for key, item in value.items())
+    return b"d" + b"".join(bencode(key) + bencode(item) for key, item in items) + b"e"
+
+V1_INFO = {"name": "show", "piece length": 16384, "pieces": b"\x00" * 20, "files": [{"length": 10, "path": ["s01", "e01.mkv"]}, {"length": 3, "path": ["e01.srt"]}]}
+V2_INFO = {"name": "movie.mkv", "piece length": 16384, "meta version": 2, "file tree": {"movie.mkv": {"": {"length": 42, "pieces root": b"\x01" * 32}}}}
+
+class TestTorrent:
+    """
+    Tests for the bencode decoder and torrent parsing.
+    """
+    def test_bdecode_values(self):
+        """
+        Decodes nested values and rejects malformed payloads.
+        """
+        assert bdecode(b"d3:bar4:spam3:fooi-42ee") == {b"bar": b"spam", b"foo": -42}
+        assert bdecode(b"l1:ai0eli1eee") == [b"a", 0, [1]]
+        for payload in (b"i03e", b"i-0e", b"4:abc", b"d1:ae", b"i1ei2e", b"x"):
+            with pytest.raises(BencodeError):
+                bdecode(payload)
+
+    def test_v1_torrent(self):
+        """
+        Computes the v1 info-hash from the original encoding and lists files under the torrent name.
+        """
+        payload = bencode({"announce": "udp://tracker.example:80", "info": V1_INFO})
+        info = parse_torrent(payload)
+
+        assert info.info_hash == hashlib.sha1(bencode(V1_INFO)).hexdigest()
+        assert info.info_hash_v2 is None
+        assert [(f.path, f.size) for f in info.files] == [("show/s01/e01.mkv", 10), ("show/e01.srt", 3)]
+        assert info.total_size == 13
+        assert info.magnet_uri().startswith("magnet:?xt=urn:btih:" + info.info_hash + "&dn=show&tr=udp%3A%2F%2F")
+
+    def test_v2_torrent(self, tmp_path):
+        """
+        Computes the v2 info-hash for v2-only torrents read from disk.
+        """
+        path = tmp_path / "movie.torrent"
+        path.write_bytes(bencode({"info": V2_INFO}))
+        info = parse_torrent(str(path))
+
+        assert info.info_hash is None
+        assert info.hash == info.info_hash_v2 == hashlib.sha256(bencode(V2_INFO)).hexdigest()
+        assert [(f.path, f.size) for f in info.files] == [("movie.mkv", 42)]
+        assert info.source == str(path)
+
+    def test_upload_torrents_skips_cached_files(self, monkeypatch):
+        """
+        Cached torrents are sent as magnets and only the others are uploaded as files.
+        """
+        cached = bencode({"info": V1_INFO})
+        uncached = bencode({"info": dict(V1_INFO, name="other")})
+        calls = []
+
+        def fake_request(method, endpoint, **kwargs):
+            calls.append((endpoint, kwargs))
+            if endpoint == "magnet/instant":
+                hashes = kwargs["magnets"]
+                return {"status": "success", "data": {"magnets": [{"hash": hashes[0], "instant": True}, {"hash": hashes[1], "instant": False}]}}
+            if endpoint == "magnet/upload":
+                return {"status": "success", "data": {"magnets": [{"id": 1}]}}
+            return {"status": "success", "data": {"files": [{"id": 2}]}}
+
+        alldebrid = AllDebrid(apikey="a" * 20)
+        monkeypatch.setattr(alldebrid, "_request", fake_request)
+
+        response = alldebrid.upload_torrents([cached, uncached])
+
+        assert response["data"] == {"magnets": [{"id": 1}], "files": [{"id": 2}]}
+        assert [endpoint for endpoint, _ in calls] == ["magnet/instant", "magnet/upload", "magnet/upload/file"]
+        assert list(calls[2][1]["files"]) == ["files[0]"]
@@ -0,0 +1,65 @@
+#pylint: disable=C0301
+"""
+Tests for the transports against the local mock API.
+"""
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.alldebrid import APIError, AllDebrid # pylint: disable=C0413
+from alldebrid.transport import InMemoryTransport, RequestsTransport, Urllib3Transport # pylint: disable=C0413
+
+def saved(params):
+    """
+    Answers user/links/save with the links it received.
+    """
+    return {"status": "success", "data": {"links": params.get("links[]", [])}}
+
+class TestTransport:
+    """
+    Tests for sending requests through each transport.
+    """
+    @pytest.mark.parametrize("transport_class", [RequestsTransport, Urllib3Transport])
+    def test_network_transports(self, mock_api, transport_class, tmp_path):
+        """
+        Query parameters, form bodies and file uploads reach the API the same way through either transport.
+        """
+        mock_api.routes["magnet/status"] = lambda params: {"status": "success", "data": {"id": params["id"]}}
+        mock_api.routes["user/links/save"] = saved
+        mock_api.routes["magnet/upload/file"] = lambda params: {"status": "success", "data": {"files": []}}
+        alldebrid = mock_api.client(transport=transport_class(pool_maxsize=4))
+
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+        assert alldebrid.get_magnet_status(7)["data"]["id"] == ["7"]
+        assert alldebrid.save_new_link(["https://a.example/1", "https://a.example/2"])["data"]["links"] == ["https://a.example/1", "https://a.example/2"]
+
+        torrent = tmp_path / "file.torrent"
+        torrent.write_bytes(b"d4:infod4:name1:aee")
+        alldebrid.upload_file([str(torrent)])
+        assert mock_api.calls[-1][0] == "magnet/upload/file"
+
+        alldebrid.close_connection()
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+
+    def test_connection_failure(self, mock_api):
+        """
+        A request that gets no response raises APIError through the urllib3 transport as well.
+        """
+        alldebrid = mock_api.client(transport=Urllib3Transport(), timeout=1)
+        alldebrid.base_url = "http://127.0.0.1:9/v4/"
+        with pytest.raises(APIError):
+            alldebrid.ping()
+
+    def test_in_memory_transport(self):
+        """
+        The in-memory transport answers from callables, records the calls and reports HTTP errors.
+        """
+        transport = InMemoryTransport({"user/links/save": saved, "user": lambda params: (500, {"status": "error"})})
+        alldebrid = AllDebrid(apikey="a" * 20, transport=transport)
+
+        assert alldebrid.ping()["data"]["ping"] == "pong"
+        assert alldebrid.save_new_link(["https://a.example/1"])["data"]["links"] == ["https://a.example/1"]
+        with pytest.raises(APIError):
+            alldebrid.user()
+        assert [(method, endpoint) for method, endpoint, _ in transport.calls] == [("GET", "ping"), ("POST", "user/links/save"), ("GET", "user")]
+        assert alldebrid.session is None
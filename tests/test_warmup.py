@@ -0,0 +1,82 @@
+#pylint: disable=C0301
+"""
+Tests for connection warm-up and DNS caching against the local mock API.
+"""
+import os
+import socket
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from alldebrid.dnscache import DNSCache # pylint: disable=C0413
+
+class CountingResolver:
+    """
+    Wraps socket.getaddrinfo and counts the lookups.
+    """
+    def __init__(self) -> None:
+        self.lookups = []
+
+    def __call__(self, host, port, *args):
+        self.lookups.append(host)
+        return socket.getaddrinfo(host, port, *args)
+
+class TestWarmUp:
+    """
+    Tests for warm_up, the keep-alive and the DNSCache.
+    """
+    def test_warm_up_opens_connections(self, mock_api):
+        """
+        warm_up leaves the requested number of connections open for later requests.
+        """
+        mock_api.delay["ping"] = lambda: 0.05
+        alldebrid = mock_api.client()
+        alldebrid.warm_up(n_connections=4)
+        assert len(mock_api.calls) == 4 and len(mock_api.connections) == 4
+
+        alldebrid.ping()
+        assert len(mock_api.connections) == 4
+
+    def test_dns_is_resolved_once(self, mock_api):
+        """
+        New connections reuse the cached addresses, and the Host header keeps the host name.
+        """
+        resolver = CountingResolver()
+        alldebrid = mock_api.client(dns_cache=DNSCache(resolver=resolver))
+        alldebrid.base_url = mock_api.base_url.replace("127.0.0.1", "localhost")
+
+        alldebrid.warm_up(n_connections=2)
+        alldebrid.close_connection()
+        alldebrid.ping()
+        assert resolver.lookups == ["localhost"]
+
+    def test_cache_expires(self):
+        """
+        Entries are resolved again once the TTL has passed, or after being invalidated.
+        """
+        now = [0.0]
+        resolver = CountingResolver()
+        cache = DNSCache(ttl=10, resolver=resolver, clock=lambda: now[0])
+        assert "127.0.0.1" in cache.resolve("localhost", 80)
+        cache.resolve("localhost", 80)
+        now[0] = 11
+        cache.resolve("localhost", 80)
+        cache.invalidate("localhost")
+        cache.resolve("localhost", 80)
+        assert len(resolver.lookups) == 3
+
+    def test_keep_alive(self, mock_api):
+        """
+        The keep-alive pings in the background until stopped.
+        """
+        alldebrid = mock_api.client()
+        alldebrid.warm_up(n_connections=2, keep_alive=0.02)
+        deadline = time.monotonic() + 5
+        while len(mock_api.calls) < 6:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        alldebrid.stop_keep_alive()
+        time.sleep(0.05)
+        count = len(mock_api.calls)
+        time.sleep(0.1)
+        assert len(mock_api.calls) == count